@@ -1,5 +1,6 @@
 from . import (
     boundary,
+    cache,
     constraints,
     contact,
     control,
@@ -9,6 +10,7 @@ from . import (
     initial,
     loaddata,
     loads,
+    logfile,
     material,
     mesh,
     meshadaptor,
@@ -17,12 +19,20 @@ from . import (
     model,
     module,
     output,
+    progress,
+    quality,
     rigid,
+    runner,
+    spatial,
     step,
+    sweep,
+    template,
+    xplt,
 )
 
 __all__ = [
     "boundary",
+    "cache",
     "constraints",
     "contact",
     "control",
@@ -31,6 +41,7 @@ __all__ = [
     "initial",
     "loaddata",
     "loads",
+    "logfile",
     "material",
     "mesh",
     "meshdata",
@@ -39,7 +50,14 @@ __all__ = [
     "model",
     "module",
     "output",
+    "progress",
+    "quality",
     "rigid",
+    "runner",
+    "spatial",
     "step",
+    "sweep",
+    "template",
     "include",
+    "xplt",
 ]
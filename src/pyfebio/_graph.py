@@ -0,0 +1,104 @@
+import numpy as np
+
+from .spatial import _ranges
+
+
+class NodeGraph:
+    """
+    The nodes of a mesh connected through the elements they share, with node -> elements
+    and element -> nodes stored as compressed rows. Nodes are rows 0..count-1.
+    """
+
+    def __init__(self, connectivities: list[np.ndarray], count: int):
+        sizes = [len(connectivity) for connectivity in connectivities]
+        widths = np.concatenate([np.full(size, connectivity.shape[1]) for size, connectivity in zip(sizes, connectivities)] or [np.zeros(0)])
+        self.element_starts = np.zeros(sum(sizes) + 1, dtype=np.int64)
+        np.cumsum(widths, out=self.element_starts[1:])
+        self.element_nodes = np.concatenate([connectivity.ravel() for connectivity in connectivities] or [np.zeros(0, dtype=np.int64)])
+        elements = np.repeat(np.arange(sum(sizes)), widths.astype(np.int64))
+        order = np.argsort(self.element_nodes, kind="stable")
+        self.node_elements = elements[order]
+        self.degree = np.bincount(self.element_nodes, minlength=count)
+        self.node_starts = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(self.degree, out=self.node_starts[1:])
+
+    def neighbours(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (position in nodes, neighbour) for every node sharing an element with one of nodes,
+        including the nodes themselves and repeats.
+        """
+        starts, ends = self.node_starts[nodes], self.node_starts[nodes + 1]
+        positions = np.repeat(np.arange(len(nodes)), ends - starts)
+        elements = self.node_elements[_ranges(starts, ends)]
+        starts, ends = self.element_starts[elements], self.element_starts[elements + 1]
+        return np.repeat(positions, ends - starts), self.element_nodes[_ranges(starts, ends)]
+
+    def levels(self, start: int, seen: np.ndarray, stamp: int) -> list[np.ndarray]:
+        """
+        The breadth first levels from start, marking the nodes reached with stamp in seen.
+        """
+        level = np.array([start])
+        seen[start] = stamp
+        levels = []
+        while len(level):
+            levels.append(level)
+            _, reached = self.neighbours(level)
+            level = np.unique(reached[seen[reached] != stamp])
+            seen[level] = stamp
+        return levels
+
+    def peripheral_node(self, start: int, seen: np.ndarray, stamp: int) -> tuple[int, int]:
+        """
+        A node far from the others of the component of start, found by repeatedly
+        restarting from a lowest degree node of the last level, and the next free stamp.
+        """
+        eccentricity = -1
+        while True:
+            levels = self.levels(start, seen, stamp)
+            stamp += 1
+            if len(levels) <= eccentricity:
+                return start, stamp
+            eccentricity = len(levels)
+            last = levels[-1]
+            start = int(last[np.argmin(self.degree[last])])
+
+
+def reverse_cuthill_mckee(connectivities: list[np.ndarray], count: int) -> np.ndarray:
+    """
+    The node rows 0..count-1 of elements given by their connectivity in node rows, in
+    reverse Cuthill-McKee order. Each connected component is started from a pseudo
+    peripheral node, and nodes without elements come last.
+    """
+    graph = NodeGraph(connectivities, count)
+    visited = np.zeros(count, dtype=bool)
+    seen = np.full(count, -1, dtype=np.int64)
+    stamp = 0
+    by_degree = np.argsort(graph.degree, kind="stable")
+    by_degree = by_degree[graph.degree[by_degree] > 0]
+    order = []
+    while True:
+        by_degree = by_degree[~visited[by_degree]]
+        if not len(by_degree):
+            break
+        start, stamp = graph.peripheral_node(int(by_degree[0]), seen, stamp)
+        level = np.array([start])
+        visited[start] = True
+        while len(level):
+            order.append(level)
+            positions, reached = graph.neighbours(level)
+            new = ~visited[reached]
+            positions, reached = positions[new], reached[new]
+            # positions do not decrease, so the first occurrence of a node is its first parent
+            reached, first = np.unique(reached, return_index=True)
+            # children in the order of their parents, then by increasing degree
+            level = reached[np.lexsort((reached, graph.degree[reached], positions[first]))]
+            visited[level] = True
+    ordered = np.concatenate(order)[::-1] if order else np.zeros(0, dtype=np.int64)
+    return np.concatenate([ordered, np.flatnonzero(~visited)])
+
+
+def bandwidth(connectivities: list[np.ndarray]) -> int:
+    """
+    The largest difference of two node rows of the same element.
+    """
+    return max((int((c.max(axis=1) - c.min(axis=1)).max()) for c in connectivities if len(c)), default=0)
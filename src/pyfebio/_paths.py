@@ -0,0 +1,33 @@
+import re
+
+_PATH_TOKEN = re.compile(r"\.?([A-Za-z_]\w*)|\[(-?\d+)\]")
+
+
+def parse_path(path: str) -> list[str | int]:
+    """
+    Split a field path such as ``material_.all_materials[0].E`` into attribute names
+    and list indices.
+    """
+    steps: list[str | int] = []
+    position = 0
+    while position < len(path):
+        match = _PATH_TOKEN.match(path, position)
+        if match is None or (position == 0 and path.startswith(".")):
+            raise ValueError(f"invalid field path {path!r} at position {position}")
+        name, index = match.groups()
+        steps.append(name if name is not None else int(index))
+        position = match.end()
+    if not steps:
+        raise ValueError("empty field path")
+    return steps
+
+
+def get_step(parent, step: str | int):
+    return parent[step] if isinstance(step, int) else getattr(parent, step)
+
+
+def set_step(parent, step: str | int, value):
+    if isinstance(step, int):
+        parent[step] = value
+    else:
+        setattr(parent, step, value)
@@ -1,6 +1,24 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from pydantic import StringConstraints
+import numpy as np
+from pydantic import BeforeValidator, PlainSerializer, StringConstraints
+
+from ._xml import STREAMED_ROWS
+
+
+def int_from_str(value):
+    # xml text is read back as str, which pydantic does not coerce for int Literals
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    return value
+
+
+Flag = Annotated[Literal[0, 1], BeforeValidator(int_from_str)]
+
+Zero = Annotated[Literal[0], BeforeValidator(int_from_str)]
 
 StringFloatVec = Annotated[
     str,
@@ -93,3 +111,34 @@ StringUIntVec27 = Annotated[
     str,
     StringConstraints(strip_whitespace=True, pattern=r"^" + ",".join([r"\d+"] * 27) + r"$"),
 ]
+
+
+def _as_float_array(value) -> np.ndarray:
+    return np.ascontiguousarray(value, dtype=np.float64)
+
+
+def _as_int_array(value) -> np.ndarray:
+    array = np.asarray(value)
+    if array.size and array.dtype.kind not in "iu":
+        raise ValueError(f"expected an integer array but got dtype {array.dtype}")
+    return np.ascontiguousarray(array, dtype=np.int64)
+
+
+def _dump_array(array: np.ndarray) -> list | None:
+    # arrays are written by their model's xml serializer, so skip the copy while streaming
+    if STREAMED_ROWS.get() is not None:
+        return None
+    return array.tolist()
+
+
+FloatArray = Annotated[
+    np.ndarray,
+    BeforeValidator(_as_float_array),
+    PlainSerializer(_dump_array, when_used="json"),
+]
+
+IntArray = Annotated[
+    np.ndarray,
+    BeforeValidator(_as_int_array),
+    PlainSerializer(_dump_array, when_used="json"),
+]
@@ -0,0 +1,232 @@
+from collections.abc import Sequence
+from contextvars import ContextVar
+from pathlib import Path
+
+import numpy as np
+from lxml import etree
+from pydantic import BaseModel
+from pydantic_xml import BaseXmlModel
+from pydantic_xml.element import XmlElementWriter
+
+ENCODING = "ISO-8859-1"
+INDENT = b"  "
+CHUNK_SIZE = 65536
+
+# While set, array-backed rows are not expanded into the xml tree. A marker element
+# referring to an entry of this list is written instead and the rows are streamed
+# straight to the file by save_xml.
+STREAMED_ROWS: ContextVar[list[tuple[str, np.ndarray, np.ndarray]] | None] = ContextVar("STREAMED_ROWS", default=None)
+STREAM_TAG = "pyfebio-streamed-rows"
+VERBATIM_TAG = "pyfebio-verbatim"
+
+# a top level section written as is: either a (path, start, end) byte range of a file or
+# the serialized section itself
+Verbatim = tuple[Path, int, int] | bytes
+
+
+def format_rows(values: np.ndarray) -> list[str]:
+    return [",".join(map(str, row)) for row in values.tolist()]
+
+
+def parse_rows(texts: list[str], dtype: type, width: int) -> np.ndarray:
+    if not texts:
+        return np.zeros((0, width), dtype=dtype)
+    values = np.array(",".join(texts).split(","), dtype=dtype)
+    if values.size != len(texts) * width:
+        raise ValueError(f"expected {width} comma separated values per row")
+    return values.reshape(-1, width)
+
+
+def write_rows(element: XmlElementWriter, tag: str, ids: np.ndarray, values: np.ndarray):
+    streamed = STREAMED_ROWS.get()
+    if streamed is not None and len(ids):
+        marker = element.make_element(STREAM_TAG, nsmap=None)
+        marker.set_attribute("index", str(len(streamed)))
+        streamed.append((tag, ids, values))
+        element.append_element(marker)
+        return
+    for row_id, text in zip(ids.tolist(), format_rows(values)):
+        row = element.make_element(tag, nsmap=None)
+        row.set_attribute("id", str(row_id))
+        row.set_text(text)
+        element.append_element(row)
+
+
+def _pretty_bytes(element: etree._Element, level: int) -> bytes:
+    # nest the element in throwaway parents so libxml2 indents it exactly as it
+    # would inside the full document, then cut the parents away again
+    wrapped = element
+    for _ in range(level):
+        parent = etree.Element("_")
+        parent.append(wrapped)
+        wrapped = parent
+    xml = etree.tostring(wrapped, pretty_print=True, encoding=ENCODING, xml_declaration=False)
+    head = sum(len(INDENT * i + b"<_>\n") for i in range(level))
+    tail = sum(len(INDENT * i + b"</_>\n") for i in range(level))
+    return xml[head : len(xml) - tail]
+
+
+def _stream_rows(fid, tag: str, ids: np.ndarray, values: np.ndarray, level: int):
+    indent = (INDENT * level).decode()
+    for start in range(0, len(ids), CHUNK_SIZE):
+        stop = start + CHUNK_SIZE
+        rows = zip(ids[start:stop].tolist(), format_rows(values[start:stop]))
+        fid.write("".join(f'{indent}<{tag} id="{row_id}">{text}</{tag}>\n' for row_id, text in rows).encode(ENCODING))
+
+
+def _copy_verbatim(fid, source: Verbatim, level: int):
+    fid.write(INDENT * level)
+    if isinstance(source, bytes):
+        fid.write(source)
+    else:
+        path, start, end = source
+        with open(path, "rb") as section:
+            section.seek(start)
+            remaining = end - start
+            while remaining:
+                chunk = section.read(min(remaining, 16 * CHUNK_SIZE))
+                if not chunk:
+                    raise ValueError(f"{path} changed since it was loaded")
+                fid.write(chunk)
+                remaining -= len(chunk)
+    fid.write(b"\n")
+
+
+def _insert_verbatim(root: etree._Element, verbatim: dict[str, Verbatim], order: Sequence[str]):
+    rank = {tag: i for i, tag in enumerate(order)}
+
+    def section_rank(child: etree._Element) -> int:
+        return rank.get(child.get("tag") if child.tag == VERBATIM_TAG else child.tag, len(order))
+
+    sections = []
+    for tag, source in verbatim.items():
+        later = (i for i, child in enumerate(root) if section_rank(child) > rank[tag])
+        position = next(later, len(root))
+        marker = etree.Element(VERBATIM_TAG, tag=tag, index=str(len(sections)))
+        root.insert(position, marker)
+        sections.append(source)
+    return sections
+
+
+def _write_element(xf, fid, element: etree._Element, level: int, streamed: list):
+    if element.find(f".//{STREAM_TAG}") is None:
+        xf.flush()
+        fid.write(_pretty_bytes(element, level))
+    else:
+        _write_open_element(xf, fid, element, level, streamed)
+
+
+def _write_open_element(xf, fid, element: etree._Element, level: int, streamed: list, verbatim: list | None = None):
+    xf.flush()
+    fid.write(INDENT * level)
+    with xf.element(element.tag, dict(element.attrib)):
+        xf.flush()
+        fid.write(b"\n")
+        for child in list(element):
+            if child.tag == STREAM_TAG:
+                _stream_rows(fid, *streamed[int(child.get("index"))], level + 1)
+            elif child.tag == VERBATIM_TAG:
+                xf.flush()
+                _copy_verbatim(fid, verbatim[int(child.get("index"))], level + 1)
+            else:
+                _write_element(xf, fid, child, level + 1, streamed)
+        xf.flush()
+        fid.write(INDENT * level)
+    xf.flush()
+    fid.write(b"\n")
+
+
+def fingerprint(value, digest) -> None:
+    """
+    Feed a structural description of value into the hashlib object digest. Models are
+    walked field by field and arrays are hashed from their buffers, which is much cheaper
+    than serializing them.
+    """
+    if isinstance(value, BaseModel):
+        digest.update(f"<{type(value).__module__}.{type(value).__qualname__}".encode())
+        for key, item in value.__dict__.items():
+            digest.update(f"{len(key)}:{key}".encode())
+            fingerprint(item, digest)
+        digest.update(b">")
+    elif isinstance(value, np.ndarray):
+        digest.update(f"[{value.dtype.str}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).data)
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"[{len(value)}".encode())
+        for item in value:
+            fingerprint(item, digest)
+    else:
+        text = repr(value)
+        digest.update(f"{len(text)}:{text}".encode())
+
+
+def render_sections(model: BaseXmlModel) -> dict[str, bytes | None]:
+    """
+    Serialize the top level sections of model by tag, each exactly as ``write_xml`` puts it
+    at the first indentation level, minus the leading indent and the trailing newline.
+    Sections holding array-backed rows map to None instead, since ``write_xml`` streams
+    them to the file without holding them in memory.
+    """
+    streamed: list[tuple[str, np.ndarray, np.ndarray]] = []
+    token = STREAMED_ROWS.set(streamed)
+    try:
+        root = model.to_xml_tree(skip_empty=True)
+    finally:
+        STREAMED_ROWS.reset(token)
+    sections: dict[str, bytes | None] = {}
+    for child in root:
+        if child.find(f".//{STREAM_TAG}") is None:
+            sections[child.tag] = _pretty_bytes(child, 1)[len(INDENT) : -1]
+        else:
+            sections[child.tag] = None
+    return sections
+
+
+def write_xml(
+    model: BaseXmlModel,
+    fid,
+    verbatim: dict[str, Verbatim] | None = None,
+    order: Sequence[str] = (),
+    comment: str | None = None,
+):
+    """
+    Write model to the binary file object fid, as described in ``save_xml``. comment is
+    placed as the first child of the root element.
+    """
+    streamed: list[tuple[str, np.ndarray, np.ndarray]] = []
+    token = STREAMED_ROWS.set(streamed)
+    try:
+        root = model.to_xml_tree(skip_empty=True)
+    finally:
+        STREAMED_ROWS.reset(token)
+    sections = _insert_verbatim(root, verbatim, order) if verbatim else []
+    if comment is not None:
+        root.insert(0, etree.Comment(comment))
+    if len(root) == 0:
+        fid.write(etree.tostring(root, pretty_print=True, encoding=ENCODING, xml_declaration=True))
+        return
+    with etree.xmlfile(fid, encoding=ENCODING) as xf:
+        xf.write_declaration()
+        _write_open_element(xf, fid, root, 0, streamed, sections)
+
+
+def save_xml(
+    model: BaseXmlModel,
+    filename: str | Path,
+    verbatim: dict[str, Verbatim] | None = None,
+    order: Sequence[str] = (),
+    comment: str | None = None,
+):
+    """
+    Write model to filename as pretty printed xml, byte-identical to
+    ``model.to_xml(pretty_print=True, encoding=ENCODING, xml_declaration=True, skip_empty=True)``.
+
+    Array-backed mesh rows are streamed to the file in chunks of CHUNK_SIZE, and all other
+    content is written one section at a time, so memory stays bounded by the largest
+    non-array section instead of the document size.
+
+    verbatim maps top level section tags to content that is written unchanged, placed
+    among the other sections by their position in order.
+    """
+    with open(filename, "wb") as fid:
+        write_xml(model, fid, verbatim, order, comment)
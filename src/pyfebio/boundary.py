@@ -3,6 +3,7 @@ from typing import Literal
 from pydantic_xml import BaseXmlModel, attr, element
 
 from ._types import (
+    Flag,
     StringFloatVec3,
     StringFloatVec9,
 )
@@ -16,9 +17,9 @@ class Value(BaseXmlModel, validate_assignment=True):
 class BCZeroDisplacement(BaseXmlModel, tag="bc", validate_assignment=True):
     type: Literal["zero displacement"] = attr(default="zero displacement", frozen=True)
     node_set: str = attr()
-    x_dof: Literal[0, 1] = element(default=0)
-    y_dof: Literal[0, 1] = element(default=0)
-    z_dof: Literal[0, 1] = element(default=0)
+    x_dof: Flag = element(default=0)
+    y_dof: Flag = element(default=0)
+    z_dof: Flag = element(default=0)
 
 
 class BCZeroShellDisplacement(BaseXmlModel, tag="bc", validate_assignment=True):
@@ -26,9 +27,9 @@ class BCZeroShellDisplacement(BaseXmlModel, tag="bc", validate_assignment=True):
         default="zero shell displacement", frozen=True
     )
     node_set: str = attr()
-    sx_dof: Literal[0, 1] = element(default=0)
-    sy_dof: Literal[0, 1] = element(default=0)
-    sz_dof: Literal[0, 1] = element(default=0)
+    sx_dof: Flag = element(default=0)
+    sy_dof: Flag = element(default=0)
+    sz_dof: Flag = element(default=0)
 
 
 class BCZeroFluidPressure(BaseXmlModel, tag="bc", validate_assignment=True):
@@ -45,7 +46,7 @@ class BCPrescribedDisplacement(BaseXmlModel, tag="bc", validate_assignment=True)
     node_set: str = attr()
     dof: Literal["x", "y", "z"] = element()
     value: Value = element()
-    relative: Literal[0, 1] = element(default=0)
+    relative: Flag = element(default=0)
 
 
 class BCPrescribedShellDisplacement(BaseXmlModel, tag="bc", validate_assignment=True):
@@ -55,7 +56,7 @@ class BCPrescribedShellDisplacement(BaseXmlModel, tag="bc", validate_assignment=
     node_set: str = attr()
     dof: Literal["sx", "sy", "sz"] = element()
     value: Value = element()
-    relative: Literal[0, 1] = element(default=0)
+    relative: Flag = element(default=0)
 
 
 class BCPrescribedFluidPressure(BaseXmlModel, tag="bc", validate_assignment=True):
@@ -64,7 +65,7 @@ class BCPrescribedFluidPressure(BaseXmlModel, tag="bc", validate_assignment=True
     )
     node_set: str = attr()
     value: Value = element()
-    relative: Literal[0, 1] = element(default=0)
+    relative: Flag = element(default=0)
 
 
 class BCPrescribedDeformation(BaseXmlModel, tag="bc", validate_assignment=True):
@@ -72,7 +73,7 @@ class BCPrescribedDeformation(BaseXmlModel, tag="bc", validate_assignment=True):
     node_set: str = attr()
     scale: Value = element()
     F: StringFloatVec9 = element(default="1.0,0.0,0.0,0.0,1.0,0.0,0.0,0.0,1.0")
-    relative: Literal[0, 1] = element(default=0)
+    relative: Flag = element(default=0)
 
 
 class BCRigid(BaseXmlModel, tag="bc", validate_assignment=True):
@@ -86,7 +87,7 @@ class BCRigidDeformation(BaseXmlModel, tag="bc", validate_assignment=True):
     node_set: str = attr()
     pos: StringFloatVec3 = element(default="0.0,0.0,0.0")
     rot: Value = element()
-    relative: Literal[0, 1] = element(default=0)
+    relative: Flag = element(default=0)
 
 
 class BCNormalDisplacement(BaseXmlModel, tag="bc", validate_assignment=True):
@@ -95,7 +96,7 @@ class BCNormalDisplacement(BaseXmlModel, tag="bc", validate_assignment=True):
     )
     surface: str = attr()
     scale: Value = element()
-    surface_hint: Literal[0, 1] = element(default=0)
+    surface_hint: Flag = element(default=0)
 
 
 BoundaryConditionType = (
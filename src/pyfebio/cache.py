@@ -0,0 +1,286 @@
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+_INCLUDE = re.compile(rb"<Include\s*>\s*([^<]*?)\s*</Include>")
+_OUTPUT_FILE = re.compile(
+    rb"<(?:logfile|plotfile|node_data|element_data|face_data|rigid_body_data|rigid_connector_data)\b[^>]*?\sfile=\"([^\"]+)\""
+)
+_DEFAULT_OUTPUTS = (".log", ".xplt")
+
+# resolved include path -> ((size, mtime_ns), sha256 of its content, its tags), so the
+# shared mesh include of many variants is read once
+_include_digests: dict[Path, tuple[tuple[int, int], bytes, bytes]] = {}
+_MAX_INCLUDE_DIGESTS = 1024
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+    entries: int = 0
+    size: int = 0
+
+
+def _hash_file(filepath: Path, digest) -> bytes:
+    """
+    Feed the content of filepath into digest and return it for further scanning.
+    """
+    with open(filepath, "rb") as fid:
+        if os.fstat(fid.fileno()).st_size == 0:
+            return b""
+        with mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            digest.update(data)
+            return _scan(data)
+
+
+def _scan(data) -> bytes:
+    # only the tags the key and output lookup care about are kept around
+    return b"\n".join(match.group(0) for pattern in (_INCLUDE, _OUTPUT_FILE) for match in pattern.finditer(data))
+
+
+def _include_digest(include: Path) -> tuple[bytes, bytes]:
+    """
+    The sha256 and the tags of an include file, remembered while its size and
+    modification time stay the same.
+    """
+    stat = include.stat()
+    signature = (stat.st_size, stat.st_mtime_ns)
+    memo = _include_digests.get(include)
+    if memo is not None and memo[0] == signature:
+        return memo[1], memo[2]
+    digest = hashlib.sha256()
+    tags = _hash_file(include, digest)
+    if len(_include_digests) >= _MAX_INCLUDE_DIGESTS:
+        _include_digests.clear()
+    _include_digests[include] = (signature, digest.digest(), tags)
+    return digest.digest(), tags
+
+
+def _hash_input(filepath: Path, digest) -> bytes:
+    """
+    Feed the content of filepath, and the digests of the files it includes, recursively,
+    into digest and return the tags of filepath kept by ``_scan``.
+    """
+    root_tags = _hash_file(filepath, digest)
+    pending = [(filepath.parent, root_tags)]
+    seen = {filepath.resolve()}
+    while pending:
+        directory, tags = pending.pop()
+        for reference in _INCLUDE.findall(tags):
+            include = (directory / reference.decode()).resolve()
+            digest.update(b"\0" + reference + b"\0")
+            if include in seen or not include.is_file():
+                continue
+            seen.add(include)
+            include_digest, include_tags = _include_digest(include)
+            digest.update(include_digest)
+            pending.append((include.parent, include_tags))
+    return root_tags
+
+
+def input_hash(filepath: str | Path) -> str:
+    """
+    The sha256 of the content of an input file and the files it includes.
+    """
+    digest = hashlib.sha256()
+    _hash_input(Path(filepath), digest)
+    return digest.hexdigest()
+
+
+def write_atomic(path: Path, text: str):
+    """
+    Replace the content of path with text, so readers see either the old or the new file.
+    """
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+    try:
+        with os.fdopen(descriptor, "w") as fid:
+            fid.write(text)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def febio_identity(executable: str = "febio4") -> str:
+    """
+    A string that changes whenever the FEBio executable does: its resolved path, size and
+    modification time.
+    """
+    resolved = shutil.which(executable)
+    if resolved is None:
+        return executable
+    stat = os.stat(resolved)
+    return f"{os.path.realpath(resolved)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class ResultCache:
+    """
+    On-disk cache of FEBio outputs, keyed by the content of the input file, the files it
+    includes and the FEBio version.
+
+    After a successful run, ``store`` copies the outputs (the .log and .xplt named after
+    the input, and any file named in its Output section) into directory. ``restore`` copies
+    them back for any input with the same key, so the run can be skipped. The least
+    recently used entries are evicted once the cache grows beyond max_bytes.
+
+    Included files are hashed again only when their size or modification time changes.
+
+    febio_version defaults to ``febio_identity(executable)``.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = 10 * 1024**3,
+        febio_version: str | None = None,
+        executable: str = "febio4",
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.febio_version = febio_version if febio_version is not None else febio_identity(executable)
+        self._stats = CacheStats()
+        # running size of the entries, counted from the directory when first needed
+        self._size: int | None = None
+
+    def _key(self, filepath: Path) -> tuple[str, list[str]]:
+        digest = hashlib.sha256(self.febio_version.encode())
+        digest.update(b"\0")
+        root_tags = _hash_input(filepath, digest)
+        outputs = [filepath.stem + suffix for suffix in _DEFAULT_OUTPUTS]
+        for name in _OUTPUT_FILE.findall(root_tags):
+            # outputs outside the input's directory are not cached
+            relative = Path(name.decode())
+            if not relative.is_absolute() and ".." not in relative.parts:
+                outputs.append(relative.as_posix())
+        return digest.hexdigest(), list(dict.fromkeys(outputs))
+
+    def key(self, filepath: str | Path) -> str:
+        return self._key(Path(filepath))[0]
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def restore(self, filepath: str | Path) -> bool:
+        """
+        Copy the cached outputs for filepath next to it. Returns False on a miss.
+        """
+        filepath = Path(filepath)
+        entry = self._entry(self.key(filepath))
+        try:
+            meta = json.loads((entry / "meta.json").read_text())
+        except (OSError, ValueError):
+            self._stats.misses += 1
+            return False
+        copied = []
+        try:
+            for name in meta["outputs"]:
+                target = name
+                if name.startswith(meta["stem"] + "."):
+                    target = filepath.stem + name[len(meta["stem"]) :]
+                (filepath.parent / target).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(entry / "files" / name, filepath.parent / target)
+                copied.append(filepath.parent / target)
+        except OSError:
+            # the entry was evicted meanwhile; a partial set of outputs is not left behind
+            for path in copied:
+                path.unlink(missing_ok=True)
+            self._stats.misses += 1
+            return False
+        meta["last_used"] = time.time()
+        # replaced atomically, so a concurrent evict or restore never reads it half written;
+        # the outputs are all restored even if the entry is evicted now
+        with contextlib.suppress(OSError):
+            write_atomic(entry / "meta.json", json.dumps(meta))
+        self._stats.hits += 1
+        self._stats.bytes_saved += meta["size"]
+        return True
+
+    def store(self, filepath: str | Path):
+        """
+        Copy the outputs of a finished run of filepath into the cache.
+        """
+        filepath = Path(filepath)
+        key, names = self._key(filepath)
+        entry = self._entry(key)
+        if entry.exists():
+            return
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=entry.parent, prefix=".staging-"))
+        outputs, size = [], 0
+        for name in names:
+            source = filepath.parent / name
+            if source.is_file():
+                (staging / "files" / name).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(source, staging / "files" / name)
+                outputs.append(name)
+                size += source.stat().st_size
+        meta = {"stem": filepath.stem, "outputs": outputs, "size": size, "last_used": time.time()}
+        (staging / "meta.json").write_text(json.dumps(meta))
+        try:
+            staging.rename(entry)
+        except OSError:
+            # another process stored the same key first
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        if self._size is not None:
+            self._size += size
+        self.evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for meta_file in self.directory.glob("??/*/meta.json"):
+            try:
+                meta = json.loads(meta_file.read_text())
+            except (OSError, ValueError):
+                continue
+            entries.append((meta["last_used"], meta["size"], meta_file.parent))
+        return entries
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits in max_bytes.
+
+        The entries are only listed when the running size kept by this instance exceeds
+        max_bytes, which also recounts entries stored by other processes.
+        """
+        if self._size is not None and self._size <= self.max_bytes:
+            return
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+        self._size = total
+
+    def stats(self) -> CacheStats:
+        """
+        Hits, misses and bytes restored by this instance, plus the current entry count and
+        size of the cache directory.
+        """
+        entries = self._entries()
+        self._size = sum(size for _, size, _ in entries)
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            bytes_saved=self._stats.bytes_saved,
+            entries=len(entries),
+            size=self._size,
+        )
+
+    def clear(self):
+        for _, _, entry in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+        self._size = 0
@@ -2,38 +2,40 @@ from typing import Literal
 
 from pydantic_xml import BaseXmlModel, attr, element
 
+from ._types import Flag, Zero
+
 
 class SlidingBase(BaseXmlModel, validate_assignment=True):
     name: str | None = attr(default=None)
     surface_pair: str = attr()
     laugon: Literal["PENALTY", "AUGLAG"] = element(default="PENALTY")
-    two_pass: Literal[0, 1] = element(default=0)
+    two_pass: Flag = element(default=0)
     penalty: float = element(default=1.0)
-    auto_penalty: Literal[0, 1] = element(default=0)
-    update_penalty: Literal[0, 1] = element(default=0)
+    auto_penalty: Flag = element(default=0)
+    update_penalty: Flag = element(default=0)
     tolerance: float = element(default=0.01)
-    gaptol: Literal[0] | float = element(default=0)
+    gaptol: Zero | float = element(default=0)
     minaug: int = element(default=0)
     maxaug: int = element(default=10)
     search_tol: float = element(default=0.01)
-    search_radius: Literal[0] | float = element(default=0)
+    search_radius: Zero | float = element(default=0)
     knmult: float = element(default=1.0)
     seg_up: int = element(default=0)
-    node_reloc: Literal[0, 1] = element(default=0)
+    node_reloc: Flag = element(default=0)
 
 
 class SlidingElastic(SlidingBase):
     type: Literal["sliding-elastic"] = attr(default="sliding-elastic")
-    symmetric_stiffness: Literal[0, 1] = element(default=1)
+    symmetric_stiffness: Flag = element(default=1)
     smooth_aug: int = element(default=0)
-    tension: Literal[0, 1] = element(default=0)
-    fric_coeff: Literal[0] | float = element(default=0)
-    flip_primary: Literal[0, 1] = element(default=0)
-    flip_secondary: Literal[0, 1] = element(default=0)
-    shell_bottom_primary: Literal[0, 1] = element(default=0)
-    shell_bottom_secondary: Literal[0, 1] = element(default=0)
-    search_radius: Literal[0] | float = element(default=1)
-    offset: Literal[0] | float = element(default=0)
+    tension: Flag = element(default=0)
+    fric_coeff: Zero | float = element(default=0)
+    flip_primary: Flag = element(default=0)
+    flip_secondary: Flag = element(default=0)
+    shell_bottom_primary: Flag = element(default=0)
+    shell_bottom_secondary: Flag = element(default=0)
+    search_radius: Zero | float = element(default=1)
+    offset: Zero | float = element(default=0)
 
 
 class SlidingFacetOnFacet(SlidingBase):
@@ -43,9 +45,9 @@ class SlidingFacetOnFacet(SlidingBase):
 
 class SlidingNodeOnFacet(SlidingBase):
     type: Literal["sliding-node-on-facet"] = attr(default="sliding-node-on-facet")
-    fric_coeff: Literal[0] | float = element(default=0)
-    fric_penalty: Literal[0] | float = element(default=0)
-    ktmult: Literal[0] | float = element(default=0)
+    fric_coeff: Zero | float = element(default=0)
+    fric_penalty: Zero | float = element(default=0)
+    ktmult: Zero | float = element(default=0)
 
 
 SlidingContactType = SlidingElastic | SlidingFacetOnFacet | SlidingNodeOnFacet
@@ -63,28 +65,28 @@ class ContactPotential(BaseXmlModel, validate_assignment=True):
 
 class SlidingBiphasic(SlidingBase):
     type: Literal["sliding-biphasic"] = attr(default="sliding-biphasic")
-    ptol: Literal[0] | float = element(default=0)
+    ptol: Zero | float = element(default=0)
     pressure_penalty: float = element(default=1)
-    symmetric_stiffness: Literal[0, 1] = element(default=1)
-    fric_coeff: Literal[0] | float = element(default=0)
+    symmetric_stiffness: Flag = element(default=1)
+    fric_coeff: Zero | float = element(default=0)
     contact_frac: float = element(default=0.0)
     smooth_aug: int = element(default=0)
     smooth_fls: int = element(default=0)
-    search_radius: Literal[0] | float = element(default=1)
-    flip_primary: Literal[0, 1] = element(default=0)
-    flip_secondary: Literal[0, 1] = element(default=0)
-    shell_bottom_primary: Literal[0, 1] = element(default=0)
-    shell_bottom_secondary: Literal[0, 1] = element(default=0)
+    search_radius: Zero | float = element(default=1)
+    flip_primary: Flag = element(default=0)
+    flip_secondary: Flag = element(default=0)
+    shell_bottom_primary: Flag = element(default=0)
+    shell_bottom_secondary: Flag = element(default=0)
 
 
 class Sliding2(SlidingBase):
     type: Literal["sliding2"] = attr(default="sliding2")
-    ptol: Literal[0] | float = element(default=0)
+    ptol: Zero | float = element(default=0)
     pressure_penalty: float = element(default=1)
-    symmetric_stiffness: Literal[0, 1] = element(default=1)
-    search_radius: Literal[0] | float = element(default=1)
+    symmetric_stiffness: Flag = element(default=1)
+    search_radius: Zero | float = element(default=1)
     smooth_aug: int = element(default=0)
-    dual_proj: Literal[0, 1] = element(default=1)
+    dual_proj: Flag = element(default=1)
 
 
 SlidingBiphasicContactType = SlidingBiphasic | Sliding2
@@ -103,13 +105,13 @@ class TiedBase(BaseXmlModel, validate_assignment=True):
 
 class TiedElastic(TiedBase):
     type: Literal["tied-elastic"] = attr(default="tied-elastic", frozen=True)
-    auto_penalty: Literal[0, 1] = element(default=0)
-    update_penalty: Literal[0, 1] = element(default=0)
-    two_pass: Literal[0, 1] = element(default=0)
+    auto_penalty: Flag = element(default=0)
+    update_penalty: Flag = element(default=0)
+    two_pass: Flag = element(default=0)
     search_tol: float = element(default=0.01)
     search_radius: float = element(default=1)
     gaptol: float = element(default=-1)
-    symmetric_stiffness: Literal[0, 1] = element(default=1)
+    symmetric_stiffness: Flag = element(default=1)
 
 
 class TiedFacetOnFacet(TiedBase):
@@ -118,7 +120,7 @@ class TiedFacetOnFacet(TiedBase):
     )
     tolerance: float = element(default=0.01)
     search_tolerance: float = element(default=0.0001)
-    gap_offset: Literal[0, 1] = element(default=0)
+    gap_offset: Flag = element(default=0)
 
 
 class TiedNodeOnFacet(TiedBase):
@@ -127,24 +129,24 @@ class TiedNodeOnFacet(TiedBase):
     )
     tolerance: float = element(default=0.01)
     search_tolerance: float = element(default=0.0001)
-    offset_shells: Literal[0, 1] = element(default=0)
-    max_distance: Literal[0] | float = element(deafult=0)
-    special: Literal[0, 1] = element(default=1)
-    node_reloc: Literal[0, 1] = element(default=0)
+    offset_shells: Flag = element(default=0)
+    max_distance: Zero | float = element(deafult=0)
+    special: Flag = element(default=1)
+    node_reloc: Flag = element(default=0)
 
 
 class TiedBiphasic(TiedBase):
     type: Literal["tied-biphasic"] = attr(default="tied-biphasic", frozen=True)
     gaptol: float = element(default=-1)
     ptol: float = element(default=-1)
-    auto_penalty: Literal[0, 1] = element(default=0)
-    update_penalty: Literal[0, 1] = element(default=0)
-    two_pass: Literal[0, 1] = element(default=0)
+    auto_penalty: Flag = element(default=0)
+    update_penalty: Flag = element(default=0)
+    two_pass: Flag = element(default=0)
     search_tol: float = element(default=0.01)
     search_radius: float = element(default=1)
     knmult: float = element(default=1)
     pressure_penalty: float = element(default=1)
-    symmetric_stiffness: Literal[0, 1] = element(default=1)
+    symmetric_stiffness: Flag = element(default=1)
 
 
 ContactType = (
@@ -2,6 +2,8 @@ from typing import Literal
 
 from pydantic_xml import BaseXmlModel, attr, element
 
+from ._types import Flag
+
 
 class TimeStepValue(BaseXmlModel, validate_assignment=True):
     lc: int | None = attr(default=None)
@@ -14,9 +16,9 @@ class TimeStepper(BaseXmlModel, validate_assignment=True):
     opt_iter: int = element(default=11, ge=0)
     dtmin: float = element(default=0.0, ge=0.0)
     dtmax: TimeStepValue = element(default=TimeStepValue())
-    aggressiveness: Literal[0, 1] = element(default=0)
+    aggressiveness: Flag = element(default=0)
     cutback: float = element(default=0.5, ge=0.0, le=1.0)
-    dtforce: Literal[0, 1] = element(default=0)
+    dtforce: Flag = element(default=0)
 
 
 class LinearSolver(BaseXmlModel, validate_assignment=True):
@@ -27,7 +29,7 @@ class QuasiNewtonMethod(BaseXmlModel, validate_assignment=True):
     type: Literal["BFGS", "Broyden", "Full Newton", "JFNK", "Modified Newton"] = attr(default="BFGS")
     max_ups: int = element(default=10, ge=0)
     max_buffer_size: int = element(default=0, ge=0)
-    cycle_buffer: Literal[0, 1] = element(default=1)
+    cycle_buffer: Flag = element(default=1)
     cmax: float = element(default=1.0e5)
 
 
@@ -49,13 +51,13 @@ class Solver(BaseXmlModel, validate_assignment=True, skip_empty=True):
     lsmin: float = element(default=0.01, gt=0)
     lsiter: int = element(default=5, ge=0)
     max_refs: int = element(default=15, ge=0)
-    diverge_reform: Literal[0, 1] = element(default=1)
+    diverge_reform: Flag = element(default=1)
     min_residual: float = element(default=1e-20, gt=0.0)
     qn_method: QuasiNewtonMethod = element(default=QuasiNewtonMethod())
     symmetric_stiffness: Literal["symmetric", "non-symmetric", "symmetric-structure"] = element(default="non-symmetric")
     equation_scheme: Literal["staggered", "block"] = element(default="staggered")
     equation_order: Literal["default", "reverse", "febio2"] = element(default="default")
-    optimize_bw: Literal[0, 1] = element(default=0)
+    optimize_bw: Flag = element(default=0)
     linear_solver: LinearSolver = element(default=LinearSolver())
 
 
@@ -63,7 +65,7 @@ class Control(BaseXmlModel, tag="Control", validate_assignment=True):
     analysis: Literal["STATIC", "DYNAMIC", "STEADY-STATE", "TRANSIENT"] = element(default="STATIC")
     time_steps: int = element(default=10)
     step_size: float = element(default=0.1)
-    plot_zero_state: Literal[0, 1] = element(default=0)
+    plot_zero_state: Flag = element(default=0)
     plot_range: str = element(default="0,-1")
     plot_level: Literal["PLOT_NEVER", "PLOT_MAJOR_ITRS", "PLOT_MINOR_ITRS", "PLOT_MUST_POINTS"] = element(default="PLOT_MAJOR_ITRS")
     output_level: Literal["OUTPUT_NEVER", "OUTPUT_MAJOR_ITRS", "OUTPUT_MINOR_ITRS", "OUTPUT_MUST_POINTS", "OUTPUT_FINAL"] = element(
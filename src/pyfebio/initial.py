@@ -3,6 +3,7 @@ from typing import Literal
 from pydantic_xml import BaseXmlModel, attr, element
 
 from ._types import (
+    Flag,
     StringFloatVec3,
 )
 
@@ -16,8 +17,8 @@ class InitialVelocity(BaseXmlModel, validate_assignment=True):
 class InitialPrestrain(BaseXmlModel, validate_assignment=True):
     type: Literal["prestrain"] = attr(default="prestrain", frozen=True)
     node_set: str = attr()
-    init: Literal[0, 1] = element(default=1)
-    reset: Literal[0, 1] = element(default=1)
+    init: Flag = element(default=1)
+    reset: Flag = element(default=1)
 
 
 class Initial(BaseXmlModel, validate_assignment=True):
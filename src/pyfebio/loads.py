@@ -3,6 +3,7 @@ from typing import Literal
 from pydantic_xml import BaseXmlModel, attr, element
 
 from ._types import (
+    Flag,
     StringFloatVec3,
 )
 
@@ -27,16 +28,16 @@ class TractionLoad(BaseXmlModel, tag="surface_load", validate_assignment=True):
 class PressureLoad(BaseXmlModel, tag="surface_load", validate_assignment=True):
     type: Literal["pressure"] = attr(default="pressure", frozen=True)
     surface: str = attr()
-    symmetric_stiffness: Literal[0, 1] = element(default=0)
-    linear: Literal[0, 1] = element(default=0)
-    shell_bottom: Literal[0, 1] = element(default=0)
+    symmetric_stiffness: Flag = element(default=0)
+    linear: Flag = element(default=0)
+    shell_bottom: Flag = element(default=0)
     pressure: Scale = element()
 
 
 class FluidFlux(BaseXmlModel, tag="surface_load", validate_assignment=True):
     flux: Scale = element()
-    linear: Literal[0, 1] = element(default=0)
-    mixture: Literal[0, 1] = element(default=1)
+    linear: Flag = element(default=0)
+    mixture: Flag = element(default=1)
 
 
 class FluidPressure(BaseXmlModel, tag="surface_load", validate_assignment=True):
@@ -0,0 +1,162 @@
+import mmap
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .output import DataEntry, OutputLogfile
+
+# "Step = 1", "Time = 0.1", "Data = ux;uy;uz", with a leading * in separate data files
+_RECORD = re.compile(rb"^\*?Step\s*=\s*(\d+)[ \t]*\r?\n\*?Time\s*=\s*(\S+)[ \t]*\r?\n\*?Data\s*=\s*([^\r\n]*)\r?\n", re.MULTILINE)
+# the values of a record end at the first blank line or line that is not a number (or nan/inf)
+_RECORD_END = re.compile(rb"^(?:[ \t]*\r?$|[^\s\d+\-.ni])", re.MULTILINE)
+
+ENTRY_KINDS = ("node_data", "element_data", "face_data", "rigid_body_data", "rigid_connector_data")
+
+
+@dataclass
+class LogData:
+    kind: str
+    variables: list[str]
+    step: np.ndarray
+    time: np.ndarray
+    # (n_items,) ids from the first column, empty for entries with a custom format
+    ids: np.ndarray
+    values: np.ndarray
+
+    def __getitem__(self, variable: str) -> np.ndarray:
+        """
+        The (n_steps, n_items) values of one variable.
+        """
+        return self.values[:, :, self.variables.index(variable)]
+
+
+def _records(data) -> list[tuple[int, float, bytes, bytes]]:
+    records = []
+    for match in _RECORD.finditer(data):
+        end = _RECORD_END.search(data, match.end())
+        body = data[match.end() : end.start() if end is not None else len(data)]
+        records.append((int(match.group(1)), float(match.group(2)), match.group(3).strip(), body))
+    return records
+
+
+def _parse(kind: str, entry: DataEntry, records: list[tuple[int, float, bytes, bytes]], source: Path) -> LogData:
+    variables = (records[0][2].decode() if records else entry.data).split(";")
+    has_ids = entry.format is None
+    # converted in one go, like the mesh readers do with node and element rows
+    text = b"\n".join(body for *_, body in records)
+    if entry.delim.strip():
+        text = text.replace(entry.delim.encode(), b" ")
+    values = np.array(text.split(), dtype=np.float64)
+    columns = len(variables) + has_ids
+    rows = values.size // columns if records else 0
+    if values.size != rows * columns or rows % max(len(records), 1):
+        raise ValueError(f"{kind} {entry.data!r} in {source} does not have {columns} values on every row of every step")
+    values = values.reshape(len(records), rows // max(len(records), 1), columns)
+    ids = values[0, :, 0].astype(np.int64) if has_ids and len(records) else np.zeros(0, dtype=np.int64)
+    return LogData(
+        kind=kind,
+        variables=variables,
+        step=np.array([record[0] for record in records], dtype=np.int64),
+        time=np.array([record[1] for record in records]),
+        ids=ids,
+        values=values[:, :, 1:] if has_ids else values,
+    )
+
+
+def _item_ids(text: str | None) -> set[int] | None:
+    """
+    The ids of an item list such as "1,2,5:9:2", or None when the entry asks for all items.
+    """
+    if not text or not text.strip():
+        return None
+    ids: set[int] = set()
+    try:
+        for part in text.replace(" ", "").split(","):
+            bounds = [int(value) for value in part.split(":")]
+            if len(bounds) == 1:
+                ids.add(bounds[0])
+            else:
+                ids.update(range(bounds[0], bounds[1] + 1, bounds[2] if len(bounds) > 2 else 1))
+    except ValueError:
+        return None
+    return ids
+
+
+def _row_ids(body: bytes, delim: str) -> set[int]:
+    rows = body.replace(delim.encode(), b" ").splitlines() if delim.strip() else body.splitlines()
+    try:
+        return {int(float(row.split()[0])) for row in rows if row.strip()}
+    except ValueError:
+        return set()
+
+
+def _record_entry(in_log: list[tuple[str, DataEntry]], grouped: dict[int, list], record, source: Path) -> DataEntry:
+    """
+    The entry a log file record was written for: the one with the same Data header and, if
+    it has an item list, the same item ids in the first column. Entries that still tie, such
+    as a node_data and an element_data asking for the same variables of all items, take the
+    records in turn, in the order FEBio writes them in each output step.
+    """
+    step, _, header, body = record
+    variables = "".join(header.decode().split())
+    candidates = []
+    for _, entry in in_log:
+        if "".join(entry.data.split()) != variables:
+            continue
+        items = _item_ids(entry.text) if entry.format is None else None
+        if items is None or items == _row_ids(body, entry.delim):
+            candidates.append(entry)
+    if not candidates:
+        raise ValueError(f"record 'Data = {header.decode()}' of step {step} in {source} matches no entry of the logfile")
+    return min(candidates, key=lambda entry: len(grouped[id(entry)]))
+
+
+def _read_records(filepath: Path) -> list[tuple[int, float, bytes, bytes]]:
+    with open(filepath, "rb") as fid:
+        if not fid.seek(0, 2):
+            return []
+        with mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _records(data)
+
+
+def read_logfile(logfile: OutputLogfile, filepath: str | Path) -> dict[str, LogData]:
+    """
+    Read the data requested by logfile from the output of a run of the model saved at
+    filepath.
+
+    Entries with a file attribute are read from that file, the others from the data
+    records of the log file (logfile.file, or the .log next to filepath), each matched to
+    its entry by its Data header and item ids; a record matching no entry raises a
+    ValueError. The result is
+    keyed by the file name of an entry, or by its data attribute, with " (2)", " (3)", ...
+    appended to repeated keys. Each LogData holds an (n_steps, n_items, n_vars) array of
+    values with the step numbers and times they were written at.
+
+    Example::
+
+        data = read_logfile(logfile, "model.feb")
+        ux = data["ux;uy;uz"]["ux"]
+    """
+    filepath = Path(filepath)
+    log = filepath.parent / logfile.file if logfile.file else filepath.with_suffix(".log")
+    entries = [(kind, entry) for kind in ENTRY_KINDS for entry in getattr(logfile, kind)]
+    in_log = [(kind, entry) for kind, entry in entries if not entry.file]
+    grouped: dict[int, list] = {id(entry): [] for _, entry in in_log}
+    for record in _read_records(log) if in_log else []:
+        grouped[id(_record_entry(in_log, grouped, record, log))].append(record)
+    result: dict[str, LogData] = {}
+    for kind, entry in entries:
+        if entry.file:
+            source = filepath.parent / entry.file
+            data = _parse(kind, entry, _read_records(source), source)
+        else:
+            data = _parse(kind, entry, grouped[id(entry)], log)
+        key = entry.file or entry.data
+        repeat = 1
+        while key in result:
+            repeat += 1
+            key = f"{entry.file or entry.data} ({repeat})"
+        result[key] = data
+    return result
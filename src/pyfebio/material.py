@@ -1,10 +1,10 @@
 from typing import Annotated, Literal, TypeAlias
 
-from pydantic import AfterValidator, Field, PositiveInt
+from pydantic import AfterValidator, BeforeValidator, Field, PositiveInt
 from pydantic.types import NonNegativeFloat
 from pydantic_xml import BaseXmlModel, attr, element
 
-from ._types import StringFloatVec3, StringFloatVec9
+from ._types import Flag, StringFloatVec3, StringFloatVec9, int_from_str
 
 
 class MaterialAxisVector(BaseXmlModel, validate_assignment=True, extra="forbid"):
@@ -927,7 +927,7 @@ CFDistributionModel: TypeAlias = CFDCircular | CFDSpherical | CFDVonMises3d | CF
 # Continous Fiber Distribution Function Integration Schema
 class GaussKronrodTrapezoidalIntegration(BaseXmlModel, tag="scheme", extra="forbid"):
     type: Literal["fibers-3d-gkt"] = attr(default="fibers-3d-gkt", frozen=True)
-    nph: Literal[7, 11, 15, 19, 23, 27] = element(default=7)
+    nph: Annotated[Literal[7, 11, 15, 19, 23, 27], BeforeValidator(int_from_str)] = element(default=7)
     nth: PositiveInt = element(default=31)
 
 
@@ -1054,7 +1054,7 @@ class InSituStretch(BaseXmlModel, tag="stretch", extra="forbid"):
 class PrestrainInSituStretch(BaseXmlModel, tag="prestrain", extra="forbid"):
     type: Literal["in-situ stretch"] = attr(default="in-situ stretch", frozen=True)
     stretch: InSituStretch = element()
-    ischoric: Literal[0, 1] = element(default=1)
+    ischoric: Flag = element(default=1)
 
 
 class PrestrainRamp(BaseXmlModel, tag="ramp", extra="forbid"):
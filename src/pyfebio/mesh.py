@@ -1,11 +1,26 @@
-from typing import Literal
+import bisect
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any, Literal
 
 import meshio
 import numpy as np
-from pydantic import Field
-from pydantic_xml import BaseXmlModel, attr, element
+from lxml import etree
+from numpy.typing import ArrayLike
+from pydantic import Field, PrivateAttr, model_validator
+from pydantic_xml import (
+    BaseXmlModel,
+    attr,
+    element,
+    xml_field_serializer,
+    xml_field_validator,
+)
+from pydantic_xml.element import XmlElementReader, XmlElementWriter
 
+from ._graph import reverse_cuthill_mckee
 from ._types import (
+    FloatArray,
+    IntArray,
     StringFloatVec3,
     StringUIntVec,
     StringUIntVec2,
@@ -19,10 +34,40 @@ from ._types import (
     StringUIntVec20,
     StringUIntVec27,
 )
+from ._xml import CHUNK_SIZE, format_rows, parse_rows, write_rows
+from .spatial import (
+    BoxTree,
+    PointGrid,
+    Region,
+    as_region,
+    select,
+    triangle_distance,
+    triangles,
+)
 
 SolidFEBioElementType = Literal["tet4", "tet10", "tet15", "hex8", "hex20", "hex27", "penta6"]
 ShellFEBioElementType = Literal["tri3", "tri6", "quad4", "quad8", "quad9", "q4ans", "q4eas"]
 BeamFEBioElementType = Literal["line2", "line3"]
+SurfaceFEBioElementType = Literal["tri3", "tri6", "quad4", "quad8", "quad9"]
+
+ELEMENT_NODE_COUNT: dict[str, int] = {
+    "tet4": 4,
+    "tet10": 10,
+    "tet15": 15,
+    "hex8": 8,
+    "hex20": 20,
+    "hex27": 27,
+    "penta6": 6,
+    "tri3": 3,
+    "tri6": 6,
+    "quad4": 4,
+    "quad8": 8,
+    "quad9": 9,
+    "q4ans": 4,
+    "q4eas": 4,
+    "line2": 2,
+    "line3": 3,
+}
 
 
 class Node(BaseXmlModel, tag="node", validate_assignment=True):
@@ -37,6 +82,88 @@ class Nodes(BaseXmlModel, validate_assignment=True):
     def add_node(self, new_node: Node):
         self.all_nodes.append(new_node)
 
+    @staticmethod
+    def from_array(coordinates: ArrayLike, ids: ArrayLike | None = None, name: str = "", start_id: int = 1) -> "NodesArray":
+        """
+        Build an array-backed node domain. See :meth:`NodesArray.from_array`.
+        """
+        return NodesArray.from_array(coordinates, ids=ids, name=name, start_id=start_id)
+
+
+def _check_connectivity(ids: np.ndarray, connectivity: np.ndarray, type: str):
+    nodes_per_element = ELEMENT_NODE_COUNT[type]
+    if connectivity.ndim != 2 or (len(connectivity) and connectivity.shape[1] != nodes_per_element):
+        raise ValueError(f"connectivity for {type} elements must have shape (E, {nodes_per_element}) but got {connectivity.shape}")
+    if ids.shape != (connectivity.shape[0],):
+        raise ValueError(f"ids must have shape ({connectivity.shape[0]},) but got {ids.shape}")
+    if (ids < 0).any():
+        raise ValueError(f"element ids must be non-negative but got {ids[ids < 0][:10].tolist()}")
+    negative = (connectivity < 0).any(axis=1)
+    if negative.any():
+        raise ValueError(f"negative node ids in connectivity of element ids {ids[negative][:10].tolist()}")
+
+
+class NodesArray(BaseXmlModel, validate_assignment=True, arbitrary_types_allowed=True):
+    """
+    Array-backed alternative to :class:`Nodes` for large meshes.
+
+    Node ids and coordinates are stored as contiguous (N,) int64 and (N, 3) float64
+    arrays, validated in one vectorized pass, and written as the same
+    ``<node id="...">x,y,z</node>`` XML as :class:`Nodes`. Since ids and coordinates
+    are checked together, resize a domain by constructing a new one.
+    """
+
+    name: str = attr(default="")
+    ids: IntArray = element(tag="node", default_factory=lambda: np.zeros(0, dtype=np.int64))
+    coordinates: FloatArray = element(tag="node", default_factory=lambda: np.zeros((0, 3)))
+
+    @model_validator(mode="after")
+    def check_arrays(self):
+        if self.coordinates.ndim != 2 or self.coordinates.shape[1] != 3:
+            raise ValueError(f"coordinates must have shape (N, 3) but got {self.coordinates.shape}")
+        if self.ids.shape != (self.coordinates.shape[0],):
+            raise ValueError(f"ids must have shape ({self.coordinates.shape[0]},) but got {self.ids.shape}")
+        non_finite = ~np.isfinite(self.coordinates).all(axis=1)
+        if non_finite.any():
+            raise ValueError(f"non-finite coordinates for node ids {self.ids[non_finite][:10].tolist()}")
+        if (self.ids < 0).any():
+            raise ValueError(f"node ids must be non-negative but got {self.ids[self.ids < 0][:10].tolist()}")
+        if np.unique(self.ids).size != self.ids.size:
+            raise ValueError(f"duplicate node ids in Nodes {self.name!r}")
+        return self
+
+    @classmethod
+    def from_array(cls, coordinates: ArrayLike, ids: ArrayLike | None = None, name: str = "", start_id: int = 1) -> "NodesArray":
+        """
+        Build a node domain from an (N, 3) coordinate array. If ids are not given,
+        nodes are numbered consecutively from start_id.
+        """
+        coordinates = np.asarray(coordinates, dtype=np.float64)
+        if ids is None:
+            ids = np.arange(start_id, start_id + len(coordinates), dtype=np.int64)
+        return cls(name=name, ids=ids, coordinates=coordinates)
+
+    def to_nodes(self) -> Nodes:
+        """
+        The same node domain as a list of :class:`Node`.
+        """
+        return Nodes(name=self.name, all_nodes=[Node(id=node_id, text=text) for node_id, text in zip(self.ids.tolist(), format_rows(self.coordinates))])
+
+    @xml_field_serializer("ids", "coordinates")
+    def serialize_nodes(self, element: XmlElementWriter, value: np.ndarray, field_name: str):
+        if field_name == "coordinates":
+            write_rows(element, "node", self.ids, value)
+
+    @xml_field_validator("ids")
+    @classmethod
+    def validate_ids(cls, element: XmlElementReader, field_name: str) -> np.ndarray:
+        return np.array([node.get("id") for node in element.to_native()], dtype=np.int64)
+
+    @xml_field_validator("coordinates")
+    @classmethod
+    def validate_coordinates(cls, element: XmlElementReader, field_name: str) -> np.ndarray:
+        return parse_rows([node.pop_text() or "" for node in element.pop_elements()], np.float64, 3)
+
 
 class Tet4Element(BaseXmlModel, tag="elem", validate_assignment=True):
     text: StringUIntVec4 = Field(default="1,2,3,4")
@@ -134,6 +261,81 @@ class Elements(BaseXmlModel, tag="elements", validate_assignment=True):
     def add_element(self, new_element: ElementType):
         self.all_elements.append(new_element)
 
+    @staticmethod
+    def from_array(
+        connectivity: ArrayLike,
+        type: SolidFEBioElementType | ShellFEBioElementType | BeamFEBioElementType,
+        ids: ArrayLike | None = None,
+        name: str = "Part",
+        start_id: int = 1,
+    ) -> "ElementsArray":
+        """
+        Build an array-backed element domain. See :meth:`ElementsArray.from_array`.
+        """
+        return ElementsArray.from_array(connectivity, type, ids=ids, name=name, start_id=start_id)
+
+
+class ElementsArray(BaseXmlModel, tag="elements", validate_assignment=True, arbitrary_types_allowed=True):
+    """
+    Array-backed alternative to :class:`Elements` for large meshes.
+
+    Element ids and connectivity are stored as contiguous (E,) and (E, nodes per element)
+    int64 arrays, validated in one vectorized pass, and written as the same
+    ``<elem id="...">n1,n2,...</elem>`` XML as :class:`Elements`.
+    """
+
+    name: str = attr(default="Part")
+    type: SolidFEBioElementType | ShellFEBioElementType | BeamFEBioElementType = attr(default="hex8")
+    ids: IntArray = element(tag="elem", default_factory=lambda: np.zeros(0, dtype=np.int64))
+    connectivity: IntArray = element(tag="elem", default_factory=lambda: np.zeros((0, 8), dtype=np.int64))
+
+    @model_validator(mode="after")
+    def check_arrays(self):
+        _check_connectivity(self.ids, self.connectivity, self.type)
+        return self
+
+    @classmethod
+    def from_array(
+        cls,
+        connectivity: ArrayLike,
+        type: SolidFEBioElementType | ShellFEBioElementType | BeamFEBioElementType,
+        ids: ArrayLike | None = None,
+        name: str = "Part",
+        start_id: int = 1,
+    ) -> "ElementsArray":
+        """
+        Build an element domain from an (E, nodes per element) array of 1-based node ids.
+        If ids are not given, elements are numbered consecutively from start_id.
+        """
+        connectivity = np.asarray(connectivity)
+        if ids is None:
+            ids = np.arange(start_id, start_id + len(connectivity), dtype=np.int64)
+        return cls(name=name, type=type, ids=ids, connectivity=connectivity)
+
+    def to_elements(self) -> Elements:
+        """
+        The same element domain as a list of elements of its type.
+        """
+        element_class = ELEMENT_CLASS_MAP[self.type]
+        all_elements = [element_class(id=element_id, text=text) for element_id, text in zip(self.ids.tolist(), format_rows(self.connectivity))]
+        return Elements(name=self.name, type=self.type, all_elements=all_elements)
+
+    @xml_field_serializer("ids", "connectivity")
+    def serialize_elements(self, element: XmlElementWriter, value: np.ndarray, field_name: str):
+        if field_name == "connectivity":
+            write_rows(element, "elem", self.ids, value)
+
+    @xml_field_validator("ids")
+    @classmethod
+    def validate_ids(cls, element: XmlElementReader, field_name: str) -> np.ndarray:
+        return np.array([elem.get("id") for elem in element.to_native()], dtype=np.int64)
+
+    @xml_field_validator("connectivity")
+    @classmethod
+    def validate_connectivity(cls, element: XmlElementReader, field_name: str) -> np.ndarray:
+        texts = [elem.pop_text() or "" for elem in element.pop_elements()]
+        return parse_rows(texts, np.int64, texts[0].count(",") + 1 if texts else 0)
+
 
 class ElementSet(BaseXmlModel, tag="ElementSet", validate_assignment=True):
     name: str = attr(default="")
@@ -175,6 +377,71 @@ class Surface(BaseXmlModel, tag="Surface", validate_assignment=True):
         self.all_quad9.append(new_quad)
 
 
+class SurfaceArray(BaseXmlModel, tag="Surface", validate_assignment=True, arbitrary_types_allowed=True):
+    """
+    Array-backed alternative to :class:`Surface` holding faces of a single type.
+
+    Face ids and connectivity are stored as int64 arrays and written as the same
+    ``<tri3 id="...">n1,n2,n3</tri3>`` (etc.) XML as :class:`Surface`.
+    """
+
+    name: str = attr(default="")
+    type: SurfaceFEBioElementType = Field(default="tri3")
+    ids: IntArray = element(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    connectivity: IntArray = element(default_factory=lambda: np.zeros((0, 3), dtype=np.int64))
+
+    @model_validator(mode="after")
+    def check_arrays(self):
+        _check_connectivity(self.ids, self.connectivity, self.type)
+        return self
+
+    @classmethod
+    def from_array(
+        cls,
+        connectivity: ArrayLike,
+        type: SurfaceFEBioElementType,
+        ids: ArrayLike | None = None,
+        name: str = "",
+        start_id: int = 1,
+    ) -> "SurfaceArray":
+        """
+        Build a surface from an (F, nodes per face) array of 1-based node ids.
+        If ids are not given, faces are numbered consecutively from start_id.
+        """
+        connectivity = np.asarray(connectivity)
+        if ids is None:
+            ids = np.arange(start_id, start_id + len(connectivity), dtype=np.int64)
+        return cls(name=name, type=type, ids=ids, connectivity=connectivity)
+
+    def to_surface(self) -> Surface:
+        """
+        The same surface as a :class:`Surface` with one list of faces.
+        """
+        return _surface_from_rows(self.name, {self.type: (self.ids, self.connectivity)}, arrays=False)
+
+    @xml_field_serializer("type", "ids", "connectivity")
+    def serialize_faces(self, element: XmlElementWriter, value: Any, field_name: str):
+        if field_name == "connectivity":
+            write_rows(element, self.type, self.ids, value)
+
+    @xml_field_validator("type")
+    @classmethod
+    def validate_type(cls, element: XmlElementReader, field_name: str) -> str | None:
+        faces = element.to_native()
+        return faces[0].tag if len(faces) else None
+
+    @xml_field_validator("ids")
+    @classmethod
+    def validate_ids(cls, element: XmlElementReader, field_name: str) -> np.ndarray:
+        return np.array([face.get("id") for face in element.to_native()], dtype=np.int64)
+
+    @xml_field_validator("connectivity")
+    @classmethod
+    def validate_connectivity(cls, element: XmlElementReader, field_name: str) -> np.ndarray:
+        texts = [face.pop_text() or "" for face in element.pop_elements()]
+        return parse_rows(texts, np.int64, texts[0].count(",") + 1 if texts else 0)
+
+
 class SurfacePair(BaseXmlModel, tag="SurfacePair", validate_assignment=True):
     name: str = attr(default="")
     primary: str = element()
@@ -193,49 +460,755 @@ class DiscreteSet(BaseXmlModel, tag="DiscreteSet", validate_assignment=True):
         self.elements.append(new_element)
 
 
+# faces of solid elements, as positions in the element connectivity ordered so the face
+# normal points out of the element, by element type and face type
+SOLID_FACES: dict[str, dict[str, list[list[int]]]] = {
+    "tet4": {"tri3": [[0, 1, 3], [1, 2, 3], [2, 0, 3], [2, 1, 0]]},
+    "tet10": {"tri6": [[0, 1, 3, 4, 8, 7], [1, 2, 3, 5, 9, 8], [2, 0, 3, 6, 7, 9], [2, 1, 0, 5, 4, 6]]},
+    "hex8": {"quad4": [[0, 1, 5, 4], [1, 2, 6, 5], [2, 3, 7, 6], [3, 0, 4, 7], [0, 3, 2, 1], [4, 5, 6, 7]]},
+    "hex20": {
+        "quad8": [
+            [0, 1, 5, 4, 8, 17, 12, 16],
+            [1, 2, 6, 5, 9, 18, 13, 17],
+            [2, 3, 7, 6, 10, 19, 14, 18],
+            [3, 0, 4, 7, 11, 16, 15, 19],
+            [0, 3, 2, 1, 11, 10, 9, 8],
+            [4, 5, 6, 7, 12, 13, 14, 15],
+        ]
+    },
+    "hex27": {
+        "quad9": [
+            [0, 1, 5, 4, 8, 17, 12, 16, 20],
+            [1, 2, 6, 5, 9, 18, 13, 17, 21],
+            [2, 3, 7, 6, 10, 19, 14, 18, 22],
+            [3, 0, 4, 7, 11, 16, 15, 19, 23],
+            [0, 3, 2, 1, 11, 10, 9, 8, 24],
+            [4, 5, 6, 7, 12, 13, 14, 15, 25],
+        ]
+    },
+    "penta6": {"tri3": [[0, 2, 1], [3, 4, 5]], "quad4": [[0, 1, 4, 3], [1, 2, 5, 4], [2, 0, 3, 5]]},
+}
+FACE_CORNERS = {"tri3": 3, "tri6": 3, "quad4": 4, "quad8": 4, "quad9": 4}
+
+
+def element_arrays(domain: Elements | ElementsArray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The ids and (E, nodes per element) connectivity of an element domain.
+    """
+    if isinstance(domain, ElementsArray):
+        return domain.ids, domain.connectivity
+    ids = np.fromiter((item.id for item in domain.all_elements), dtype=np.int64, count=len(domain.all_elements))
+    return ids, parse_rows([item.text for item in domain.all_elements], np.int64, ELEMENT_NODE_COUNT[domain.type])
+
+
+def _single_faces(keys: np.ndarray) -> np.ndarray:
+    """
+    Which of the (F, corners) sorted face corners occur only once.
+    """
+    # Sorting one 64 bit hash of the corners is several times faster than sorting the
+    # corners themselves, and puts equal faces next to each other unless more than two
+    # faces share a hash, in which case the corners are sorted after all.
+    hashes = np.zeros(len(keys), dtype=np.uint64)
+    for column in keys.T:
+        hashes = hashes * np.uint64(0x9E3779B97F4A7C15) + column.astype(np.uint64)
+    order = np.argsort(hashes)
+    hashes = hashes[order]
+    candidates = np.flatnonzero(hashes[1:] == hashes[:-1])
+    if (np.diff(candidates) == 1).any():
+        order = np.lexsort(keys.T[::-1])
+        candidates = np.arange(len(keys) - 1)
+    repeated = candidates[(keys[order[candidates]] == keys[order[candidates + 1]]).all(axis=1)]
+    single = np.ones(len(keys), dtype=bool)
+    single[order[repeated]] = False
+    single[order[repeated + 1]] = False
+    return single
+
+
+def exterior_faces(domains: list[Elements | ElementsArray]) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """
+    The faces of the solid elements of domains that belong to a single element, as face
+    type -> (ids of the elements, (F, nodes per face) connectivity).
+
+    Faces are matched by their sorted corner nodes, so faces shared by elements of
+    different domains are interior too. Faces keep the order of their elements.
+    """
+    # corner count -> (face type, element ids, faces) of every element face
+    candidates: dict[int, list[tuple[str, np.ndarray, np.ndarray]]] = {}
+    for domain in domains:
+        if domain.type not in SOLID_FACES:
+            raise ValueError(f"cannot find the faces of {domain.type} elements of domain {domain.name!r}")
+        ids, connectivity = element_arrays(domain)
+        for face_type, positions in SOLID_FACES[domain.type].items():
+            faces = connectivity[:, positions].reshape(-1, len(positions[0]))
+            candidates.setdefault(FACE_CORNERS[face_type], []).append((face_type, np.repeat(ids, len(positions)), faces))
+    result: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+    for corners, groups in candidates.items():
+        keys = np.sort(np.concatenate([faces[:, :corners] for *_, faces in groups]), axis=1)
+        exterior = np.flatnonzero(_single_faces(keys))
+        start = 0
+        for face_type, element_ids, faces in groups:
+            end = start + len(faces)
+            chosen = exterior[np.searchsorted(exterior, start) : np.searchsorted(exterior, end)] - start
+            start = end
+            if face_type in result:
+                previous_ids, previous_faces = result[face_type]
+                result[face_type] = (np.concatenate([previous_ids, element_ids[chosen]]), np.concatenate([previous_faces, faces[chosen]]))
+            else:
+                result[face_type] = (element_ids[chosen], faces[chosen])
+    return result
+
+
+def _domain_ids(domain: Nodes | NodesArray | Elements | ElementsArray) -> np.ndarray:
+    if isinstance(domain, (NodesArray, ElementsArray)):
+        return domain.ids
+    items = domain.all_nodes if isinstance(domain, Nodes) else domain.all_elements
+    return np.fromiter((item.id for item in items), dtype=np.int64, count=len(items))
+
+
+def _domain_rows(domain: Nodes | NodesArray | Elements | ElementsArray) -> Any:
+    if isinstance(domain, (NodesArray, ElementsArray)):
+        return domain.ids
+    return domain.all_nodes if isinstance(domain, Nodes) else domain.all_elements
+
+
+def _domain_keys(domains: list) -> tuple[tuple[int, int, int], ...]:
+    # changes when rows are added to or replaced in a domain; users of the keys hold on to
+    # the domains so their ids are not reused
+    return tuple((id(domain), id(rows), len(rows)) for domain in domains for rows in [_domain_rows(domain)])
+
+
+class _IdIndex:
+    """
+    Maps the ids of a list of node or element domains to (domain index, row).
+
+    Ids are looked up in a dense table of global rows while they are reasonably compact,
+    and in a dict otherwise. Domains are only ever appended, so adding one extends the
+    index instead of rebuilding it. Ids must be positive and unique across the domains.
+    """
+
+    def __init__(self, domains: list):
+        self.domains = domains
+        self.held: list[tuple[Any, Any]] = []
+        self.keys: list[tuple[int, int, int]] = []
+        self.offsets = [0]
+        self.max_id = 0
+        self._table = np.zeros(0, dtype=np.int64)
+        self._sparse: dict[int, int] | None = None
+        for domain in domains:
+            self.add(domain)
+
+    def matches(self, domains: list) -> bool:
+        # rows added to any domain are noticed, ids changed in place are not, see Mesh.reindex
+        if domains is not self.domains or len(domains) != len(self.keys):
+            return False
+        return list(_domain_keys(domains)) == self.keys
+
+    def add(self, domain: Nodes | NodesArray | Elements | ElementsArray):
+        ids = _domain_ids(domain)
+        start = self.offsets[-1]
+        rows = np.arange(start, start + len(ids), dtype=np.int64)
+        if len(ids):
+            if ids.min() < 1:
+                raise ValueError(f"ids of domain {domain.name!r} must be positive but got {ids[ids < 1][:10].tolist()}")
+            self._check_unique(domain, ids)
+            self.max_id = max(self.max_id, int(ids.max()))
+            if self._sparse is None and self.max_id > 4 * (start + len(ids)) + 1024:
+                known = np.flatnonzero(self._table >= 0)
+                self._sparse = dict(zip(known.tolist(), self._table[known].tolist()))
+                self._table = np.zeros(0, dtype=np.int64)
+            if self._sparse is not None:
+                self._sparse.update(zip(ids.tolist(), rows.tolist()))
+            else:
+                if self.max_id >= len(self._table):
+                    table = np.full(max(self.max_id + 1, 2 * len(self._table)), -1, dtype=np.int64)
+                    table[: len(self._table)] = self._table
+                    self._table = table
+                self._table[ids] = rows
+        self.held.append((domain, _domain_rows(domain)))
+        self.keys.extend(_domain_keys([domain]))
+        self.offsets.append(start + len(ids))
+
+    def _check_unique(self, domain, ids: np.ndarray):
+        unique, counts = np.unique(ids, return_counts=True)
+        repeated = unique[counts > 1]
+        if self._sparse is not None:
+            taken = np.fromiter((item_id in self._sparse for item_id in unique.tolist()), dtype=bool, count=unique.size)
+        else:
+            inside = unique[unique < len(self._table)]
+            taken = np.zeros(unique.size, dtype=bool)
+            taken[: inside.size] = self._table[inside] >= 0
+        repeated = np.union1d(repeated, unique[taken])
+        if repeated.size:
+            raise ValueError(f"ids {repeated[:10].tolist()} of domain {domain.name!r} are used more than once")
+
+    def find(self, item_id: int) -> tuple[int, int] | None:
+        if self._sparse is not None:
+            row = self._sparse.get(item_id, -1)
+        else:
+            row = int(self._table[item_id]) if 0 <= item_id < len(self._table) else -1
+        if row < 0:
+            return None
+        domain = bisect.bisect_right(self.offsets, row) - 1
+        return domain, row - self.offsets[domain]
+
+    def rows(self, item_ids: np.ndarray) -> np.ndarray:
+        """
+        The rows of item_ids in the concatenation of the domains.
+        """
+        item_ids = np.asarray(item_ids, dtype=np.int64)
+        if self._sparse is not None:
+            rows = np.fromiter((self._sparse.get(item_id, -1) for item_id in item_ids.tolist()), dtype=np.int64, count=item_ids.size)
+            rows = rows.reshape(item_ids.shape)
+        else:
+            known = (item_ids >= 0) & (item_ids < len(self._table))
+            rows = np.where(known, self._table[np.where(known, item_ids, 0)], -1)
+        if (rows < 0).any():
+            raise KeyError(f"no items with ids {item_ids[rows < 0][:10].tolist()}")
+        return rows
+
+
+def surface_arrays(surface: Surface | SurfaceArray) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """
+    The faces of a surface as face type -> (ids, (F, nodes per face) connectivity).
+    """
+    if isinstance(surface, SurfaceArray):
+        return {surface.type: (surface.ids, surface.connectivity)} if len(surface.ids) else {}
+    arrays = {}
+    for face_type in FACE_CORNERS:
+        faces = getattr(surface, f"all_{face_type}")
+        if faces:
+            ids = np.fromiter((face.id for face in faces), dtype=np.int64, count=len(faces))
+            arrays[face_type] = (ids, parse_rows([face.text for face in faces], np.int64, ELEMENT_NODE_COUNT[face_type]))
+    return arrays
+
+
+def _numbered_surface(name: str, faces: dict[str, np.ndarray]) -> Surface | SurfaceArray:
+    rows = {}
+    start = 1
+    for face_type, connectivity in faces.items():
+        rows[face_type] = (np.arange(start, start + len(connectivity), dtype=np.int64), connectivity)
+        start += len(connectivity)
+    return _surface_from_rows(name, rows)
+
+
+def _id_text(ids: np.ndarray, what: str) -> str:
+    if not len(ids):
+        raise ValueError(f"no {what} selected")
+    return ",".join(map(str, ids.tolist()))
+
+
+@dataclass
+class ContactPair:
+    """
+    Opposing surfaces of two element domains found by :meth:`Mesh.find_contact_pairs`,
+    with the smallest distance between their faces.
+    """
+
+    pair: SurfacePair
+    primary: Surface | SurfaceArray
+    secondary: Surface | SurfaceArray
+    gap: float
+
+
+@dataclass
+class Renumbering:
+    """
+    The changes made by :meth:`Mesh.renumber`: old and new ids of the nodes and elements,
+    and the order of the members as order[new position] = old position for each node set
+    and element set by name, and for each element domain by name. A set and a domain may
+    share a name, so their orders are kept apart.
+    """
+
+    node_ids: tuple[np.ndarray, np.ndarray]
+    element_ids: tuple[np.ndarray, np.ndarray]
+    node_orders: dict[str, np.ndarray]
+    element_orders: dict[str, np.ndarray]
+    domain_orders: dict[str, np.ndarray]
+
+    @staticmethod
+    def _map(ids: tuple[np.ndarray, np.ndarray], values: ArrayLike) -> np.ndarray:
+        old, new = ids
+        values = np.asarray(values, dtype=np.int64)
+        order = np.argsort(old)
+        found = np.searchsorted(old, values, sorter=order)
+        if len(old):
+            found = order[np.minimum(found, len(old) - 1)]
+        missing = old[found] != values if len(old) else np.ones(values.shape, dtype=bool)
+        if missing.any():
+            raise KeyError(f"ids {values[missing][:10].tolist()} were not renumbered")
+        return new[found]
+
+    def new_node_ids(self, node_ids: ArrayLike) -> np.ndarray:
+        return self._map(self.node_ids, node_ids)
+
+    def new_element_ids(self, element_ids: ArrayLike) -> np.ndarray:
+        return self._map(self.element_ids, element_ids)
+
+
+def _renumbered_set(text: str, new_ids: Callable[[np.ndarray], np.ndarray]) -> tuple[str, np.ndarray]:
+    ids = new_ids(np.array(text.split(","), dtype=np.int64))
+    order = np.argsort(ids, kind="stable")
+    return ",".join(map(str, ids[order].tolist())), order
+
+
+class _Boundary:
+    """
+    The exterior faces of one element domain split into triangles, for contact search.
+    """
+
+    def __init__(self, mesh: "Mesh", domain: Elements | ElementsArray, gap: float):
+        self.domain = domain
+        self.faces = {face_type: connectivity for face_type, (_, connectivity) in exterior_faces([domain]).items()}
+        rows, nodes, types = [], [], []
+        for number, connectivity in enumerate(self.faces.values()):
+            face_rows, corners = triangles(connectivity)
+            rows.append(face_rows)
+            nodes.append(corners)
+            types.append(np.full(len(face_rows), number))
+        self.rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        self.types = np.concatenate(types) if types else np.zeros(0, dtype=np.int64)
+        self.nodes = np.concatenate(nodes) if nodes else np.zeros((0, 3), dtype=np.int64)
+        self.points = mesh.node_coordinates(self.nodes)
+        normals = np.cross(self.points[:, 1] - self.points[:, 0], self.points[:, 2] - self.points[:, 0])
+        self.normals = normals / np.maximum(np.linalg.norm(normals, axis=1), 1e-300)[:, None]
+        self.centroids = self.points.mean(axis=1)
+        self.radii = np.linalg.norm(self.points - self.centroids[:, None], axis=2).max(axis=1) if len(self.points) else np.zeros(0)
+        self.tree = BoxTree(self.points.min(axis=1) - gap / 2, self.points.max(axis=1) + gap / 2)
+
+    def surface(self, name: str, triangle_index: np.ndarray) -> Surface | SurfaceArray:
+        selected = {}
+        for number, (face_type, connectivity) in enumerate(self.faces.items()):
+            rows = np.unique(self.rows[triangle_index[self.types[triangle_index] == number]])
+            if len(rows):
+                selected[face_type] = connectivity[rows]
+        return _numbered_surface(name, selected)
+
+
+def _triangle_gaps(first: _Boundary, second: _Boundary, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    # the smallest distance of a corner of either triangle to the other triangle
+    gaps = np.full(len(i), np.inf)
+    for points, triangle in ((first.points[i], second.points[j]), (second.points[j], first.points[i])):
+        for corner in range(3):
+            gaps = np.minimum(gaps, triangle_distance(points[:, corner], triangle[:, 0], triangle[:, 1], triangle[:, 2]))
+    return gaps
+
+
+def _close_triangles(first: _Boundary, second: _Boundary, i: np.ndarray, j: np.ndarray, gap: float) -> tuple[np.ndarray, np.ndarray, float]:
+    """
+    The candidate pairs of triangles at most gap apart, and the smallest distance of any
+    candidate pair.
+    """
+    # lower bounds of the distances: the separation of the bounding spheres, and of the
+    # corners of one triangle from the plane of the other if they are all on one side
+    lower = np.linalg.norm(first.centroids[i] - second.centroids[j], axis=1) - first.radii[i] - second.radii[j]
+    for points, origin, normals in ((second.points[j], first.points[i][:, 0], first.normals[i]), (first.points[i], second.points[j][:, 0], second.normals[j])):
+        heights = np.einsum("ikj,ij->ik", points - origin[:, None], normals)
+        lower = np.maximum(lower, np.maximum(heights.min(axis=1), -heights.max(axis=1)))
+    keep = lower <= gap
+    i, j, lower = i[keep], j[keep], lower[keep]
+    order = np.argsort(lower, kind="stable")
+    # the most promising pair of each triangle first, which usually settles that every
+    # triangle is close, then only the pairs that could still change the outcome
+    promising = np.zeros(len(order), dtype=bool)
+    for index in (i, j):
+        promising[order[np.unique(index[order], return_index=True)[1]]] = True
+    close = np.zeros(len(i), dtype=bool)
+    first_close, second_close = np.zeros(len(first.points), dtype=bool), np.zeros(len(second.points), dtype=bool)
+    best = np.inf
+    for pairs in (promising, ~promising):
+        if pairs is not promising:
+            pairs &= ~(first_close[i] & second_close[j] & (lower >= best))
+        gaps = _triangle_gaps(first, second, i[pairs], j[pairs])
+        found = np.flatnonzero(pairs)[gaps <= gap]
+        close[found] = True
+        first_close[i[found]] = second_close[j[found]] = True
+        best = min(best, gaps.min(initial=np.inf))
+    return i[close], j[close], float(best)
+
+
 class Mesh(BaseXmlModel, validate_assignment=True):
-    nodes: list[Nodes] = element(default=[], tag="Nodes")
-    elements: list[Elements] = element(default=[], tag="Elements")
-    surfaces: list[Surface] = element(default=[], tag="Surface")
+    nodes: list[Nodes | NodesArray] = element(default=[], tag="Nodes")
+    elements: list[Elements | ElementsArray] = element(default=[], tag="Elements")
+    surfaces: list[Surface | SurfaceArray] = element(default=[], tag="Surface")
     element_sets: list[ElementSet] = element(default=[], tag="ElementSet")
     node_sets: list[NodeSet] = element(default=[], tag="NodeSet")
     discrete_sets: list[DiscreteSet] = element(default=[], tag="DiscreteSet")
     surface_pairs: list[SurfacePair] = element(default=[], tag="SurfacePair")
 
-    def add_node_domain(self, new_node_domain: Nodes):
+    # "nodes"/"elements" -> _IdIndex, list field -> (list, length, name -> item), built on first use
+    _indexes: dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    def _append(self, field: str, item: Any):
+        items = getattr(self, field)
+        id_index = self._indexes.get(field) if field in ("nodes", "elements") else None
+        names = self._indexes.get(f"{field}:names")
+        # extend the indexes of the list, if they are still up to date, instead of dropping them
+        current = id_index is not None and id_index.matches(items)
+        items.append(item)
+        if current:
+            id_index.add(item)
+        if names is not None and names[0] is items and names[1] == len(items) - 1:
+            names[2].setdefault(item.name, item)
+            self._indexes[f"{field}:names"] = (items, len(items), names[2])
+
+    def add_node_domain(self, new_node_domain: Nodes | NodesArray):
         if not new_node_domain.name:
             new_node_domain.name = f"Part{len(self.nodes) + 1}"
-        self.nodes.append(new_node_domain)
+        self._append("nodes", new_node_domain)
 
-    def add_element_domain(self, new_element_domain: Elements):
+    def add_element_domain(self, new_element_domain: Elements | ElementsArray):
         if new_element_domain.name == "Part":
             new_element_domain.name = f"Part{len(self.elements) + 1}"
-        self.elements.append(new_element_domain)
+        self._append("elements", new_element_domain)
 
-    def add_surface(self, new_surface: Surface):
+    def add_surface(self, new_surface: Surface | SurfaceArray):
         if not new_surface.name:
             new_surface.name = f"Surface{len(self.surfaces) + 1}"
-        self.surfaces.append(new_surface)
+        self._append("surfaces", new_surface)
 
     def add_element_set(self, new_element_set: ElementSet):
         if not new_element_set.name:
             new_element_set.name = f"ElementSet{len(self.element_sets) + 1}"
-        self.element_sets.append(new_element_set)
+        self._append("element_sets", new_element_set)
 
     def add_node_set(self, new_node_set: NodeSet):
         if not new_node_set.name:
             new_node_set.name = f"NodeSet{len(self.node_sets) + 1}"
-        self.node_sets.append(new_node_set)
+        self._append("node_sets", new_node_set)
 
     def add_discrete_set(self, new_discrete_set: DiscreteSet):
         if not new_discrete_set.name:
             new_discrete_set.name = f"DiscreteSet{len(self.discrete_sets) + 1}"
-        self.discrete_sets.append(new_discrete_set)
+        self._append("discrete_sets", new_discrete_set)
 
     def add_surface_pair(self, new_surface_pair: SurfacePair):
         if not new_surface_pair.name:
             new_surface_pair.name = f"SurfacePair{len(self.surface_pairs) + 1}"
-        self.surface_pairs.append(new_surface_pair)
+        self._append("surface_pairs", new_surface_pair)
+
+    def _id_index(self, field: str) -> _IdIndex:
+        items = getattr(self, field)
+        index = self._indexes.get(field)
+        if index is None or not index.matches(items):
+            index = self._indexes[field] = _IdIndex(items)
+        return index
+
+    def _named(self, field: str, name: str) -> Any:
+        items = getattr(self, field)
+        names = self._indexes.get(f"{field}:names")
+        if names is None or names[0] is not items or names[1] != len(items):
+            mapping: dict[str, Any] = {}
+            for item in items:
+                mapping.setdefault(item.name, item)
+            names = self._indexes[f"{field}:names"] = (items, len(items), mapping)
+        try:
+            return names[2][name]
+        except KeyError:
+            raise KeyError(f"no {field} named {name!r}") from None
+
+    def reindex(self):
+        """
+        Drop the id and name indexes, after ids or names of domains or sets already in the
+        mesh were changed in place. Adding items, through the ``add_*`` methods or by
+        appending to or assigning the lists, is picked up without it.
+        """
+        self._indexes.clear()
+
+    def find_node(self, node_id: int) -> tuple[Nodes | NodesArray, int]:
+        """
+        The node domain holding node_id and the row of the node in it.
+        """
+        found = self._id_index("nodes").find(node_id)
+        if found is None:
+            raise KeyError(f"no node with id {node_id}")
+        return self.nodes[found[0]], found[1]
+
+    def find_element(self, element_id: int) -> tuple[Elements | ElementsArray, int]:
+        """
+        The element domain holding element_id and the row of the element in it.
+        """
+        found = self._id_index("elements").find(element_id)
+        if found is None:
+            raise KeyError(f"no element with id {element_id}")
+        return self.elements[found[0]], found[1]
+
+    def next_node_id(self) -> int:
+        return self._id_index("nodes").max_id + 1
+
+    def next_element_id(self) -> int:
+        return self._id_index("elements").max_id + 1
+
+    def get_node_domain(self, name: str) -> Nodes | NodesArray:
+        return self._named("nodes", name)
+
+    def get_element_domain(self, name: str) -> Elements | ElementsArray:
+        return self._named("elements", name)
+
+    def get_surface(self, name: str) -> Surface | SurfaceArray:
+        return self._named("surfaces", name)
+
+    def get_element_set(self, name: str) -> ElementSet:
+        return self._named("element_sets", name)
+
+    def get_node_set(self, name: str) -> NodeSet:
+        return self._named("node_sets", name)
+
+    def _solid_domains(self, domains: str | list[str] | None) -> list[Elements | ElementsArray]:
+        if domains is None:
+            return [domain for domain in self.elements if domain.type in SOLID_FACES]
+        if isinstance(domains, str):
+            domains = [domains]
+        return [self.get_element_domain(name) for name in domains]
+
+    def exterior_surface(self, domains: str | list[str] | None = None, name: str = "") -> Surface | SurfaceArray:
+        """
+        A surface of the exterior faces of the named element domains, or of all solid
+        domains, numbered from 1. See :func:`exterior_faces`.
+        """
+        faces = exterior_faces(self._solid_domains(domains))
+        return _numbered_surface(name, {face_type: connectivity for face_type, (_, connectivity) in faces.items()})
+
+    def exterior_node_set(self, domains: str | list[str] | None = None, name: str = "") -> NodeSet:
+        """
+        A node set of the nodes on the exterior faces of the named element domains, or of
+        all solid domains.
+        """
+        faces = exterior_faces(self._solid_domains(domains))
+        node_ids = np.unique(np.concatenate([connectivity.ravel() for _, connectivity in faces.values()] or [np.zeros(0, dtype=np.int64)]))
+        return NodeSet(name=name, text=",".join(map(str, node_ids.tolist())))
+
+    def _cached(self, name: str, groups: list[list], build: Callable[[], Any]) -> Any:
+        keys = tuple(_domain_keys(group) for group in groups)
+        cached = self._indexes.get(name)
+        if cached is None or cached[0] != keys:
+            cached = self._indexes[name] = (keys, [list(group) for group in groups], build())
+        return cached[2]
+
+    def node_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The ids and (N, 3) coordinates of all nodes, in the order of the node domains.
+        """
+
+        def build():
+            ids = [_domain_ids(domain) for domain in self.nodes]
+            coordinates = [
+                domain.coordinates
+                if isinstance(domain, NodesArray)
+                else parse_rows([node.text for node in domain.all_nodes], np.float64, 3)
+                for domain in self.nodes
+            ]
+            if not ids:
+                return np.zeros(0, dtype=np.int64), np.zeros((0, 3))
+            return np.concatenate(ids), np.concatenate(coordinates)
+
+        return self._cached("node_arrays", [self.nodes], build)
+
+    def node_coordinates(self, node_ids: ArrayLike) -> np.ndarray:
+        """
+        The coordinates of node_ids, with a trailing axis of 3 added to their shape.
+        """
+        return self.node_arrays()[1][self._id_index("nodes").rows(node_ids)]
+
+    def element_centroids(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The ids, domain indices and (E, 3) centroids of all elements, in the order of the
+        element domains.
+        """
+
+        def build():
+            ids, domains, centroids = [], [], []
+            for index, domain in enumerate(self.elements):
+                element_ids, connectivity = element_arrays(domain)
+                ids.append(element_ids)
+                domains.append(np.full(len(element_ids), index))
+                centroids.append(self.node_coordinates(connectivity).mean(axis=1) if len(element_ids) else np.zeros((0, 3)))
+            if not ids:
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros((0, 3))
+            return np.concatenate(ids), np.concatenate(domains), np.concatenate(centroids)
+
+        return self._cached("element_centroids", [self.nodes, self.elements], build)
+
+    def surface_triangles(self, surface: str | Surface | SurfaceArray) -> np.ndarray:
+        """
+        The (T, 3, 3) corner coordinates of the triangles of a surface, quadrilaterals
+        split in two.
+        """
+        if isinstance(surface, str):
+            surface = self.get_surface(surface)
+        corners = [triangles(connectivity)[1] for _, connectivity in surface_arrays(surface).values()]
+        if not corners:
+            return np.zeros((0, 3, 3))
+        return self.node_coordinates(np.concatenate(corners))
+
+    def select_nodes(self, region: Region | Callable[[np.ndarray], ArrayLike], name: str = "") -> NodeSet:
+        """
+        A node set of the nodes inside region, which is a :class:`~pyfebio.spatial.Region`
+        or a function taking an (N, 3) array of coordinates and returning a boolean mask.
+        Nodes are found with a uniform grid built on first use.
+
+        Example::
+
+            bottom = mesh.select_nodes(lambda x: x[:, 2] < 0.1, name="bottom")
+            tip = mesh.select_nodes(spatial.Sphere((0, 0, 10), 0.5))
+        """
+        region = as_region(region).prepare(self)
+        grid = self._cached("node_grid", [self.nodes], lambda: PointGrid(self.node_arrays()[1]))
+        return NodeSet(name=name, text=_id_text(self.node_arrays()[0][select(grid, region)], "nodes"))
+
+    def select_elements(
+        self, region: Region | Callable[[np.ndarray], ArrayLike], domains: str | list[str] | None = None, name: str = ""
+    ) -> ElementSet:
+        """
+        An element set of the elements of the named domains, or of all domains, with
+        their centroid inside region. See :meth:`select_nodes`.
+        """
+        region = as_region(region).prepare(self)
+        ids, indices, centroids = self.element_centroids()
+        grid = self._cached("element_grid", [self.nodes, self.elements], lambda: PointGrid(centroids))
+        rows = select(grid, region)
+        if domains is not None:
+            names = [domains] if isinstance(domains, str) else domains
+            wanted = [index for index, domain in enumerate(self.elements) if domain.name in names]
+            rows = rows[np.isin(indices[rows], wanted)]
+        return ElementSet(name=name, text=_id_text(ids[rows], "elements"))
+
+    def select_faces(
+        self,
+        region: Region | Callable[[np.ndarray], ArrayLike],
+        surface: str | Surface | SurfaceArray | None = None,
+        name: str = "",
+    ) -> Surface | SurfaceArray:
+        """
+        A surface of the faces of surface, or of the exterior surface of all solid
+        domains, with their centroid inside region, numbered from 1. See
+        :meth:`select_nodes`.
+        """
+        region = as_region(region).prepare(self)
+        if surface is None:
+            surface = self.exterior_surface()
+        elif isinstance(surface, str):
+            surface = self.get_surface(surface)
+        selected = {}
+        for face_type, (_, connectivity) in surface_arrays(surface).items():
+            centroids = self.node_coordinates(connectivity[:, : FACE_CORNERS[face_type]]).mean(axis=1)
+            chosen = connectivity[region.contains(centroids)]
+            if len(chosen):
+                selected[face_type] = chosen
+        if not selected:
+            raise ValueError("no faces selected")
+        return _numbered_surface(name, selected)
+
+    def find_contact_pairs(self, gap: float, domains: list[str] | None = None, angle: float = 60.0) -> list[ContactPair]:
+        """
+        Find the faces of the exterior surfaces of different element domains (the named
+        ones, or all solid domains) that are at most gap apart and face each other, with
+        normals at most angle degrees from opposite, and propose a SurfacePair for each
+        pair of domains with such faces. Faces sharing a node are connected and skipped.
+
+        Candidate faces are found with a bounding volume hierarchy per domain. The
+        distance of two faces is taken as the smallest distance of a corner of one to the
+        other, which is exact unless their edges cross.
+
+        Example::
+
+            for found in mesh.find_contact_pairs(gap=0.1):
+                mesh.add_surface(found.primary)
+                mesh.add_surface(found.secondary)
+                mesh.add_surface_pair(found.pair)
+                model.contact_.add_contact(contact.SlidingElastic(surface_pair=found.pair.name))
+        """
+        boundaries = [_Boundary(self, domain, gap) for domain in self._solid_domains(domains)]
+        found = []
+        for index, first in enumerate(boundaries):
+            for second in boundaries[index + 1 :]:
+                i, j = first.tree.overlapping(second.tree)
+                connected = (first.nodes[i][:, :, None] == second.nodes[j][:, None, :]).any(axis=(1, 2))
+                facing = (first.normals[i] * second.normals[j]).sum(axis=1) <= -np.cos(np.radians(angle))
+                i, j, smallest = _close_triangles(first, second, i[facing & ~connected], j[facing & ~connected], gap)
+                if not len(i):
+                    continue
+                names = first.domain.name, second.domain.name
+                primary = first.surface(f"{names[0]}_contact_{names[1]}", i)
+                secondary = second.surface(f"{names[1]}_contact_{names[0]}", j)
+                pair = SurfacePair(name=f"{names[0]}_{names[1]}", primary=primary.name, secondary=secondary.name)
+                found.append(ContactPair(pair=pair, primary=primary, secondary=secondary, gap=smallest))
+        return found
+
+    def renumber(self) -> Renumbering:
+        """
+        Renumber the nodes in reverse Cuthill-McKee order of the graph of nodes sharing
+        elements, so nodes close in the mesh are close in number, and the elements of each
+        domain by their lowest node. The ids referred to by surfaces, node, element and
+        discrete sets are changed to match, and sets are sorted.
+
+        Nodes and elements stay in their domains, and domains in their order, with ids
+        numbered consecutively from the smallest id. Data that refers to set members by
+        position must be reordered with the returned orders, which
+        ``Model.renumber`` does for the mesh data of a model.
+        """
+        index = self._id_index("nodes")
+        node_ids = self.node_arrays()[0]
+        domains = [element_arrays(domain) for domain in self.elements]
+        rows = [index.rows(connectivity) for _, connectivity in domains]
+        rank = np.empty(len(node_ids), dtype=np.int64)
+        rank[reverse_cuthill_mckee(rows, len(node_ids))] = np.arange(len(node_ids))
+        node_domain = np.repeat(np.arange(len(self.nodes)), np.diff(index.offsets))
+        new_node_ids = np.empty(len(node_ids), dtype=np.int64)
+        new_node_ids[np.lexsort((rank, node_domain))] = np.arange(len(node_ids)) + (node_ids.min() if len(node_ids) else 1)
+        first_element = min((int(ids.min()) for ids, _ in domains if len(ids)), default=1)
+
+        def new_node(ids: np.ndarray) -> np.ndarray:
+            return new_node_ids[index.rows(ids)]
+
+        old_element_ids, element_ids, domain_orders = [], [], {}
+        for domain, (ids, _), connectivity in zip(self.elements, domains, rows):
+            connectivity = new_node_ids[connectivity]
+            order = np.lexsort((np.arange(len(ids)), connectivity.min(axis=1))) if len(ids) else np.zeros(0, dtype=np.int64)
+            new_ids = np.arange(len(ids), dtype=np.int64) + first_element + sum(map(len, element_ids))
+            old_element_ids.append(ids)
+            element_ids.append(np.empty_like(new_ids))
+            element_ids[-1][order] = new_ids
+            domain_orders[domain.name] = order
+            if isinstance(domain, ElementsArray):
+                domain.connectivity = connectivity[order]
+                domain.ids = new_ids
+            else:
+                domain.all_elements = [domain.all_elements[row] for row in order.tolist()]
+                for item, item_id, text in zip(domain.all_elements, new_ids.tolist(), format_rows(connectivity[order])):
+                    item.id, item.text = item_id, text
+        renumbering = Renumbering(
+            node_ids=(node_ids, new_node_ids),
+            element_ids=(np.concatenate(old_element_ids or [np.zeros(0, dtype=np.int64)]), np.concatenate(element_ids or [np.zeros(0, dtype=np.int64)])),
+            node_orders={},
+            element_orders={},
+            domain_orders=domain_orders,
+        )
+
+        for domain, start, end in zip(self.nodes, index.offsets[:-1], index.offsets[1:]):
+            order = np.argsort(new_node_ids[start:end], kind="stable")
+            if isinstance(domain, NodesArray):
+                domain.coordinates = domain.coordinates[order]
+                domain.ids = new_node_ids[start:end][order]
+            else:
+                domain.all_nodes = [domain.all_nodes[row] for row in order.tolist()]
+                for node, node_id in zip(domain.all_nodes, new_node_ids[start:end][order].tolist()):
+                    node.id = node_id
+        for surface in self.surfaces:
+            if isinstance(surface, SurfaceArray):
+                surface.connectivity = new_node(surface.connectivity)
+            else:
+                for face_type in FACE_CORNERS:
+                    for face in getattr(surface, f"all_{face_type}"):
+                        face.text = ",".join(map(str, new_node(np.array(face.text.split(","), dtype=np.int64)).tolist()))
+        for node_set in self.node_sets:
+            node_set.text, renumbering.node_orders[node_set.name] = _renumbered_set(node_set.text, new_node)
+        for element_set in self.element_sets:
+            element_set.text, renumbering.element_orders[element_set.name] = _renumbered_set(element_set.text, renumbering.new_element_ids)
+        for discrete_set in self.discrete_sets:
+            for item in discrete_set.elements:
+                item.text = ",".join(map(str, new_node(np.array(item.text.split(","), dtype=np.int64)).tolist()))
+        self.reindex()
+        return renumbering
 
 
 ELEMENT_MAP: dict[str, SolidFEBioElementType | ShellFEBioElementType | BeamFEBioElementType] = {
@@ -270,38 +1243,42 @@ ELEMENT_CLASS_MAP: dict[str, type[ElementType]] = {
 EXCLUDE_SET_STR = ("gmsh:bounding_entities",)
 
 
+HEX27_REORDER = [2, 6, 7, 3, 1, 5, 4, 0, 18, 14, 19, 10, 17, 12, 16, 8, 9, 13, 15, 11, 21, 25, 20, 24, 23, 22, 26]
+
+
 def translate_meshio(
     meshobj: meshio.Mesh,
     nodeoffset: int = 0,
     elementoffset: int = 0,
     surfaceoffset: int = 0,
     shell_sets: list[str] | None = None,
+    arrays: bool = False,
 ) -> Mesh:
+    """
+    Translate a meshio mesh to a FEBio mesh with one element domain or surface per cell set.
+
+    Domains are built as :class:`Nodes`, :class:`Elements` and :class:`Surface`. With
+    arrays=True they are the array-backed :class:`NodesArray`, :class:`ElementsArray` and
+    :class:`SurfaceArray` instead, which are much faster to build and write for large meshes.
+    """
     if shell_sets is None:
         shell_sets = []
-    solid_nodes = []
-    for key, value in meshobj.cells_dict.items():
-        if meshio._mesh.topological_dimension[key] == 3:
-            solid_nodes.extend(np.unique(value.ravel()).tolist())
-    solid_nodes = set(solid_nodes)
+    cells_dict = meshobj.cells_dict
+    solid_cells = [value.ravel() for key, value in cells_dict.items() if meshio._mesh.topological_dimension[key] == 3]
+    solid_nodes = np.unique(np.concatenate(solid_cells)) if solid_cells else np.zeros(0, dtype=np.int64)
 
+    # 2D cells with a node outside of any solid are shells, otherwise they are surfaces of the solids
     make_element = {}
-    for key, values in meshobj.cells_dict.items():
-        make_element[key] = []
+    for key, values in cells_dict.items():
         if meshio._mesh.topological_dimension[key] == 2:
-            for element in values:
-                make_element[key].append(bool(set(np.unique(element.ravel())).difference(solid_nodes)))
+            make_element[key] = ~np.isin(values, solid_nodes).all(axis=1)
         else:
-            make_element[key].extend([True] * len(values))
+            make_element[key] = np.ones(len(values), dtype=bool)
 
     febio_mesh = Mesh()
-    nodes_object = Nodes()
-    for i, node in enumerate(meshobj.points):
-        nodes_object.add_node(Node(id=i + 1 + nodeoffset, text=",".join(map(str, node))))
+    nodes_object = NodesArray.from_array(meshobj.points, start_id=1 + nodeoffset)
     num_elements = 0
     num_surface_elements = 0
-    hex27_reorder = [2, 6, 7, 3, 1, 5, 4, 0, 18, 14, 19, 10, 17, 12, 16, 8, 9, 13, 15, 11]
-    hex27_reorder.extend([21, 25, 20, 24, 23, 22, 26])
     for name, members in meshobj.cell_sets_dict.items():
         if any([exclude in name.lower() for exclude in EXCLUDE_SET_STR]):
             continue
@@ -312,43 +1289,120 @@ def translate_meshio(
             else:
                 set_name = name
             etype = ELEMENT_MAP[member]
-            if shell_set or np.array(make_element[member])[offsets].all():
-                elements_object = Elements(name=set_name, type=etype)
-                for offset in offsets:
-                    element = meshobj.cells_dict[member][offset]
-                    if etype == "hex27":
-                        element = element[hex27_reorder]
-
-                    num_elements += 1
-                    elements_object.add_element(
-                        ELEMENT_CLASS_MAP[etype](
-                            id=num_elements + elementoffset,
-                            text=",".join(map(str, element + 1)),
-                        )
-                    )
-                febio_mesh.elements.append(elements_object)
+            connectivity = cells_dict[member][offsets] + 1
+            if shell_set or make_element[member][offsets].all():
+                if etype == "hex27":
+                    connectivity = connectivity[:, HEX27_REORDER]
+                febio_mesh.elements.append(
+                    ElementsArray.from_array(connectivity, etype, name=set_name, start_id=num_elements + 1 + elementoffset)
+                )
+                num_elements += len(connectivity)
             else:
-                surface_object = Surface(name=set_name)
-                fn_map = {
-                    "tri3": surface_object.add_tri3,
-                    "tri6": surface_object.add_tri6,
-                    "quad4": surface_object.add_quad4,
-                    "quad8": surface_object.add_quad8,
-                    "quad9": surface_object.add_quad9,
-                }
-                node_set = []
-                for offset in offsets:
-                    num_surface_elements += 1
-                    element = meshobj.cells_dict[member][offset]
-                    fn_map[ELEMENT_MAP[member]](
-                        ELEMENT_CLASS_MAP[etype](
-                            id=num_surface_elements + surfaceoffset,
-                            text=",".join(map(str, element + 1)),
-                        )
-                    )
-                    node_set.extend((element + 1).tolist())
-                node_sets = sorted(set(node_set))
-                febio_mesh.node_sets.append(NodeSet(name=set_name, text=",".join(map(str, node_sets))))
-                febio_mesh.surfaces.append(surface_object)
+                febio_mesh.surfaces.append(
+                    SurfaceArray.from_array(connectivity, etype, name=set_name, start_id=num_surface_elements + 1 + surfaceoffset)
+                )
+                num_surface_elements += len(connectivity)
+                febio_mesh.node_sets.append(NodeSet(name=set_name, text=",".join(map(str, np.unique(connectivity).tolist()))))
     febio_mesh.nodes.append(nodes_object)
+    if not arrays:
+        febio_mesh.nodes = [domain.to_nodes() for domain in febio_mesh.nodes]
+        febio_mesh.elements = [domain.to_elements() for domain in febio_mesh.elements]
+        febio_mesh.surfaces = [domain.to_surface() for domain in febio_mesh.surfaces]
     return febio_mesh
+
+
+class _RowReader:
+    """
+    Collects the ``<tag id="...">v1,v2,...</tag>`` rows of one mesh domain during
+    iterparse and converts them to arrays every CHUNK_SIZE rows, keyed by row tag.
+    """
+
+    def __init__(self, dtype: type):
+        self.dtype = dtype
+        self.pending: dict[str, tuple[list[str], list[str]]] = {}
+        self.chunks: dict[str, list[tuple[np.ndarray, np.ndarray]]] = {}
+
+    def add(self, tag: str, row_id: str | None, text: str | None):
+        ids, texts = self.pending.setdefault(tag, ([], []))
+        ids.append(row_id or "")
+        texts.append(text or "")
+        if len(ids) >= CHUNK_SIZE:
+            self._flush(tag)
+
+    def _flush(self, tag: str):
+        ids, texts = self.pending.pop(tag)
+        width = texts[0].count(",") + 1
+        self.chunks.setdefault(tag, []).append((np.array(ids, dtype=np.int64), parse_rows(texts, self.dtype, width)))
+
+    def arrays(self) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        for tag in list(self.pending):
+            self._flush(tag)
+        return {tag: (np.concatenate([c[0] for c in chunks]), np.concatenate([c[1] for c in chunks])) for tag, chunks in self.chunks.items()}
+
+
+_MESH_SET_FIELDS: dict[str, tuple[str, type[BaseXmlModel]]] = {
+    "ElementSet": ("element_sets", ElementSet),
+    "NodeSet": ("node_sets", NodeSet),
+    "DiscreteSet": ("discrete_sets", DiscreteSet),
+    "SurfacePair": ("surface_pairs", SurfacePair),
+}
+
+
+def _surface_from_rows(name: str, rows: dict[str, tuple[np.ndarray, np.ndarray]], arrays: bool = True) -> Surface | SurfaceArray:
+    if arrays and len(rows) == 1:
+        ((face_type, (ids, connectivity)),) = rows.items()
+        return SurfaceArray(name=name, type=face_type, ids=ids, connectivity=connectivity)
+    surface = Surface(name=name)
+    for face_type, (ids, connectivity) in rows.items():
+        faces = getattr(surface, f"all_{face_type}")
+        for face_id, text in zip(ids.tolist(), format_rows(connectivity)):
+            faces.append(ELEMENT_CLASS_MAP[face_type](id=face_id, text=text))
+    return surface
+
+
+def iterparse_mesh(events: Iterator[tuple[str, etree._Element]], mesh_element: etree._Element) -> Mesh:
+    """
+    Build a Mesh from ``lxml.etree.iterparse(..., events=("start", "end"))`` events, continuing
+    right after the start event of mesh_element and consuming events up to its end event.
+
+    Node, element and face rows go straight into NodesArray, ElementsArray and SurfaceArray
+    and are cleared from the tree as they are read, so memory does not hold the parsed xml.
+    """
+    febio_mesh = Mesh()
+    rows: _RowReader | None = None
+    for event, xml_element in events:
+        parent = xml_element.getparent()
+        if event == "start":
+            if parent is mesh_element and xml_element.tag in ("Nodes", "Elements", "Surface"):
+                rows = _RowReader(np.float64 if xml_element.tag == "Nodes" else np.int64)
+            continue
+        if xml_element is mesh_element:
+            return febio_mesh
+        if parent is mesh_element:
+            name = xml_element.get("name", "")
+            if xml_element.tag == "Nodes":
+                assert rows is not None
+                ids, coordinates = rows.arrays().get("node", (np.zeros(0, dtype=np.int64), np.zeros((0, 3))))
+                febio_mesh.nodes.append(NodesArray(name=name, ids=ids, coordinates=coordinates))
+            elif xml_element.tag == "Elements":
+                assert rows is not None
+                element_type = xml_element.get("type", "hex8")
+                empty = (np.zeros(0, dtype=np.int64), np.zeros((0, ELEMENT_NODE_COUNT[element_type]), dtype=np.int64))
+                ids, connectivity = rows.arrays().get("elem", empty)
+                febio_mesh.elements.append(ElementsArray(name=name, type=element_type, ids=ids, connectivity=connectivity))
+            elif xml_element.tag == "Surface":
+                assert rows is not None
+                febio_mesh.surfaces.append(_surface_from_rows(name, rows.arrays()))
+            elif xml_element.tag in _MESH_SET_FIELDS:
+                field_name, set_class = _MESH_SET_FIELDS[xml_element.tag]
+                getattr(febio_mesh, field_name).append(set_class.from_xml_tree(xml_element))
+            rows = None
+            xml_element.clear()
+            while xml_element.getprevious() is not None:
+                del mesh_element[0]
+        elif rows is not None and parent is not None and parent.getparent() is mesh_element:
+            rows.add(xml_element.tag, xml_element.get("id"), xml_element.text)
+            xml_element.clear()
+            while xml_element.getprevious() is not None:
+                del parent[0]
+    raise ValueError("unexpected end of file inside <Mesh>")
@@ -2,7 +2,7 @@ from typing import Literal
 
 from pydantic_xml import BaseXmlModel, attr, element
 
-from ._types import StringFloatVec2, StringUIntVec
+from ._types import Flag, StringFloatVec2, StringUIntVec, Zero
 
 
 class MaxVariableCriterion(BaseXmlModel, tag="criterion"):
@@ -22,7 +22,7 @@ class ContactGapCriterion(BaseXmlModel, tag="criterion"):
 
 class StressCriterion(BaseXmlModel, tag="criterion"):
     type: Literal["stress"] = attr(default="stress", frozen=True)
-    metric: Literal[0, 1] = element(default=0, description="0=effective stress, 1=max principal stress")
+    metric: Flag = element(default=0, description="0=effective stress, 1=max principal stress")
 
 
 class MathCriterion(BaseXmlModel, tag="criterion"):
@@ -39,13 +39,13 @@ class MinMaxFilterCriterion(BaseXmlModel, tag="criterion"):
     type: Literal["min-max filter"] = attr(default="min-max filter", frozen=True)
     min: float = element(default=-1e37)
     max: float = element(default=1e37)
-    clamp: Literal[0, 1] = element(default=0)
+    clamp: Flag = element(default=0)
     data: ContactGapCriterion | StressCriterion | DamageCriterion | MathCriterion = element(default=StressCriterion(), tag="data")
 
 
 class RelativeErrorCriterion(BaseXmlModel, tag="criterion"):
     type: Literal["relative error"] = attr(default="relative error", frozen=True)
-    error: Literal[0] | float = element(default=0)
+    error: Zero | float = element(default=0)
     data: ContactGapCriterion | StressCriterion | DamageCriterion | MathCriterion = element(default=StressCriterion(), tag="data")
 
 
@@ -104,8 +104,8 @@ class ErosionAdaptor(BaseXmlModel, tag="mesh_adaptor"):
     elem_set: str | None = attr(default=None)
     max_iters: int = element(default=1)
     max_elements: int = element(default=3)
-    remove_islands: Literal[0, 1] = element(default=0)
-    sort: Literal[0, 1] = element(default=1)
+    remove_islands: Flag = element(default=0)
+    sort: Flag = element(default=1)
     erode_surfaces: Literal["no", "yes", "grow", "reconstruct"] = element(default="no")
     criterion: CriterionType = element(default=MinMaxFilterCriterion(data=StressCriterion()))
 
@@ -118,9 +118,9 @@ class MMGRemeshAdaptor(BaseXmlModel, tag="mesh_adaptor"):
     min_element_size: float = element(default=0.1)
     hausdorff: float = element(default=0.01)
     gradation: float = element(default=1.3, gt=1.0)
-    mesh_coarsen: Literal[0, 1] = element(default=0)
-    normalize_data: Literal[0, 1] = element(default=0)
-    relative_size: Literal[0, 1] = element(default=1)
+    mesh_coarsen: Flag = element(default=0)
+    normalize_data: Flag = element(default=0)
+    relative_size: Flag = element(default=1)
     criterion: CriterionType = element(default=MinMaxFilterCriterion(data=StressCriterion()))
     size_function: MMGSizeFunctionType | None = element(default=None)
 
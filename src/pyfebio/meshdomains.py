@@ -2,6 +2,8 @@ from typing import Literal
 
 from pydantic_xml import BaseXmlModel, attr, element
 
+from ._types import Flag
+
 
 class SolidDomain(BaseXmlModel, validate_assignment=True):
     name: str = attr(default="SolidPart")
@@ -27,7 +29,7 @@ class SolidDomain(BaseXmlModel, validate_assignment=True):
     ) = attr(default=None)
     mat: str = attr(default="material")
     alpha: float | None = element(default=None)
-    iso_stab: Literal[0, 1] | None = element(default=None)
+    iso_stab: Flag | None = element(default=None)
 
 
 class ShellDomain(BaseXmlModel, validate_assignment=True):
@@ -1,7 +1,17 @@
+import hashlib
 import math
-import subprocess
+import mmap
+import os
+import uuid
+from collections.abc import Iterator, Sequence
+from io import BytesIO
 from pathlib import Path
+from typing import TYPE_CHECKING, Self
+from xml.parsers import expat
 
+import numpy as np
+from lxml import etree
+from pydantic import BaseModel, PrivateAttr
 from pydantic_xml import BaseXmlModel, attr, element
 
 from . import (
@@ -25,6 +35,16 @@ from . import (
     rigid,
     step,
 )
+from ._paths import get_step, parse_path
+from ._xml import ENCODING, Verbatim, fingerprint, render_sections, save_xml, write_xml
+
+if TYPE_CHECKING:
+    # the execution stack is only imported when a model is run
+    from . import quality
+    from .cache import ResultCache
+    from .progress import TerminationPolicy
+    from .runner import Scheduler
+    from .template import Template
 
 SectionTypes = (
     module.Module
@@ -49,6 +69,42 @@ SectionTypes = (
 )
 
 
+class _MeshInclude(BaseXmlModel, tag="febio_spec"):
+    version: str = attr(default="4.0")
+    mesh_: mesh.Mesh = element(default=mesh.Mesh(), tag="Mesh")
+
+
+class _HashWriter:
+    def __init__(self, digest):
+        self.write = digest.update
+
+
+class _SharedSection:
+    """
+    A section shared by clones of a model, with its serialized bytes once some clone has
+    rendered it. Nothing may change value while it is shared.
+    """
+
+    def __init__(self, value, rendered: tuple[bytes, bytes] | None = None):
+        self.value = value
+        self.rendered = rendered
+
+
+def _pop_mesh(root: BaseModel, verbatim: dict[str, Verbatim]) -> mesh.Mesh | Verbatim | None:
+    """
+    Take the Mesh section out of the root and sections returned by ``Model._prepare``,
+    either the streamed Mesh or its rendered bytes.
+    """
+    section = root.__dict__["mesh_"]
+    # the root is a throwaway copy, so the field is cleared without validation
+    root.__dict__["mesh_"] = None
+    return section if section is not None else verbatim.pop("Mesh", None)
+
+
+def _include_element(href: str) -> bytes:
+    return include.Include(text=href).to_xml(encoding=ENCODING, xml_declaration=False)
+
+
 class FEBioRoot(BaseXmlModel, tag="febio_spec", validate_assignment=True):
     version: str = attr(default="4.0")
     sections: list[SectionTypes] = element(default=[])
@@ -57,14 +113,151 @@ class FEBioRoot(BaseXmlModel, tag="febio_spec", validate_assignment=True):
         self.sections.append(section)
 
     def save(self, filename: str):
-        xml = self.to_xml(
-            pretty_print=True,
-            encoding="ISO-8859-1",
-            xml_declaration=True,
-            skip_empty=True,
-        )
-        with open(filename, "wb") as fid:
-            fid.write(xml)  # type: ignore
+        save_xml(self, filename)
+
+
+# fields that Model.load(..., lazy=True) leaves on disk until first access
+LAZY_SECTIONS = {"mesh_": "Mesh", "meshdata_": "MeshData"}
+# fields that Model.clone shares between the clones instead of copying
+SHARED_SECTIONS = ("mesh_", "meshdata_", "meshdomains_")
+
+SECTION_TAGS = {
+    "module_": "Module",
+    "globals_": "Globals",
+    "control_": "Control",
+    "material_": "Material",
+    "mesh_": "Mesh",
+    "meshdomains_": "MeshDomains",
+    "meshdata_": "MeshData",
+    "meshadaptor_": "MeshAdaptor",
+    "discrete_": "Discrete",
+    "loaddata_": "LoadData",
+    "loads_": "Loads",
+    "rigid_": "Rigid",
+    "initial_": "Initial",
+    "boundary_": "Boundary",
+    "contact_": "Contact",
+    "constraints_": "Constraints",
+    "step_": "Step",
+    "output_": "Output",
+}
+SECTION_ORDER = tuple(SECTION_TAGS.values())
+
+
+# bytes handed to expat at a time by _SectionFinder
+_PARSE_BLOCK = 1 << 20
+
+
+class _Unbalanced(Exception):
+    pass
+
+
+class _SectionFinder:
+    """
+    Finds the (start, stop) bytes of the children of the root element with expat, which
+    reports the byte offset of each parse event.
+
+    A child ends where the next parse event starts, as expat reports the end of a non-empty
+    element at the start of its end tag. With skip=True only the end tags named like the
+    child are looked at inside it, so a large Mesh costs little more than expat itself.
+    """
+
+    def __init__(self, skip: bool):
+        self.skip = skip
+        self.parser = expat.ParserCreate()
+        self.parser.StartElementHandler = self.start_element
+        self.parser.EndElementHandler = self.end_element
+        self.sections: dict[str, tuple[int, int]] = {}
+        self.depth = 0
+        self.child: tuple[str, int] | None = None
+        self.ended = False
+
+    def close(self, *_):
+        name, start = self.child
+        self.sections.setdefault(name, (start, self.parser.CurrentByteIndex))
+        self.ended = False
+        self.parser.DefaultHandler = None
+
+    def start_element(self, name, attributes):
+        if self.ended:
+            self.close()
+        if self.depth == 0 and self.child is not None:
+            raise _Unbalanced
+        self.depth += 1
+        if self.depth == 2:
+            self.child = (name, self.parser.CurrentByteIndex)
+            if self.skip:
+                self.parser.StartElementHandler = None
+                self.parser.EndElementHandler = self.child_end
+
+    def end_element(self, name):
+        if self.ended:
+            self.close()
+        if self.depth == 2:
+            # whatever comes next, including whitespace and comments, marks the end
+            self.ended = True
+            self.parser.DefaultHandler = self.close
+        self.depth -= 1
+        if self.depth < 0:
+            raise _Unbalanced
+
+    def child_end(self, name):
+        if name == self.child[0]:
+            self.parser.StartElementHandler = self.start_element
+            self.parser.EndElementHandler = self.end_element
+            self.end_element(name)
+
+    def parse(self, data: mmap.mmap | bytes) -> dict[str, tuple[int, int]]:
+        for position in range(0, len(data), _PARSE_BLOCK):
+            self.parser.Parse(data[position : position + _PARSE_BLOCK], False)
+        self.parser.Parse(b"", True)
+        # an element in a child named like the child is taken for its end, after which
+        # the root seems to close early or not at all
+        if self.depth != 0 or self.parser.EndElementHandler != self.end_element:
+            raise _Unbalanced
+        return self.sections
+
+
+def _find_sections(data: mmap.mmap | bytes) -> dict[str, tuple[int, int]]:
+    """
+    The (start, stop) bytes of the first element of each name among the children of the
+    root element. Comments, CDATA sections, processing instructions and the document type
+    declaration are left to expat.
+    """
+    try:
+        try:
+            return _SectionFinder(skip=True).parse(data)
+        except _Unbalanced:
+            return _SectionFinder(skip=False).parse(data)
+    except expat.ExpatError as error:
+        raise ValueError(f"malformed XML: {error}") from None
+
+
+class _Section:
+    """
+    The Model field of a section that may be shared with clones or left on disk by a lazy
+    load. Reading it copies or loads the section first.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, model, owner=None):
+        if model is None:
+            return self
+        private = model.__pydantic_private__
+        if private:
+            if self.name in private["_lazy_sections"]:
+                model._load_section(self.name)
+            if self.name in private["_shared_sections"]:
+                model._unshare(self.name)
+        try:
+            return model.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, model, value):
+        model.__dict__[self.name] = value
 
 
 class Model(BaseXmlModel, tag="febio_spec", validate_assignment=True, extra="forbid"):
@@ -88,20 +281,396 @@ class Model(BaseXmlModel, tag="febio_spec", validate_assignment=True, extra="for
     step_: step.Step = element(default=step.Step(), tag="Step")
     output_: output.Output = element(default=output.Output(), tag="Output")
 
-    def save(self, filename: str):
-        xml = self.to_xml(
-            pretty_print=True,
-            encoding="ISO-8859-1",
-            xml_declaration=True,
-            skip_empty=True,
-        )
-        assert isinstance(xml, bytes)
-        with open(filename, "wb") as fid:
-            fid.write(xml)
+    # field name -> (source file, start byte, end byte, encoding) of sections not parsed yet
+    _lazy_sections: dict[str, tuple[Path, int, int, str]] = PrivateAttr(default_factory=dict)
+    # field name -> (structural hash, serialized bytes) of sections written by save, with
+    # None for sections holding array-backed rows, which save streams instead
+    _section_cache: dict[str, tuple[bytes, bytes]] = PrivateAttr(default_factory=dict)
+    # field name -> section shared with clones, copied on first access
+    _shared_sections: dict[str, _SharedSection] = PrivateAttr(default_factory=dict)
+    # (mesh source or its cache entry, version, sha256) of the last mesh include written,
+    # kept by clones
+    _include_digest: tuple[object, str, str] | None = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value):
+        if name in LAZY_SECTIONS and name in self._lazy_sections:
+            self._lazy_sections = {key: value for key, value in self._lazy_sections.items() if key != name}
+        if name in SHARED_SECTIONS and name in self._shared_sections:
+            self._shared_sections = {key: value for key, value in self._shared_sections.items() if key != name}
+        super().__setattr__(name, value)
+
+    def __copy__(self) -> Self:
+        twin = super().__copy__()
+        # the cache is updated in place, so copies must not share it
+        twin._section_cache = dict(self._section_cache)
+        return twin
+
+    def _unshare(self, name: str):
+        shared = self._shared_sections[name]
+        self._shared_sections = {key: value for key, value in self._shared_sections.items() if key != name}
+        # the copy is as valid as the shared section, so it is stored without validation
+        self.__dict__[name] = shared.value.model_copy(deep=True)
+
+    def clone(self) -> Self:
+        """
+        A copy of the model that shares the Mesh, MeshData and MeshDomains sections with it
+        instead of copying them. All other sections are deep copies.
+
+        Shared sections stay shared, by this model and all of its clones, until one of them
+        accesses the section as an attribute: that model then gets its own deep copy first,
+        so changes never leak between clones. ``save`` reads shared sections without copying
+        them, and a shared section is serialized once for all models sharing it, so saving
+        many clones that differ only in small sections costs only those sections.
+
+        References to a section taken before cloning bypass this; fetch the section again
+        from the model after cloning to change it.
+        """
+        for name in SHARED_SECTIONS:
+            if name in self._shared_sections or name in self._lazy_sections:
+                continue
+            value = self.__dict__[name]
+            rendered = self._section_cache.get(name)
+            if rendered is not None:
+                digest = hashlib.blake2b()
+                fingerprint(value, digest)
+                rendered = rendered if rendered[0] == digest.digest() else None
+            self._shared_sections = {**self._shared_sections, name: _SharedSection(value, rendered)}
+        update = {
+            name: value.model_copy(deep=True) if isinstance(value, BaseModel) else value
+            for name, value in self.__dict__.items()
+            if name not in SHARED_SECTIONS
+        }
+        twin = self.model_copy(update=update)
+        twin._lazy_sections = dict(self._lazy_sections)
+        twin._shared_sections = dict(self._shared_sections)
+        return twin
+
+    def _load_section(self, name: str):
+        path, start, stop, encoding = self._lazy_sections[name]
+        with open(path, "rb") as fid:
+            fid.seek(start)
+            data = fid.read(stop - start)
+        if name == "mesh_":
+            events = etree.iterparse(
+                BytesIO(data), events=("start", "end"), remove_blank_text=True, huge_tree=True, encoding=encoding
+            )
+            _, xml_element = next(events)
+            section = mesh.iterparse_mesh(events, xml_element)
+        else:
+            parser = etree.XMLParser(remove_blank_text=True, huge_tree=True, encoding=encoding)
+            section = meshdata.MeshData.from_xml_tree(etree.fromstring(data, parser))
+        setattr(self, name, section)
+
+    def load_sections(self):
+        """
+        Parse any sections left on disk by ``Model.load(..., lazy=True)``.
+        """
+        for name in list(self._lazy_sections):
+            self._load_section(name)
+
+    def to_xml_tree(self, **kwargs) -> etree._Element:
+        self.load_sections()
+        if self._shared_sections:
+            # serialize a shallow copy that does not know the sections are shared, so
+            # reading them does not copy them
+            view = self.model_copy()
+            view._shared_sections = {}
+            return view.to_xml_tree(**kwargs)
+        return super().to_xml_tree(**kwargs)
+
+    def model_dump(self, **kwargs):
+        self.load_sections()
+        return super().model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs):
+        self.load_sections()
+        return super().model_dump_json(**kwargs)
+
+    def save(self, filename: str | Path, mesh_include: str | Path | None = None):
+        """
+        Write the model to filename. Array-backed mesh rows are rendered in chunks
+        without building an xml tree for them.
+
+        Each rendered section is cached together with a structural hash of its content, and
+        later saves only render the sections whose hash changed. Sections holding array-backed
+        rows are not cached but streamed to the file on every save, so the cache only holds
+        the small sections; drop it with ``clear_section_cache``.
+
+        Sections still pending from ``Model.load(..., lazy=True)`` are copied from the
+        source file byte for byte without being parsed.
+
+        With mesh_include, the Mesh section is written to that file instead, relative to
+        the directory of filename, and filename refers to it with an Include element. The
+        include file carries a hash of its content and is only rewritten when the mesh
+        changes, so many variants of one geometry can share it cheaply.
+        """
+        target = Path(filename).resolve()
+        if any(target == path for path, *_ in self._lazy_sections.values()):
+            self.load_sections()
+        root, verbatim = self._prepare()
+        if mesh_include is not None:
+            include_path = target.parent / mesh_include
+            if include_path.resolve() == target:
+                raise ValueError("mesh_include must differ from filename")
+            self._save_mesh_include(include_path, _pop_mesh(root, verbatim))
+            href = Path(os.path.relpath(include_path.resolve(), target.parent)).as_posix()
+            verbatim["Mesh"] = _include_element(href)
+        save_xml(root, filename, verbatim, SECTION_ORDER)
+
+    def save_mesh_include(self, filename: str | Path):
+        """
+        Write only the mesh include file that ``save`` writes with mesh_include, to
+        filename. Like there, an include file with the same content is not rewritten.
+        """
+        root, verbatim = self._prepare()
+        self._save_mesh_include(Path(filename), _pop_mesh(root, verbatim))
+
+    def _prepare(self) -> tuple[Self, dict[str, Verbatim]]:
+        """
+        The model with only the sections that are streamed, and the other sections to write
+        into it by tag.
+        """
+        verbatim = self._render_sections()
+        streamed = {
+            name: self.__dict__[name]
+            for name in SECTION_TAGS
+            if name not in self._lazy_sections and self.__dict__[name] is not None and self._section_cache[name][1] is None
+        }
+        root = self.model_copy(update={name: streamed.get(name) for name in SECTION_TAGS})
+        root._lazy_sections = {}
+        root._shared_sections = {}
+        return root, verbatim
+
+    def to_template(self, fields: Sequence[str], mesh_include: str | None = None) -> "Template":
+        """
+        Serialize the model once with slots at the fields addressed by the paths in fields,
+        such as ``material_.all_materials[0].E`` or ``control_.step_size``, to write
+        variants that only differ in those values without serializing the model again.
+
+        A path to a model with a ``text`` field, such as a MaterialParameter, addresses its
+        text. With mesh_include, the Mesh section goes to that file, written next to each
+        saved variant that does not have it yet, and the variants refer to it.
+
+        Example::
+
+            template = model.to_template(["material_.all_materials[0].E", "control_.step_size"])
+            for index, (E, step_size) in enumerate(samples):
+                template.save(f"runs/variant_{index}.feb", [E, step_size])
+        """
+        model = self.clone()
+        token = uuid.uuid4().hex
+        markers = [f"pyfebio-slot-{token}-{index}".encode() for index in range(len(fields))]
+        for path, marker in zip(fields, markers):
+            steps = parse_path(path)
+            parent = model
+            for name in steps[:-1]:
+                parent = get_step(parent, name)
+            last = steps[-1]
+            current = get_step(parent, last)
+            if isinstance(current, BaseModel) and "text" in type(current).model_fields:
+                parent, last = current, "text"
+            # the marker is not a valid value for most fields, so validation is bypassed
+            if isinstance(last, int):
+                parent[last] = marker.decode()
+            else:
+                parent.__dict__[last] = marker.decode()
+        root, verbatim = model._prepare()
+        include_file = None
+        if mesh_include is not None:
+            buffer = BytesIO()
+            include_root, include_verbatim, order, comment = model._mesh_include(_pop_mesh(root, verbatim))
+            write_xml(include_root, buffer, include_verbatim, order, comment)
+            include_file = (Path(mesh_include).as_posix(), buffer.getvalue())
+            verbatim["Mesh"] = _include_element(include_file[0])
+        buffer = BytesIO()
+        write_xml(root, buffer, verbatim, SECTION_ORDER)
+        data = buffer.getvalue()
+        positions = []
+        for slot, (path, marker) in enumerate(zip(fields, markers)):
+            position = data.find(marker)
+            if position == -1:
+                raise ValueError(f"field {path!r} is not written to the model file")
+            positions.append((position, slot, len(marker)))
+        positions.sort()
+        chunks, start = [], 0
+        for position, _, size in positions:
+            chunks.append(data[start:position])
+            start = position + size
+        chunks.append(data[start:])
+        from .template import Template
+
+        return Template(fields, chunks, [slot for _, slot, _ in positions], include_file)
+
+    def _render_sections(self) -> dict[str, Verbatim]:
+        sections: dict[str, Verbatim] = {}
+        stale = {}
+        for name, tag in SECTION_TAGS.items():
+            if name in self._lazy_sections:
+                path, start, stop, _ = self._lazy_sections[name]
+                sections[tag] = (path, start, stop)
+                continue
+            value = self.__dict__[name]
+            if value is None:
+                continue
+            shared = self._shared_sections.get(name)
+            if shared is not None and shared.rendered is not None:
+                self._section_cache[name] = shared.rendered
+                continue
+            digest = hashlib.blake2b()
+            fingerprint(value, digest)
+            key = digest.digest()
+            cached = self._section_cache.get(name)
+            if cached is None or cached[0] != key:
+                stale[name] = key
+        if stale:
+            model = self.model_copy(update={name: None for name in SECTION_TAGS if name not in stale})
+            model._lazy_sections = {}
+            model._shared_sections = {}
+            rendered = render_sections(model)
+            for name, key in stale.items():
+                self._section_cache[name] = (key, rendered.get(SECTION_TAGS[name], b""))
+                if name in self._shared_sections:
+                    self._shared_sections[name].rendered = self._section_cache[name]
+        for name, tag in SECTION_TAGS.items():
+            if tag not in sections and self.__dict__[name] is not None and self._section_cache[name][1]:
+                sections[tag] = self._section_cache[name][1]
+        return sections
+
+    def clear_section_cache(self):
+        """
+        Drop the serialized sections kept by ``save``.
+        """
+        self._section_cache = {}
+
+    def _mesh_include(
+        self, source: mesh.Mesh | Verbatim | None
+    ) -> tuple[_MeshInclude, dict[str, Verbatim] | None, Sequence[str], str]:
+        """
+        The arguments of ``write_xml`` for a mesh include file holding source, a streamed
+        Mesh or the rendered section, commented with the sha256 of its content.
+        """
+        if isinstance(source, mesh.Mesh):
+            # a streamed mesh is unchanged as long as its cache entry is
+            root, verbatim, token = _MeshInclude(version=self.version, mesh_=source), None, self._section_cache["mesh_"]
+        else:
+            root, verbatim, token = _MeshInclude(version=self.version), {"Mesh": source} if source else None, source
+        memo = self._include_digest
+        if memo is not None and memo[0] is token and memo[1] == self.version:
+            hexdigest = memo[2]
+        else:
+            digest = hashlib.sha256()
+            write_xml(root, _HashWriter(digest), verbatim, SECTION_ORDER)
+            hexdigest = digest.hexdigest()
+            self._include_digest = (token, self.version, hexdigest)
+        return root, verbatim, SECTION_ORDER, f" sha256 {hexdigest} "
+
+    def _save_mesh_include(self, filename: Path, source: mesh.Mesh | Verbatim | None):
+        root, verbatim, order, comment = self._mesh_include(source)
+        if filename.is_file():
+            with open(filename, "rb") as fid:
+                if f"<!--{comment}-->".encode() in fid.read(1024):
+                    return
+        save_xml(root, filename, verbatim, order, comment)
+
+    @classmethod
+    def load(cls, filename: str | Path, lazy: bool = False) -> Self:
+        """
+        Read a model from a .feb file.
+
+        The file is parsed incrementally with ``lxml.etree.iterparse``. The Mesh section is
+        loaded straight into array-backed NodesArray, ElementsArray and SurfaceArray domains
+        and dropped from the parse tree as it goes, so memory scales with the arrays rather
+        than the xml. All other sections are parsed as usual.
+
+        With lazy=True only the byte ranges of the Mesh and MeshData sections are recorded.
+        Each is parsed the first time it is accessed, and sections never accessed are copied
+        verbatim from filename by ``save``. filename must not change while sections are pending.
+        """
+        if lazy:
+            return cls._load_lazy(filename)
+        events = etree.iterparse(str(filename), events=("start", "end"), remove_blank_text=True, huge_tree=True)
+        _, root = next(events)
+        mesh_ = None
+        for event, xml_element in events:
+            if event == "start" and xml_element.tag == "Mesh" and xml_element.getparent() is root:
+                mesh_ = mesh.iterparse_mesh(events, xml_element)
+                xml_element.clear()
+        model = cls.from_xml_tree(root)
+        if mesh_ is not None:
+            model.mesh_ = mesh_
+        return model
+
+    @classmethod
+    def _load_lazy(cls, filename: str | Path) -> Self:
+        path = Path(filename).resolve()
+        with open(path, "rb") as fid, mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            found = _find_sections(data)
+            sections = {name: found[tag] for name, tag in LAZY_SECTIONS.items() if tag in found}
+            remainder, position = [], 0
+            for start, stop in sorted(sections.values()):
+                remainder.append(data[position:start])
+                position = stop
+            remainder.append(data[position:])
+        parser = etree.XMLParser(remove_blank_text=True, huge_tree=True)
+        root = etree.fromstring(b"".join(remainder), parser)
+        model = cls.from_xml_tree(root)
+        encoding = root.getroottree().docinfo.encoding
+        model._lazy_sections = {name: (path, start, stop, encoding) for name, (start, stop) in sections.items()}
+        return model
+
+    def renumber(self) -> mesh.Renumbering:
+        """
+        Renumber the mesh for a small matrix bandwidth with ``Mesh.renumber``. The node
+        and element data of the mesh data section are reordered with their sets, or with
+        the element domain of that name when there is no such element set, and the
+        elements of element selection criteria of mesh adaptors renumbered.
+
+        Do this once before saving a model that is run many times, such as the base
+        model of a sweep, instead of having FEBio optimize the bandwidth on every run.
+        """
+        renumbering = self.mesh_.renumber()
+        for data, orders in (
+            *((data, renumbering.node_orders.get(data.node_set)) for data in self.meshdata_.node_data),
+            *(
+                (data, renumbering.element_orders.get(data.elem_set, renumbering.domain_orders.get(data.elem_set)))
+                for data in self.meshdata_.element_data
+            ),
+        ):
+            if orders is None:
+                continue
+            positions = np.empty_like(orders)
+            positions[orders] = np.arange(1, len(orders) + 1)
+            items = data.all_nodes if isinstance(data, meshdata.NodeData) else data.all_elements
+            for item in items:
+                item.lid = int(positions[item.lid - 1])
+            items.sort(key=lambda item: item.lid)
+        for criterion in _submodels(self.meshadaptor_):
+            if isinstance(criterion, meshadaptor.ElementSelectionCriterion):
+                element_ids = renumbering.new_element_ids(np.array(criterion.element_list.split(","), dtype=np.int64))
+                criterion.element_list = ",".join(map(str, element_ids.tolist()))
+        return renumbering
+
+    def preflight(self, thresholds: "quality.QualityThresholds | None" = None) -> "list[quality.ElementQuality]":
+        """
+        Measure the elements of the mesh with ``quality.mesh_quality`` and raise ValueError
+        listing the limits of thresholds (by default ``QualityThresholds()``) they break.
+
+        Call this before saving a model to run, so a model FEBio would fail on with
+        negative Jacobians or crawl through with tiny time steps is refused up front.
+        Returns the measured quality when every element passes.
+        """
+        from . import quality
+
+        thresholds = quality.QualityThresholds() if thresholds is None else thresholds
+        measured = quality.mesh_quality(self.mesh_)
+        problems = [problem for domain in measured for problem in thresholds.check(domain)]
+        if problems:
+            raise ValueError("mesh quality below preflight thresholds:\n" + "\n".join(problems))
+        return measured
 
     def add_simple_rigid_body(self, origin: tuple[float, float, float], name: str):
-        element_id = self.mesh_.elements[-1].all_elements[-1].id + 1
-        node_id_start = self.mesh_.nodes[-1].all_nodes[-1].id + 1
+        element_id = self.mesh_.next_element_id()
+        node_id_start = self.mesh_.next_node_id()
         connectivity = [node_id for node_id in range(node_id_start, node_id_start + 4)]
         sqrt3over2 = math.sqrt(3.0) / 2.0
         ideal_tet = [
@@ -125,6 +694,21 @@ class Model(BaseXmlModel, tag="febio_spec", validate_assignment=True, extra="for
         self.meshdomains_.add_solid_domain(meshdomains.SolidDomain(name=name, mat=name))
 
 
+# installed after the class is built, so pydantic still sees plain fields
+for _name in SHARED_SECTIONS:
+    setattr(Model, _name, _Section(_name))
+
+
+def _submodels(value: object) -> Iterator[BaseModel]:
+    if isinstance(value, BaseModel):
+        yield value
+        for item in value.__dict__.values():
+            yield from _submodels(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _submodels(item)
+
+
 class BiphasicModel(Model):
     module_: module.Module | None = element(default=module.Module(type="biphasic"))
     control_: control.Control | None = element(
@@ -138,8 +722,23 @@ class BiphasicModel(Model):
     )
 
 
-def run_model(filepath: str | Path, silent: bool = False) -> int:
-    if silent:
-        return subprocess.run(f"febio4 -i {filepath} -silent", shell=True).returncode
-    else:
-        return subprocess.run(f"febio4 -i {filepath}", shell=True).returncode
+def run_model(
+    filepath: str | Path,
+    silent: bool = False,
+    cache: "ResultCache | None" = None,
+    policy: "TerminationPolicy | None" = None,
+    threads: int | None = None,
+    scheduler: "Scheduler | None" = None,
+) -> int:
+    """
+    Run FEBio on filepath and return its exit code, with ``runner.run_model``.
+
+    With cache, outputs of an identical earlier run are restored instead of running FEBio,
+    and the outputs of a successful run are stored. With a TerminationPolicy, the process
+    is stopped once a rule is broken, returning the (negative) code of the signal that
+    stopped it. With scheduler, the run waits for threads cores of its budget. Use
+    ``runner.run_model`` to also get the termination reason.
+    """
+    from . import runner
+
+    return runner.run_model(filepath, silent=silent, cache=cache, policy=policy, threads=threads, scheduler=scheduler).returncode
@@ -0,0 +1,191 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Literal
+
+from .control import Control
+
+NORMAL_TERMINATION = "N O R M A L   T E R M I N A T I O N"
+ERROR_TERMINATION = "E R R O R   T E R M I N A T I O N"
+
+EventKind = Literal["step_started", "iteration", "converged", "failed", "retry", "step_size", "terminated"]
+
+_STEP_STARTED = re.compile(r"=+\s*beginning time step (\d+)\s*:\s*(\S+)")
+_SOLUTION_STATUS = re.compile(r"Nonlinear solution status:\s*time\s*=\s*(\S+)")
+_NORM = re.compile(r"(\S(?:.*\S)?)\s+(\S+)\s+(\S+)\s+(\S+)$")
+_CONVERGED = re.compile(r"-+\s*converged at time\s*:\s*(\S+)")
+_FAILED = re.compile(r"-+\s*failed to converge at time\s*:\s*(\S+)")
+_RETRY = re.compile(r"Retrying time step\.\s*Retry attempt (\d+) of max (\d+)")
+_STEP_SIZE = re.compile(r"(?:AUTO STEPPER|MUST POINT CONTROLLER):.*dt\s*=\s*(\S+)")
+
+
+def _float(text: str) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        return float("nan")
+
+
+@dataclass
+class ProgressEvent:
+    """
+    Something FEBio reported while solving.
+
+    step and time are the time step number and the time being solved for. An "iteration"
+    event carries the Newton iteration number within the attempt and the convergence
+    norms as name -> (initial, current, required). "retry" carries the retry number and
+    the maximum allowed, "step_size" the new dt, and "terminated" the termination reason
+    ("normal" or "error") as detail.
+    """
+
+    kind: EventKind
+    step: int | None = None
+    time: float | None = None
+    iteration: int | None = None
+    norms: dict[str, tuple[float, float, float]] = field(default_factory=dict)
+    retry: int | None = None
+    max_retries: int | None = None
+    dt: float | None = None
+    detail: str = ""
+
+
+class ProgressParser:
+    """
+    Turn FEBio output, fed one line at a time, into ProgressEvents.
+
+    Works on both the console output and the log file, which FEBio writes in the same
+    format. Lines are first screened with cheap substring tests, so following the output
+    of a long run costs next to nothing.
+    """
+
+    def __init__(self):
+        self.step: int | None = None
+        self.time: float | None = None
+        self.iteration = 0
+        self._norms: dict[str, tuple[float, float, float]] | None = None
+
+    def _event(self, kind: EventKind, **kwargs) -> ProgressEvent:
+        return ProgressEvent(kind=kind, **{"step": self.step, "time": self.time, **kwargs})
+
+    def feed(self, line: str) -> list[ProgressEvent]:
+        events = []
+        line = line.strip()
+        if self._norms is not None:
+            match = _NORM.match(line)
+            if match is not None and line != "" and not line[0].isdigit():
+                name, *values = match.groups()
+                self._norms[name] = tuple(_float(value) for value in values)
+                return events
+            events.append(self._event("iteration", iteration=self.iteration, norms=self._norms))
+            self._norms = None
+        if not line:
+            return events
+        if "dt" in line and ("AUTO STEPPER" in line or "MUST POINT CONTROLLER" in line):
+            # not all of these mention the time step, such as "AUTO STEPPER: retry step, dt = ..."
+            if match := _STEP_SIZE.search(line):
+                events.append(self._event("step_size", dt=_float(match.group(1))))
+        elif "time step" in line:
+            if match := _STEP_STARTED.search(line):
+                self.step, self.time, self.iteration = int(match.group(1)), _float(match.group(2)), 0
+                events.append(self._event("step_started"))
+            elif match := _RETRY.search(line):
+                self.iteration = 0
+                events.append(self._event("retry", retry=int(match.group(1)), max_retries=int(match.group(2))))
+        elif "Nonlinear solution status" in line:
+            if _SOLUTION_STATUS.search(line):
+                self.iteration += 1
+        elif "convergence norms" in line:
+            self._norms = {}
+        elif "at time" in line:
+            if match := _CONVERGED.search(line):
+                events.append(self._event("converged", time=_float(match.group(1)), iteration=self.iteration))
+            elif match := _FAILED.search(line):
+                events.append(self._event("failed", time=_float(match.group(1)), iteration=self.iteration))
+        elif NORMAL_TERMINATION in line:
+            events.append(self._event("terminated", detail="normal"))
+        elif ERROR_TERMINATION in line:
+            events.append(self._event("terminated", detail="error"))
+        return events
+
+
+@dataclass
+class TerminationPolicy:
+    """
+    Rules for stopping a FEBio run that is not going anywhere.
+
+    - max_retries: retries of a single time step
+    - max_cutbacks: retries over the whole run
+    - dtmin: smallest time step size
+    - wall_time: seconds the run may take
+    - stagnation: consecutive Newton iterations in which the residual norm does not drop
+      below stagnation_ratio times the smallest residual of the attempt so far
+    - stall_steps: consecutive converged time steps that each advance the time by no more
+      than dtmin, for a run crawling along at its smallest time step
+
+    A rule set to None is not applied. ``from_control`` takes dtmin from the time stepper
+    of a model. It leaves max_retries unset, as FEBio already gives up on a time step
+    after the max_retries of its time stepper.
+    """
+
+    max_retries: int | None = None
+    max_cutbacks: int | None = None
+    dtmin: float | None = None
+    wall_time: float | None = None
+    stagnation: int | None = None
+    stagnation_ratio: float = 0.9
+    stall_steps: int | None = None
+
+    @classmethod
+    def from_control(cls, control: Control, **kwargs) -> "TerminationPolicy":
+        stepper = control.time_stepper
+        if stepper is not None:
+            kwargs.setdefault("dtmin", stepper.dtmin or None)
+        return cls(**kwargs)
+
+    def watch(self) -> "PolicyWatcher":
+        return PolicyWatcher(self)
+
+
+class PolicyWatcher:
+    """
+    Applies a TerminationPolicy to the events of one run. ``check`` returns why the run
+    should be stopped, or None.
+    """
+
+    def __init__(self, policy: TerminationPolicy):
+        self.policy = policy
+        self.cutbacks = 0
+        self._best = math.inf
+        self._stalled = 0
+        self._time = 0.0
+        self._crawling = 0
+
+    def check(self, event: ProgressEvent) -> str | None:
+        policy = self.policy
+        if event.kind in ("step_started", "retry"):
+            self._best, self._stalled = math.inf, 0
+        if event.kind == "retry":
+            self.cutbacks += 1
+            if policy.max_retries is not None and event.retry > policy.max_retries:
+                return f"time step {event.step} retried {event.retry} times, more than max_retries={policy.max_retries}"
+            if policy.max_cutbacks is not None and self.cutbacks > policy.max_cutbacks:
+                return f"{self.cutbacks} time step cutbacks, more than max_cutbacks={policy.max_cutbacks}"
+        elif event.kind == "step_size":
+            if policy.dtmin is not None and event.dt < policy.dtmin:
+                return f"time step size {event.dt:g} below dtmin={policy.dtmin:g}"
+        elif event.kind == "converged" and policy.stall_steps is not None and policy.dtmin is not None and event.time is not None:
+            # with a little slack, FEBio prints the time rounded
+            advance, self._time = event.time - self._time, event.time
+            self._crawling = self._crawling + 1 if advance <= policy.dtmin * (1 + 1e-6) else 0
+            if self._crawling >= policy.stall_steps:
+                return f"time advanced by no more than dtmin={policy.dtmin:g} in {self._crawling} consecutive time steps"
+        elif event.kind == "iteration" and policy.stagnation is not None and event.norms:
+            residual = event.norms.get("residual", next(iter(event.norms.values())))[1]
+            if residual < policy.stagnation_ratio * self._best:
+                self._best, self._stalled = residual, 0
+            else:
+                self._best = min(self._best, residual)
+                self._stalled += 1
+                if self._stalled >= policy.stagnation:
+                    return f"residual stagnated for {self._stalled} iterations of time step {event.step}"
+        return None
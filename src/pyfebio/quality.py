@@ -0,0 +1,328 @@
+from dataclasses import dataclass
+from itertools import product
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .mesh import FACE_CORNERS, SOLID_FACES, Mesh, element_arrays
+
+# elements are measured in blocks of this many to bound the size of the Jacobian arrays
+BLOCK = 16384
+
+
+def _exponents(dimension: int, rule: str) -> list[tuple[int, ...]]:
+    # the monomials spanned by the shape functions of an element family
+    degree = int(rule[-1])
+    allowed = {
+        "total": lambda powers: sum(powers) <= degree,
+        "tensor": lambda powers: True,
+        "serendipity": lambda powers: powers.count(2) <= 1,
+    }[rule[:-1]]
+    return [powers for powers in product(range(degree + 1), repeat=dimension) if allowed(powers)]
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # np.cross copies its operands, this is several times faster on large stacks
+    (a0, a1, a2), (b0, b1, b2) = np.moveaxis(a, -1, 0), np.moveaxis(b, -1, 0)
+    return np.stack([a1 * b2 - a2 * b1, a2 * b0 - a0 * b2, a0 * b1 - a1 * b0], axis=-1)
+
+
+def _lengths(vectors: np.ndarray) -> np.ndarray:
+    return np.sqrt(np.einsum("...i,...i->...", vectors, vectors))
+
+
+def _with_midpoints(corners: list[tuple[float, ...]], groups: list[tuple[int, ...]]) -> list[tuple[float, ...]]:
+    points = np.array(corners, dtype=np.float64)
+    return corners + [tuple(points[list(group)].mean(axis=0)) for group in groups]
+
+
+class Shape:
+    """
+    The Lagrange shape functions of an element type, from the natural coordinates of its
+    nodes and the monomials they span, with the corner loops of its faces (a single loop
+    for surface and line elements).
+
+    The Jacobian is evaluated at the nodes and at the centre of the corners. axes maps the
+    natural coordinates to the ideal element of the type, whose scaled Jacobian is 1.
+    """
+
+    def __init__(self, nodes: list[tuple[float, ...]], exponents: list[tuple[int, ...]], loops: list[list[int]], axes: ArrayLike):
+        self.nodes = np.array(nodes, dtype=np.float64)
+        self.exponents = np.array(exponents, dtype=np.int64)
+        self.dimension = self.nodes.shape[1]
+        self.loops = loops
+        # shape function i is the sum over monomials j of monomial_j * coefficients[j, i]
+        self.coefficients = np.linalg.inv(self._monomials(self.nodes, self.exponents))
+        self.corners = max(max(loop) for loop in loops) + 1
+        edges = {tuple(sorted(edge)) for loop in loops for edge in zip(loop, loop[1:] + loop[:1])}
+        self.edges = np.array(sorted(edges), dtype=np.int64)
+        faces: dict[tuple[int, int], list[int]] = {}
+        for face, loop in enumerate(loops if self.dimension == 3 else []):
+            for edge in zip(loop, loop[1:] + loop[:1]):
+                faces.setdefault(tuple(sorted(edge)), []).append(face)
+        self.adjacent_faces = np.array([pair for pair in faces.values() if len(pair) == 2], dtype=np.int64).reshape(-1, 2)
+        # the normal of a triangle or quadrilateral loop is the cross product of two of its
+        # edges or diagonals, and the loop of a line has none
+        vectors = [
+            [loop[1], loop[0], loop[2], loop[0]] if len(loop) == 3 else [loop[2], loop[0], loop[3], loop[1]]
+            for loop in loops
+            if len(loop) > 2
+        ]
+        self.normal_vectors = np.array(vectors, dtype=np.int64).reshape(-1, 4).T
+        self.points = np.vstack([self.nodes, self.nodes[: self.corners].mean(axis=0)])
+        self.gradients = self.shape_gradients(self.points)
+        ideal = np.zeros((len(self.nodes), 3))
+        ideal[:, : self.dimension] = self.nodes @ np.asarray(axes, dtype=np.float64)
+        self.ideal = 1.0
+        self.ideal = float(self.jacobians(ideal[None])[1].min())
+
+    @staticmethod
+    def _monomials(points: np.ndarray, exponents: np.ndarray) -> np.ndarray:
+        return np.prod(points[:, None, :] ** exponents[None], axis=2)
+
+    def shape_gradients(self, points: ArrayLike) -> np.ndarray:
+        """
+        The (Q, nodes, dimension) derivatives of the shape functions with respect to the
+        natural coordinates at (Q, dimension) points.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, self.dimension)
+        gradients = np.empty((len(points), len(self.nodes), self.dimension))
+        for axis in range(self.dimension):
+            lowered = self.exponents.copy()
+            lowered[:, axis] = np.maximum(lowered[:, axis] - 1, 0)
+            gradients[:, :, axis] = (self._monomials(points, lowered) * self.exponents[:, axis]) @ self.coefficients
+        return gradients
+
+    def jacobians(self, coordinates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The (E, Q) Jacobian determinants of elements with (E, nodes, 3) coordinates at the
+        evaluation points, and the determinants scaled by the lengths of the Jacobian
+        columns and normalized by the ideal element.
+
+        Surface and line elements have 3 x 2 and 3 x 1 Jacobians. Their determinant is the
+        area or length scale, signed against the normal or tangent at the centre.
+        """
+        count, nodes, _ = coordinates.shape
+        gradients = self.gradients.transpose(1, 0, 2).reshape(nodes, -1)
+        columns = coordinates.transpose(0, 2, 1).reshape(-1, nodes) @ gradients
+        columns = columns.reshape(count, 3, len(self.points), self.dimension).transpose(0, 2, 3, 1)
+        if self.dimension == 3:
+            determinants = np.einsum("eqi,eqi->eq", columns[:, :, 0], _cross(columns[:, :, 1], columns[:, :, 2]))
+        else:
+            directions = _cross(columns[:, :, 0], columns[:, :, 1]) if self.dimension == 2 else columns[:, :, 0]
+            # the normal or tangent at the centre, the last evaluation point
+            reference = directions[:, -1:]
+            lengths = _lengths(reference)[..., None]
+            reference = np.divide(reference, lengths, out=np.zeros_like(reference), where=lengths > 0)
+            determinants = np.einsum("eqi,eqi->eq", directions, np.broadcast_to(reference, directions.shape))
+        scale = _lengths(columns).prod(axis=2) * self.ideal
+        scaled = np.divide(determinants, scale, out=np.zeros_like(determinants), where=scale > 0)
+        return determinants, scaled
+
+    def min_angles(self, corners: np.ndarray) -> np.ndarray:
+        """
+        The smallest dihedral angle of solid elements, and the smallest corner angle of
+        surface elements, in degrees, from their (E, corners, 3) coordinates. NaN for lines.
+        """
+        if self.dimension == 1:
+            return np.full(len(corners), np.nan)
+        head, tail, other_head, other_tail = self.normal_vectors
+        normals = _cross(corners[:, head] - corners[:, tail], corners[:, other_head] - corners[:, other_tail])
+        lengths = _lengths(normals)[..., None]
+        normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+        if self.dimension == 3:
+            first, second = self.adjacent_faces.T
+            cosines = -np.einsum("efi,efi->ef", normals[:, first], normals[:, second])
+            angles = np.degrees(np.arccos(np.clip(cosines, -1.0, 1.0)))
+            degenerate = (lengths[:, first, 0] == 0) | (lengths[:, second, 0] == 0)
+            return np.where(degenerate, 0.0, angles).min(axis=1)
+        loop = np.array(self.loops[0])
+        after = corners[:, np.roll(loop, -1)] - corners[:, loop]
+        before = corners[:, np.roll(loop, 1)] - corners[:, loop]
+        # measured counterclockwise about the normal, so reentrant corners exceed 180
+        sines = np.einsum("eki,ei->ek", _cross(after, before), normals[:, 0])
+        angles = np.degrees(np.arctan2(sines, np.einsum("eki,eki->ek", after, before))) % 360.0
+        return angles.min(axis=1)
+
+
+_LINE = [(-1.0,), (1.0,)]
+_TRI = [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)]
+_QUAD = [(-1.0, -1.0), (1.0, -1.0), (1.0, 1.0), (-1.0, 1.0)]
+_TET = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)]
+_HEX = [(x, y, z) for z in (-1.0, 1.0) for x, y in _QUAD]
+_PENTA = [(0.0, 0.0, -1.0), (1.0, 0.0, -1.0), (0.0, 1.0, -1.0), (0.0, 0.0, 1.0), (1.0, 0.0, 1.0), (0.0, 1.0, 1.0)]
+_TRI_EDGES = [(0, 1), (1, 2), (2, 0)]
+_QUAD_EDGES = [(0, 1), (1, 2), (2, 3), (3, 0)]
+_TET_EDGES = [(0, 1), (1, 2), (2, 0), (0, 3), (1, 3), (2, 3)]
+_HEX_EDGES = [(0, 1), (1, 2), (2, 3), (3, 0), (4, 5), (5, 6), (6, 7), (7, 4), (0, 4), (1, 5), (2, 6), (3, 7)]
+_HEX_FACES = [tuple(face[:4]) for face in SOLID_FACES["hex8"]["quad4"]]
+# the natural axes in the rows, mapping the reference simplices to regular ones
+_TRI_AXES = [[1.0, 0.0], [0.5, np.sqrt(3.0) / 2.0]]
+_TET_AXES = [[1.0, 0.0, 0.0], [0.5, np.sqrt(3.0) / 2.0, 0.0], [0.5, np.sqrt(3.0) / 6.0, np.sqrt(2.0 / 3.0)]]
+_PENTA_AXES = [[1.0, 0.0, 0.0], [0.5, np.sqrt(3.0) / 2.0, 0.0], [0.0, 0.0, 0.5]]
+
+
+def _solid_loops(element_type: str) -> list[list[int]]:
+    return [face[: FACE_CORNERS[face_type]] for face_type, faces in SOLID_FACES[element_type].items() for face in faces]
+
+
+SHAPES: dict[str, Shape] = {
+    "line2": Shape(_LINE, _exponents(1, "tensor1"), [[0, 1]], np.eye(1)),
+    "line3": Shape(_LINE + [(0.0,)], _exponents(1, "tensor2"), [[0, 1]], np.eye(1)),
+    "tri3": Shape(_TRI, _exponents(2, "total1"), [[0, 1, 2]], _TRI_AXES),
+    "tri6": Shape(_with_midpoints(_TRI, _TRI_EDGES), _exponents(2, "total2"), [[0, 1, 2]], _TRI_AXES),
+    "quad4": Shape(_QUAD, _exponents(2, "tensor1"), [[0, 1, 2, 3]], np.eye(2)),
+    "quad8": Shape(_with_midpoints(_QUAD, _QUAD_EDGES), _exponents(2, "serendipity2"), [[0, 1, 2, 3]], np.eye(2)),
+    "quad9": Shape(_with_midpoints(_QUAD, _QUAD_EDGES + [(0, 1, 2, 3)]), _exponents(2, "tensor2"), [[0, 1, 2, 3]], np.eye(2)),
+    "tet4": Shape(_TET, _exponents(3, "total1"), _solid_loops("tet4"), _TET_AXES),
+    "tet10": Shape(_with_midpoints(_TET, _TET_EDGES), _exponents(3, "total2"), _solid_loops("tet10"), _TET_AXES),
+    "hex8": Shape(_HEX, _exponents(3, "tensor1"), _solid_loops("hex8"), np.eye(3)),
+    "hex20": Shape(_with_midpoints(_HEX, _HEX_EDGES), _exponents(3, "serendipity2"), _solid_loops("hex20"), np.eye(3)),
+    "hex27": Shape(
+        _with_midpoints(_HEX, _HEX_EDGES + _HEX_FACES + [tuple(range(8))]), _exponents(3, "tensor2"), _solid_loops("hex27"), np.eye(3)
+    ),
+    "penta6": Shape(
+        _PENTA, [(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1), (1, 0, 1), (0, 1, 1)], _solid_loops("penta6"), _PENTA_AXES
+    ),
+}
+# shell formulations of quad4 elements
+SHAPES["q4ans"] = SHAPES["q4eas"] = SHAPES["quad4"]
+
+
+@dataclass
+class ElementQuality:
+    """
+    Quality metrics of the elements of one domain, one value per element in the order of
+    ids.
+
+    - jacobian: the smallest Jacobian determinant over the nodes and the centre
+    - scaled_jacobian: the smallest determinant divided by the lengths of the Jacobian
+      columns, normalized so the ideal element (regular simplex or prism, square, cube)
+      scores 1, and capped at 1
+    - aspect_ratio: the longest over the shortest corner to corner edge
+    - min_dihedral: the smallest angle between faces sharing an edge in degrees, or the
+      smallest corner angle for surface elements
+    - inverted: whether the Jacobian is not positive somewhere
+
+    Surface and line elements are measured against their normal or tangent at the
+    centre. aspect_ratio and min_dihedral are NaN for line elements.
+    """
+
+    domain: str
+    type: str
+    ids: np.ndarray
+    jacobian: np.ndarray
+    scaled_jacobian: np.ndarray
+    aspect_ratio: np.ndarray
+    min_dihedral: np.ndarray
+    inverted: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def element_quality(element_type: str, coordinates: ArrayLike, ids: ArrayLike | None = None, domain: str = "") -> ElementQuality:
+    """
+    Measure elements of element_type from their (E, nodes per element, 3) node
+    coordinates, in blocks of BLOCK elements.
+    """
+    shape = SHAPES.get(element_type)
+    if shape is None:
+        raise ValueError(f"cannot measure the quality of {element_type} elements")
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    if coordinates.ndim != 3 or coordinates.shape[1:] != (len(shape.nodes), 3):
+        raise ValueError(f"coordinates of {element_type} elements must have shape (E, {len(shape.nodes)}, 3) but got {coordinates.shape}")
+    count = len(coordinates)
+    ids = np.arange(1, count + 1) if ids is None else np.asarray(ids)
+    metrics = np.empty((4, count))
+    for start in range(0, count, BLOCK):
+        block = coordinates[start : start + BLOCK]
+        determinants, scaled = shape.jacobians(block)
+        corners = block[:, : shape.corners]
+        lengths = _lengths(corners[:, shape.edges[:, 1]] - corners[:, shape.edges[:, 0]])
+        longest, shortest = lengths.max(axis=1), lengths.min(axis=1)
+        if shape.dimension == 1:
+            aspect_ratio = np.full(len(block), np.nan)
+        else:
+            aspect_ratio = np.divide(longest, shortest, out=np.full(len(block), np.inf), where=shortest > 0)
+        scaled_jacobian = np.minimum(scaled.min(axis=1), 1.0)
+        metrics[:, start : start + BLOCK] = (determinants.min(axis=1), scaled_jacobian, aspect_ratio, shape.min_angles(corners))
+    jacobian, scaled_jacobian, aspect_ratio, min_dihedral = metrics
+    return ElementQuality(domain, element_type, ids, jacobian, scaled_jacobian, aspect_ratio, min_dihedral, jacobian <= 0)
+
+
+def mesh_quality(mesh: Mesh, domains: str | list[str] | None = None) -> list[ElementQuality]:
+    """
+    Measure the elements of the named element domains, by default all element domains of
+    a type in SHAPES.
+    """
+    if domains is None:
+        selected = [domain for domain in mesh.elements if domain.type in SHAPES]
+    else:
+        selected = [mesh.get_element_domain(name) for name in ([domains] if isinstance(domains, str) else domains)]
+    measured = []
+    for domain in selected:
+        ids, connectivity = element_arrays(domain)
+        measured.append(element_quality(domain.type, mesh.node_coordinates(connectivity), ids, domain.name))
+    return measured
+
+
+@dataclass
+class QualityThresholds:
+    """
+    Limits on element quality, checked by ``Model.preflight``.
+
+    - min_scaled_jacobian: smallest scaled Jacobian
+    - max_aspect_ratio: largest aspect ratio
+    - min_dihedral: smallest dihedral (or surface corner) angle in degrees
+    - allow_inverted: let elements with a Jacobian that is not positive somewhere through
+
+    A limit set to None is not applied.
+    """
+
+    min_scaled_jacobian: float | None = 0.1
+    max_aspect_ratio: float | None = 100.0
+    min_dihedral: float | None = 5.0
+    allow_inverted: bool = False
+
+    def _rules(self, quality: ElementQuality) -> list[tuple[str, str, np.ndarray, np.ndarray, bool]]:
+        # (description, metric, failing, values, whether larger values are worse)
+        rules = []
+        if not self.allow_inverted:
+            rules.append(("inverted", "jacobian", quality.inverted, quality.jacobian, False))
+        if self.min_scaled_jacobian is not None:
+            failing = quality.scaled_jacobian < self.min_scaled_jacobian
+            description = f"with scaled jacobian below {self.min_scaled_jacobian:g}"
+            rules.append((description, "scaled jacobian", failing, quality.scaled_jacobian, False))
+        if self.max_aspect_ratio is not None:
+            failing = quality.aspect_ratio > self.max_aspect_ratio
+            rules.append((f"with aspect ratio above {self.max_aspect_ratio:g}", "aspect ratio", failing, quality.aspect_ratio, True))
+        if self.min_dihedral is not None:
+            failing = quality.min_dihedral < self.min_dihedral
+            rules.append((f"with angles below {self.min_dihedral:g} degrees", "angle", failing, quality.min_dihedral, False))
+        return rules
+
+    def failing(self, quality: ElementQuality) -> np.ndarray:
+        """
+        Which elements of quality break a limit.
+        """
+        failing = np.zeros(len(quality), dtype=bool)
+        for _, _, broken, _, _ in self._rules(quality):
+            failing |= broken
+        return failing
+
+    def check(self, quality: ElementQuality) -> list[str]:
+        """
+        A description of every limit broken by elements of quality, with its worst element.
+        """
+        problems = []
+        for description, metric, failing, values, larger_is_worse in self._rules(quality):
+            rows = np.flatnonzero(failing)
+            if not len(rows):
+                continue
+            row = rows[np.argmax(values[rows]) if larger_is_worse else np.argmin(values[rows])]
+            problems.append(
+                f"{len(rows)} {quality.type} elements of {quality.domain!r} {description} "
+                f"(worst {metric} {values[row]:.4g} at element {quality.ids[row]})"
+            )
+        return problems
@@ -1,9 +1,13 @@
-from typing import Literal
+from typing import Annotated, Literal
 
+from pydantic import BeforeValidator
 from pydantic_xml import BaseXmlModel, attr, element
 
 from ._types import (
+    Flag,
     StringFloatVec3,
+    Zero,
+    int_from_str,
 )
 
 
@@ -17,19 +21,19 @@ class RigidFixed(BaseXmlModel, tag="rigid_bc", validate_assignment=True):
 
     type: Literal["rigid_fixed"] = attr(default="rigid_fixed", frozen=True)
     rb: str = element()
-    Rx_dof: Literal[0, 1] = element(default=0)
-    Ry_dof: Literal[0, 1] = element(default=0)
-    Rz_dof: Literal[0, 1] = element(default=0)
-    Ru_dof: Literal[0, 1] = element(default=0)
-    Rv_dof: Literal[0, 1] = element(default=0)
-    Rw_dof: Literal[0, 1] = element(default=0)
+    Rx_dof: Flag = element(default=0)
+    Ry_dof: Flag = element(default=0)
+    Rz_dof: Flag = element(default=0)
+    Ru_dof: Flag = element(default=0)
+    Rv_dof: Flag = element(default=0)
+    Rw_dof: Flag = element(default=0)
 
 
 class RigidPrescribed(BaseXmlModel, tag="rigid_bc", validate_assignment=True):
     type: Literal["rigid_displacement", "rigid_rotation"] = attr(default="rigid_displacement", frozen=True)
     rb: str = element()
     dof: Literal["x", "y", "z", "Ru", "Rv", "Rw"] = element()
-    relative: Literal[0, 1] = element(default=0)
+    relative: Flag = element(default=0)
     value: Value = element()
 
 
@@ -77,8 +81,8 @@ class RigidForceLoad(BaseXmlModel, tag="rigid_load", validate_assignment=True):
     type: Literal["rigid_force"] = attr(default="rigid_force", frozen=True)
     rb: str = element()
     dof: Literal["Rx", "Ry", "Rz"] = element()
-    relative: Literal[0, 1] = element(default=0)
-    load_type: Literal[0, 1, 2] = element(default=1)
+    relative: Flag = element(default=0)
+    load_type: Annotated[Literal[0, 1, 2], BeforeValidator(int_from_str)] = element(default=1)
     value: Value = element()
 
 
@@ -86,7 +90,7 @@ class RigidFollowerForceLoad(BaseXmlModel, tag="rigid_load", validate_assignment
     type: Literal["rigid_follower_force"] = attr(default="rigid_follower_force", frozen=True)
     rb: str = element()
     insertion: StringFloatVec3 = element()
-    relative: Literal[0, 1] = element(default=0)
+    relative: Flag = element(default=0)
     force: StringFloatVec3 = element()
 
 
@@ -94,14 +98,14 @@ class RigidMomentLoad(BaseXmlModel, tag="rigid_load", validate_assignment=True):
     type: Literal["rigid_moment"] = attr(default="rigid_moment", frozen=True)
     rb: str = element()
     dof: Literal["Ru", "Rv", "Rw"] = element()
-    relative: Literal[0, 1] = element(default=0)
+    relative: Flag = element(default=0)
     value: Value = element()
 
 
 class RigidFollowerMomentLoad(BaseXmlModel, tag="rigid_load", validate_assignment=True):
     type: Literal["rigid_follower_moment"] = attr(default="rigid_follower_moment", frozen=True)
     rb: str = element()
-    relative: Literal[0, 1] = element(default=0)
+    relative: Flag = element(default=0)
     moment: StringFloatVec3 = element()
 
 
@@ -112,7 +116,7 @@ class RigidCableLoad(BaseXmlModel, tag="rigid_load", validate_assignment=True):
 
     type: Literal["rigid_cable"] = attr(default="rigid_cable", frozen=True)
     force_direction: StringFloatVec3 = element()
-    relative: Literal[0, 1] = element(default=1)
+    relative: Flag = element(default=1)
     force: Value = element()
     rigid_cable_point: list[CablePoint] = element(default=[])
 
@@ -130,21 +134,21 @@ class RigidConnector(
     tolerance: float = element(default=0.1)
     minaug: int = element(default=0)
     maxaug: int = element(default=10)
-    gaptol: Literal[0] | float = element(default=0)
-    angtol: Literal[0] | float = element(default=0)
+    gaptol: Zero | float = element(default=0)
+    angtol: Zero | float = element(default=0)
     force_penalty: float = element(default=1)
     moment_penalty: float = element(default=1)
-    auto_penalty: Literal[0, 1] = element(default=1)
+    auto_penalty: Flag = element(default=1)
 
 
 class Free(BaseXmlModel, validate_assignment=True):
-    text: Literal[0] = 0
+    text: Zero = 0
 
 
 class RigidSphericalJoint(RigidConnector):
     type: Literal["rigid spherical joint"] = attr(default="rigid spherical joint", frozen=True)
     joint_origin: StringFloatVec3 = element(default="0.0,0.0,0.0")
-    prescribed_rotation: Literal[0, 1] = element(default=0)
+    prescribed_rotation: Flag = element(default=0)
     rotation_x: Value | Free = element(default=Free())
     rotation_y: Value | Free = element(default=Free())
     rotation_z: Value | Free = element(default=Free())
@@ -155,12 +159,12 @@ class RigidSphericalJoint(RigidConnector):
 
 class RigidRevoluteJoint(RigidConnector):
     class Free(BaseXmlModel):
-        text: Literal[0] = 0
+        text: Zero = 0
 
     type: Literal["rigid revolute joint"] = attr(default="rigid revolute joint", frozen=True)
-    laugon: Literal[0, 1] = element(default=0)
+    laugon: Flag = element(default=0)
     joint_origin: StringFloatVec3 = element(default="0.0,0.0,0.0")
-    prescribed_rotation: Literal[0, 1] = element(default=0)
+    prescribed_rotation: Flag = element(default=0)
     rotation_axis: StringFloatVec3 = element(default="0.0,0.0,1.0")
     moment: Value | Free = element(default=Free())
     rotation: Value | Free = element(default=Free())
@@ -169,7 +173,7 @@ class RigidRevoluteJoint(RigidConnector):
 class RigidPrismaticJoint(RigidConnector):
     type: Literal["rigid prismatic joint"] = attr(default="rigid prismatic joint", frozen=True)
     joint_origin: StringFloatVec3 = element(default="0.0,0.0,0.0")
-    prescribed_translation: Literal[0, 1] = element(default=0)
+    prescribed_translation: Flag = element(default=0)
     translation: Value | Free = element(default=Free())
     force: Value | Free = element(default=Free())
 
@@ -180,8 +184,8 @@ class RigidCylindricalJoint(RigidConnector):
     joint_origin: StringFloatVec3 = element(default="0.0,0.0,0.0")
     joint_axis: StringFloatVec3 = element(default="0.0,0.0,0.0")
     transverse_axis: StringFloatVec3 = element(default="0.0,0.0,0.0")
-    prescribed_rotation: Literal[0, 1] = element(default=0)
-    prescribed_translation: Literal[0, 1] = element(default=0)
+    prescribed_rotation: Flag = element(default=0)
+    prescribed_translation: Flag = element(default=0)
     translation: Value | Free = element(default=Free())
     force: Value | Free = element(default=Free())
     rotation: Value | Free = element(default=Free())
@@ -194,9 +198,9 @@ class RigidPlanarJoint(RigidConnector):
     rotation_axis: StringFloatVec3 = element(default="0.0,0.0,0.0")
     translation_axis_1: StringFloatVec3 = element(default="0.0,0.0,0.0")
     translation_axis_2: StringFloatVec3 = element(default="0.0,0.0,0.0")
-    prescribed_rotation: Literal[0, 1] = element(default=0)
-    prescribed_translation_1: Literal[0, 1] = element(default=0)
-    prescribed_translation_2: Literal[0, 1] = element(default=0)
+    prescribed_rotation: Flag = element(default=0)
+    prescribed_translation_1: Flag = element(default=0)
+    prescribed_translation_2: Flag = element(default=0)
     rotation: Value | Free = element(default=Free())
     translation_1: Value | Free = element(default=Free())
     translation_2: Value | Free = element(default=Free())
@@ -214,7 +218,7 @@ class RigidSpring(RigidConnector):
     k: float = element(default=1)
     insertion_a: StringFloatVec3 = element(default="0.0,0.0,0.0")
     insertion_b: StringFloatVec3 = element(default="1.0,0.0,0.0")
-    free_length: Literal[0] | float = element(default=0)
+    free_length: Zero | float = element(default=0)
 
 
 class RigidDamper(RigidConnector):
@@ -0,0 +1,610 @@
+import asyncio
+import itertools
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal
+
+from .cache import ResultCache, input_hash, write_atomic
+from .progress import (
+    ERROR_TERMINATION,
+    NORMAL_TERMINATION,
+    ProgressEvent,
+    ProgressParser,
+    TerminationPolicy,
+)
+
+TerminationReason = Literal["normal", "error", "timeout", "cancelled", "aborted", "unknown"]
+
+# longest line read from FEBio output before it is split
+LINE_LIMIT = 1 << 20
+# output lines a job keeps by default, the latest ones
+MAX_LINES = 100_000
+
+
+def termination_reason(text: str) -> TerminationReason:
+    """
+    Classify FEBio output by the termination banner it ends with.
+    """
+    normal = text.rfind(NORMAL_TERMINATION)
+    error = text.rfind(ERROR_TERMINATION)
+    if normal == error == -1:
+        return "unknown"
+    return "normal" if normal > error else "error"
+
+
+def _read_log(log: Path, offset: int, since: float) -> bytes | None:
+    # None while there is no log written since the run started; a log left over from an
+    # earlier run is not followed
+    try:
+        with open(log, "rb") as fid:
+            if offset == 0 and os.fstat(fid.fileno()).st_mtime < since:
+                return None
+            fid.seek(offset)
+            return fid.read()
+    except FileNotFoundError:
+        return None
+
+
+def _log_tail(filepath: Path, size: int = 4096) -> str:
+    try:
+        with open(filepath.with_suffix(".log"), "rb") as fid:
+            fid.seek(0, os.SEEK_END)
+            fid.seek(max(fid.tell() - size, 0))
+            return fid.read().decode(errors="replace")
+    except OSError:
+        return ""
+
+
+@dataclass
+class RunResult:
+    filepath: Path
+    returncode: int | None
+    termination: TerminationReason
+    elapsed: float
+    stdout: list[str] = field(default_factory=list)
+    stderr: list[str] = field(default_factory=list)
+    cached: bool = False
+    # why a TerminationPolicy stopped the run
+    abort_reason: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.termination == "normal" and self.returncode == 0
+
+
+def _watches_events(policy: TerminationPolicy) -> bool:
+    # the wall time budget is enforced without reading any output
+    return any(value is not None for value in (policy.max_retries, policy.max_cutbacks, policy.dtmin, policy.stagnation))
+
+
+class FEBioJob:
+    """
+    A running FEBio process, created by ``run_model_async``.
+
+    Awaiting the job (or ``wait``) returns a RunResult once the process has exited. Output
+    lines are collected as they arrive, keeping the last max_lines of them (all with None),
+    and can be followed with ``lines``. Solver progress can be followed as ProgressEvents
+    with ``events`` or the on_event callback.
+    """
+
+    def __init__(
+        self,
+        process: asyncio.subprocess.Process,
+        filepath: Path,
+        timeout: float | None = None,
+        grace: float = 5.0,
+        on_stdout: Callable[[str], None] | None = None,
+        on_stderr: Callable[[str], None] | None = None,
+        silent: bool = False,
+        on_event: Callable[[ProgressEvent], None] | None = None,
+        poll: float = 0.5,
+        policy: TerminationPolicy | None = None,
+        max_lines: int | None = MAX_LINES,
+    ):
+        self.process = process
+        self.filepath = filepath
+        self.timeout = timeout
+        self.grace = grace
+        self.silent = silent
+        self.poll = poll
+        self.started = time.monotonic()
+        self._wall_started = time.time()
+        self._callbacks = {"stdout": on_stdout, "stderr": on_stderr}
+        self._lines: deque[tuple[str, str]] = deque(maxlen=max_lines)
+        # lines read so far, including those dropped from the front of _lines
+        self._count = 0
+        self._eof = False
+        self._changed = asyncio.Condition()
+        self.policy = policy
+        self.abort_reason: str | None = None
+        self._reason: TerminationReason | None = None
+        self._follower = None
+        if on_event is not None or (policy is not None and _watches_events(policy)):
+            self._follower = asyncio.ensure_future(self._dispatch(on_event))
+        self._task = asyncio.ensure_future(self._run())
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def returncode(self) -> int | None:
+        return self.process.returncode
+
+    def done(self) -> bool:
+        return self._task.done()
+
+    @property
+    def stdout(self) -> list[str]:
+        return [line for stream, line in self._lines if stream == "stdout"]
+
+    @property
+    def stderr(self) -> list[str]:
+        return [line for stream, line in self._lines if stream == "stderr"]
+
+    def __await__(self):
+        return self._task.__await__()
+
+    async def wait(self) -> RunResult:
+        return await self._task
+
+    def cancel(self):
+        """
+        Stop the process. The job then completes with termination "cancelled".
+        """
+        if self.process.returncode is None and self._reason is None:
+            self._reason = "cancelled"
+            self._signal()
+
+    def abort(self, reason: str):
+        """
+        Stop the process. The job then completes with termination "aborted" and reason.
+        """
+        if self.process.returncode is None and self._reason is None:
+            self._reason = "aborted"
+            self.abort_reason = reason
+            self._signal()
+
+    async def lines(self) -> AsyncIterator[tuple[str, str]]:
+        """
+        Yield ("stdout" | "stderr", line) pairs from the start of the run until the process
+        closes its output. Any number of consumers may follow the same job; one falling
+        more than max_lines behind skips the lines dropped meanwhile.
+        """
+        index = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda index=index: index < self._count or self._eof)
+                dropped = self._count - len(self._lines)
+                batch = list(itertools.islice(self._lines, max(index - dropped, 0), None))
+                index, eof = self._count, self._eof
+            for item in batch:
+                yield item
+            if eof and index == self._count:
+                return
+
+    async def events(self) -> AsyncIterator[ProgressEvent]:
+        """
+        Yield ProgressEvents parsed from the output of the run as it is written: from the
+        console output, or for a silent run from the log file, read every poll seconds.
+        """
+        parser = ProgressParser()
+        if self.silent:
+            async for line in self._follow_log():
+                for event in parser.feed(line):
+                    yield event
+            return
+        async for stream, line in self.lines():
+            if stream == "stdout":
+                for event in parser.feed(line):
+                    yield event
+
+    async def _follow_log(self) -> AsyncIterator[str]:
+        log = self.filepath.with_suffix(".log")
+        offset, pending = 0, b""
+        while True:
+            # once the output is closed the log is read one last time
+            done = self._eof
+            # read off the event loop, the log of a large model can grow quickly
+            data = await asyncio.to_thread(_read_log, log, offset, self._wall_started - 1.0)
+            if data:
+                offset += len(data)
+                *complete, pending = (pending + data).split(b"\n")
+                for raw in complete:
+                    yield raw.decode(errors="replace").rstrip("\r")
+            if done:
+                if pending:
+                    yield pending.decode(errors="replace").rstrip("\r")
+                return
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(self._changed.wait_for(lambda: self._eof), self.poll)
+                except TimeoutError:
+                    pass
+
+    async def _dispatch(self, on_event: Callable[[ProgressEvent], None] | None):
+        watcher = self.policy.watch() if self.policy is not None else None
+        async for event in self.events():
+            if on_event is not None:
+                on_event(event)
+            if watcher is not None and (reason := watcher.check(event)) is not None:
+                self.abort(reason)
+
+    def _signal(self, kill: bool = False):
+        # FEBio runs in its own session on posix, so the whole process group is signalled
+        try:
+            if os.name == "posix":
+                os.killpg(self.process.pid, signal.SIGKILL if kill else signal.SIGTERM)
+            elif kill:
+                self.process.kill()
+            else:
+                self.process.terminate()
+        except ProcessLookupError:
+            pass
+
+    async def _read(self, name: str, stream: asyncio.StreamReader):
+        callback = self._callbacks[name]
+        while raw := await stream.readline():
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            async with self._changed:
+                self._lines.append((name, line))
+                self._count += 1
+                self._changed.notify_all()
+            if callback is not None:
+                callback(line)
+
+    async def _stop(self):
+        self._signal()
+        try:
+            await asyncio.wait_for(self.process.wait(), self.grace)
+        except TimeoutError:
+            self._signal(kill=True)
+            await self.process.wait()
+
+    async def _run(self) -> RunResult:
+        readers = asyncio.gather(self._read("stdout", self.process.stdout), self._read("stderr", self.process.stderr))
+        wall_time = self.policy.wall_time if self.policy is not None else None
+        limit = min((value for value in (self.timeout, wall_time) if value is not None), default=None)
+        try:
+            await asyncio.wait_for(asyncio.shield(self.process.wait()), limit)
+        except TimeoutError:
+            if limit == self.timeout:
+                self._reason = "timeout"
+            else:
+                self._reason = "aborted"
+                self.abort_reason = f"wall time budget of {wall_time:g} s used up"
+            await self._stop()
+        except asyncio.CancelledError:
+            self._reason = "cancelled"
+            await asyncio.shield(self._stop())
+            raise
+        finally:
+            await readers
+            async with self._changed:
+                self._eof = True
+                self._changed.notify_all()
+            if self._follower is not None:
+                await self._follower
+        if self._reason is not None and self.process.returncode != 0:
+            termination = self._reason
+        else:
+            tail = itertools.islice(self._lines, max(len(self._lines) - 50, 0), None)
+            termination = termination_reason("\n".join(line for _, line in tail))
+            if termination == "unknown":
+                termination = termination_reason(_log_tail(self.filepath))
+        return RunResult(
+            filepath=self.filepath,
+            returncode=self.process.returncode,
+            termination=termination,
+            elapsed=time.monotonic() - self.started,
+            stdout=self.stdout,
+            stderr=self.stderr,
+            abort_reason=self.abort_reason if termination == "aborted" else None,
+        )
+
+
+async def run_model_async(
+    filepath: str | Path,
+    silent: bool = False,
+    timeout: float | None = None,
+    executable: str = "febio4",
+    cwd: str | Path | None = None,
+    env: dict[str, str] | None = None,
+    on_stdout: Callable[[str], None] | None = None,
+    on_stderr: Callable[[str], None] | None = None,
+    cpus: Iterable[int] | None = None,
+    on_event: Callable[[ProgressEvent], None] | None = None,
+    policy: TerminationPolicy | None = None,
+    max_lines: int | None = MAX_LINES,
+) -> FEBioJob:
+    """
+    Start FEBio on filepath without blocking and return a FEBioJob handle.
+
+    cpus pins the process to those cores with ``os.sched_setaffinity`` before FEBio starts,
+    where the platform supports it.
+
+    The process is killed once timeout seconds have passed, and the job completes with
+    termination "timeout". Cancelling the task awaiting the job also stops the process.
+    The termination reason is read from the FEBio banner in the output, falling back to
+    the log file next to filepath when the run is silent.
+
+    on_event is called with every ProgressEvent (time step started, Newton iteration with
+    its convergence norms, converged, failed, retry, ...) as FEBio reports it.
+
+    With a TerminationPolicy the process is stopped as soon as one of its rules is broken,
+    and the job completes with termination "aborted" and the broken rule as abort_reason.
+
+    The job keeps the last max_lines lines of output, or all of them with None.
+
+    Example::
+
+        jobs = [await run_model_async(path, silent=True) for path in paths]
+        results = await asyncio.gather(*jobs)
+    """
+    filepath = Path(filepath)
+    args = [executable, "-i", str(filepath)]
+    if silent:
+        args.append("-silent")
+    preexec_fn = None
+    if cpus is not None and hasattr(os, "sched_setaffinity"):
+        cpus = set(cpus)
+
+        def preexec_fn():
+            os.sched_setaffinity(0, cpus)
+
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        env=env,
+        limit=LINE_LIMIT,
+        start_new_session=os.name == "posix",
+        preexec_fn=preexec_fn,
+    )
+    return FEBioJob(
+        process,
+        filepath,
+        timeout=timeout,
+        on_stdout=on_stdout,
+        on_stderr=on_stderr,
+        silent=silent,
+        on_event=on_event,
+        policy=policy,
+        max_lines=max_lines,
+    )
+
+
+def available_cpus() -> list[int]:
+    """
+    Ids of the cores this process may run on.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class Scheduler:
+    """
+    Run FEBio jobs within a budget of cores.
+
+    Each job declares how many OpenMP threads it uses and is started with OMP_NUM_THREADS
+    set accordingly. Jobs wait, first come first served, until enough cores are free, so
+    the sum of threads across running jobs never exceeds cores. With pin=True every job is
+    also bound to its own set of cores. With a ResultCache, jobs whose outputs are cached
+    are restored without running FEBio, and successful runs are stored.
+
+    The wall time of each finished job is recorded under its key (by default the
+    ``input_hash`` of the file, so it follows the model rather than the file name) as a
+    running average, optionally persisted to history as json. ``run_all`` uses these
+    estimates to start the longest jobs first.
+
+    A Scheduler may be used from one event loop at a time, and again from later ones.
+    """
+
+    def __init__(
+        self,
+        cores: int | None = None,
+        pin: bool = False,
+        history: str | Path | None = None,
+        cache: ResultCache | None = None,
+    ):
+        cpus = available_cpus()
+        self.cores = cores or len(cpus)
+        if pin:
+            self.cores = min(self.cores, len(cpus))
+        self.pin = pin
+        self.history = Path(history) if history is not None else None
+        self.cache = cache
+        self.wall_times: dict[str, float] = {}
+        if self.history is not None and self.history.is_file():
+            self.wall_times = json.loads(self.history.read_text())
+        self._free_cpus = cpus[: self.cores]
+        self._free = self.cores
+        self._queue: deque[object] = deque()
+        # created in the running event loop by _bind, as asyncio primitives belong to one
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._changed: asyncio.Condition | None = None
+        self._history_lock: asyncio.Lock | None = None
+        self._history_dirty = False
+
+    def _bind(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._changed = asyncio.Condition()
+            self._history_lock = asyncio.Lock()
+
+    def estimate(self, key: str) -> float | None:
+        return self.wall_times.get(key)
+
+    def record(self, key: str, elapsed: float):
+        """
+        Fold elapsed into the running average of key. ``run`` writes the history file
+        afterwards, off the event loop.
+        """
+        previous = self.wall_times.get(key)
+        self.wall_times[key] = elapsed if previous is None else 0.5 * (previous + elapsed)
+        self._history_dirty = self.history is not None
+
+    async def _save_history(self):
+        # one writer at a time, each writing everything recorded until it started, so
+        # jobs finishing together share a write
+        async with self._history_lock:
+            while self._history_dirty:
+                self._history_dirty = False
+                await asyncio.to_thread(write_atomic, self.history, json.dumps(self.wall_times, indent=2))
+
+    async def _acquire(self, threads: int) -> list[int]:
+        # queued before the first await, so jobs line up in the order they were started
+        ticket = object()
+        self._queue.append(ticket)
+        try:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self._queue[0] is ticket and self._free >= threads)
+                self._queue.popleft()
+                self._free -= threads
+                cpus = self._free_cpus[:threads] if self.pin else []
+                del self._free_cpus[: len(cpus)]
+                self._changed.notify_all()
+        except asyncio.CancelledError:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                async with self._changed:
+                    self._changed.notify_all()
+            raise
+        return cpus
+
+    async def _release(self, threads: int, cpus: list[int]):
+        async with self._changed:
+            self._free += threads
+            self._free_cpus = sorted(self._free_cpus + cpus)
+            self._changed.notify_all()
+
+    async def run(self, filepath: str | Path, threads: int = 1, key: str | None = None, **kwargs) -> RunResult:
+        """
+        Run FEBio on filepath with threads cores once they are free. kwargs are passed on
+        to ``run_model_async``.
+        """
+        self._bind()
+        filepath = Path(filepath)
+        if await self._restore(filepath):
+            return RunResult(filepath=filepath, returncode=0, termination="normal", elapsed=0.0, cached=True)
+        return await self._run_job(filepath, threads, key, **kwargs)
+
+    async def _restore(self, filepath: Path) -> bool:
+        # the cache hashes and copies files, so it is used off the event loop
+        return self.cache is not None and await asyncio.to_thread(self.cache.restore, filepath)
+
+    async def _run_job(self, filepath: Path, threads: int, key: str | None, **kwargs) -> RunResult:
+        # no await before _acquire, so jobs queue in the order their tasks were created
+        threads = max(1, min(threads, self.cores))
+        cpus = await self._acquire(threads)
+        try:
+            env = {**(kwargs.pop("env", None) or os.environ), "OMP_NUM_THREADS": str(threads)}
+            job = await run_model_async(filepath, env=env, cpus=cpus if self.pin else None, **kwargs)
+            result = await job
+        finally:
+            await self._release(threads, cpus)
+        if result.ok:
+            self.record(key or await asyncio.to_thread(input_hash, filepath), result.elapsed)
+            await self._save_history()
+            if self.cache is not None:
+                await asyncio.to_thread(self.cache.store, filepath)
+        return result
+
+    async def run_all(
+        self,
+        filepaths: Sequence[str | Path],
+        threads: int = 1,
+        keys: Sequence[str] | None = None,
+        **kwargs,
+    ) -> list[RunResult]:
+        """
+        Run every file and return the results in the order given. Cached results are
+        restored first; the other jobs are queued longest first by their recorded wall time,
+        and jobs without a record go first, largest file first.
+        """
+        self._bind()
+        filepaths = [Path(filepath) for filepath in filepaths]
+        if keys is None:
+            keys = await asyncio.gather(*(asyncio.to_thread(input_hash, filepath) for filepath in filepaths))
+        keys = list(keys)
+        restored = await asyncio.gather(*(self._restore(filepath) for filepath in filepaths))
+
+        def priority(index: int) -> tuple[bool, float]:
+            estimate = self.estimate(keys[index])
+            if estimate is None:
+                return (False, -filepaths[index].stat().st_size)
+            return (True, -estimate)
+
+        order = sorted((index for index in range(len(filepaths)) if not restored[index]), key=priority)
+        tasks = {}
+        for index in order:
+            tasks[index] = asyncio.ensure_future(self._run_job(filepaths[index], threads, keys[index], **kwargs))
+        results = dict(zip(order, await asyncio.gather(*(tasks[index] for index in order))))
+        return [
+            results[index]
+            if index in results
+            else RunResult(filepath=filepath, returncode=0, termination="normal", elapsed=0.0, cached=True)
+            for index, filepath in enumerate(filepaths)
+        ]
+
+
+def _run_sync(main: Coroutine[Any, Any, RunResult]) -> RunResult:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(main)
+    # asyncio.run cannot be nested, so inside a running loop (a notebook, an async
+    # application) the run gets a loop of its own in a worker thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, main).result()
+
+
+def run_model(
+    filepath: str | Path,
+    silent: bool = False,
+    timeout: float | None = None,
+    executable: str = "febio4",
+    cache: ResultCache | None = None,
+    policy: TerminationPolicy | None = None,
+    threads: int | None = None,
+    scheduler: Scheduler | None = None,
+) -> RunResult:
+    """
+    Run FEBio on filepath, wait for it and return its RunResult.
+
+    The run goes through scheduler with threads OpenMP threads, waiting for that many cores
+    of its budget, or by default through a new Scheduler using all cores with cache. The
+    scheduler restores the outputs from its cache on a hit and stores them after a
+    successful run. Unless silent, FEBio output is passed on to the console as it arrives.
+    Works both with and without a running event loop; in one, the call blocks until FEBio
+    exits.
+    """
+    if scheduler is not None and cache is not None:
+        raise ValueError("pass the cache to the scheduler instead")
+
+    async def main() -> RunResult:
+        nonlocal scheduler
+        scheduler = scheduler if scheduler is not None else Scheduler(cache=cache)
+        return await scheduler.run(
+            filepath,
+            threads=threads or scheduler.cores,
+            silent=silent,
+            timeout=timeout,
+            executable=executable,
+            policy=policy,
+            on_stdout=None if silent else print,
+            on_stderr=None if silent else lambda line: print(line, file=sys.stderr),
+        )
+
+    return _run_sync(main())
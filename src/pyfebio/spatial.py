@@ -0,0 +1,376 @@
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+# queries are processed in blocks of this many points to bound the size of the
+# candidate pair arrays
+QUERY_BLOCK = 65536
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    # the concatenation of arange(start, end) for all pairs
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    skip = np.cumsum(lengths) - lengths
+    return np.repeat(starts - skip, lengths) + np.arange(total, dtype=np.int64)
+
+
+class PointGrid:
+    """
+    A uniform grid over (N, 3) points, with the points of each cell stored contiguously.
+
+    The cell size defaults to a few points per cell, and is grown if needed so the number
+    of cells stays proportional to the number of points.
+    """
+
+    def __init__(self, points: ArrayLike, cell_size: float | None = None):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        count = len(self.points)
+        self.lower = self.points.min(axis=0) if count else np.zeros(3)
+        self.upper = self.points.max(axis=0) if count else np.zeros(3)
+        extent = self.upper - self.lower
+        if cell_size is None:
+            spanned = extent[extent > 1e-12 * max(extent.max(), 1e-300)]
+            cell_size = float((np.prod(spanned) * 4 / max(count, 1)) ** (1 / len(spanned))) if len(spanned) else 1.0
+        cell_size = max(cell_size, 1e-12 * max(float(extent.max()), 1.0))
+        while True:
+            self.shape = (extent // cell_size).astype(np.int64) + 1
+            if np.prod(self.shape) <= 8 * count + 64:
+                break
+            cell_size *= 1.5
+        self.cell_size = cell_size
+        cells = self._flat(self._cells(self.points))
+        self.order = np.argsort(cells, kind="stable")
+        self.offsets = np.zeros(int(np.prod(self.shape)) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=len(self.offsets) - 1), out=self.offsets[1:])
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        return np.clip(((points - self.lower) // self.cell_size).astype(np.int64), 0, self.shape - 1)
+
+    def _flat(self, cells: np.ndarray) -> np.ndarray:
+        return (cells[..., 0] * self.shape[1] + cells[..., 1]) * self.shape[2] + cells[..., 2]
+
+    def query_box(self, lower: ArrayLike, upper: ArrayLike) -> np.ndarray:
+        """
+        Indices of the points in cells overlapping the box, a superset of the points inside
+        it.
+        """
+        lower = np.asarray(lower, dtype=np.float64)
+        upper = np.asarray(upper, dtype=np.float64)
+        if not len(self) or (upper < self.lower).any() or (lower > self.upper).any():
+            return np.zeros(0, dtype=np.int64)
+        first = self._cells(lower)
+        last = self._cells(upper)
+        if np.prod(last - first + 1) * 2 > len(self.offsets):
+            return np.arange(len(self), dtype=np.int64)
+        axes = [np.arange(a, b + 1) for a, b in zip(first, last)]
+        cells = self._flat(np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)).ravel()
+        return self.order[_ranges(self.offsets[cells], self.offsets[cells + 1])]
+
+    def query_pairs(self, queries: ArrayLike, radius: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        All (query index, point index) pairs at most radius apart.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        reach = int(np.ceil(radius / self.cell_size))
+        steps = np.arange(-reach, reach + 1)
+        neighbours = np.stack(np.meshgrid(steps, steps, steps, indexing="ij"), axis=-1).reshape(-1, 3)
+        found_queries, found_points = [], []
+        for start in range(0, len(queries) if len(self) else 0, QUERY_BLOCK):
+            block = queries[start : start + QUERY_BLOCK]
+            inside = ((block >= self.lower - radius) & (block <= self.upper + radius)).all(axis=1)
+            block_index = np.flatnonzero(inside)
+            base = ((block[block_index] - self.lower) // self.cell_size).astype(np.int64)
+            for step in neighbours:
+                cells = base + step
+                valid = ((cells >= 0) & (cells < self.shape)).all(axis=1)
+                flat = self._flat(cells[valid])
+                starts, ends = self.offsets[flat], self.offsets[flat + 1]
+                query_index = np.repeat(block_index[valid], ends - starts)
+                point_index = self.order[_ranges(starts, ends)]
+                close = ((block[query_index] - self.points[point_index]) ** 2).sum(axis=1) <= radius * radius
+                found_queries.append(query_index[close] + start)
+                found_points.append(point_index[close])
+        if not found_queries:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(found_queries), np.concatenate(found_points)
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    # put two zero bits after each of the low 21 bits of values
+    values = values.astype(np.uint64)
+    for shift, mask in ((32, 0x1F00000000FFFF), (16, 0x1F0000FF0000FF), (8, 0x100F00F00F00F00F), (4, 0x10C30C30C30C30C3), (2, 0x1249249249249249)):
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values
+
+
+class BoxTree:
+    """
+    A bounding volume hierarchy over (N, 3) lower and upper corners of axis aligned boxes.
+
+    Boxes are sorted along a Morton curve of their centers and grouped into leaves of
+    LEAF_SIZE consecutive boxes, and each level above holds the bounds of pairs of nodes
+    of the level below. ``overlapping`` walks two trees together one level at a time,
+    for all candidate node pairs at once.
+    """
+
+    LEAF_SIZE = 8
+
+    def __init__(self, lower: ArrayLike, upper: ArrayLike):
+        lower = np.asarray(lower, dtype=np.float64).reshape(-1, 3)
+        upper = np.asarray(upper, dtype=np.float64).reshape(-1, 3)
+        centers = (lower + upper) / 2
+        if len(centers):
+            span = np.maximum(centers.max(axis=0) - centers.min(axis=0), 1e-300)
+            cells = ((centers - centers.min(axis=0)) / span * (2**21 - 1)).astype(np.uint64)
+            codes = (_spread_bits(cells[:, 0]) << np.uint64(2)) | (_spread_bits(cells[:, 1]) << np.uint64(1)) | _spread_bits(cells[:, 2])
+            self.order = np.argsort(codes, kind="stable")
+        else:
+            self.order = np.zeros(0, dtype=np.int64)
+        self.lower, self.upper = lower[self.order], upper[self.order]
+        starts = np.arange(0, len(self.order), self.LEAF_SIZE)
+        level = (np.minimum.reduceat(self.lower, starts), np.maximum.reduceat(self.upper, starts)) if len(starts) else (lower, upper)
+        # levels[0] are the leaves, levels[-1] the root
+        self.levels = [level]
+        while len(level[0]) > 1:
+            low, high = level
+            if len(low) % 2:
+                low = np.vstack([low, np.full(3, np.inf)])
+                high = np.vstack([high, np.full(3, -np.inf)])
+            level = (np.minimum(low[0::2], low[1::2]), np.maximum(high[0::2], high[1::2]))
+            self.levels.append(level)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def overlapping(self, other: "BoxTree") -> tuple[np.ndarray, np.ndarray]:
+        """
+        All (index in self, index in other) pairs of overlapping boxes.
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        if not len(self) or not len(other):
+            return empty, empty
+        depth, other_depth = len(self.levels) - 1, len(other.levels) - 1
+        nodes, other_nodes = np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64)
+        while True:
+            low, high = self.levels[depth]
+            other_low, other_high = other.levels[other_depth]
+            keep = ((low[nodes] <= other_high[other_nodes]) & (other_low[other_nodes] <= high[nodes])).all(axis=1)
+            nodes, other_nodes = nodes[keep], other_nodes[keep]
+            if depth == 0 and other_depth == 0:
+                break
+            # descend the deeper tree, or both
+            if depth >= other_depth and depth > 0:
+                depth -= 1
+                nodes, other_nodes = np.concatenate([2 * nodes, 2 * nodes + 1]), np.concatenate([other_nodes, other_nodes])
+                valid = nodes < len(self.levels[depth][0])
+                nodes, other_nodes = nodes[valid], other_nodes[valid]
+            if other_depth > depth:
+                other_depth -= 1
+                nodes, other_nodes = np.concatenate([nodes, nodes]), np.concatenate([2 * other_nodes, 2 * other_nodes + 1])
+                valid = other_nodes < len(other.levels[other_depth][0])
+                nodes, other_nodes = nodes[valid], other_nodes[valid]
+        # expand the overlapping leaf pairs into box pairs
+        size = self.LEAF_SIZE
+        found, other_found = [], []
+        step = max(1, QUERY_BLOCK // size)
+        for start in range(0, len(nodes), step):
+            first = (nodes[start : start + step, None] * size + np.arange(size)).repeat(size, axis=1)
+            second = np.tile(other_nodes[start : start + step, None] * size + np.arange(size), size)
+            first, second = first.ravel(), second.ravel()
+            valid = (first < len(self)) & (second < len(other))
+            first, second = first[valid], second[valid]
+            keep = ((self.lower[first] <= other.upper[second]) & (other.lower[second] <= self.upper[first])).all(axis=1)
+            found.append(self.order[first[keep]])
+            other_found.append(other.order[second[keep]])
+        if not found:
+            return empty, empty
+        return np.concatenate(found), np.concatenate(other_found)
+
+
+def triangles(connectivity: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Split faces given by their (F, nodes per face) connectivity into corner triangles,
+    two per quadrilateral, as rows into connectivity and a (T, 3) array of node ids.
+    """
+    if connectivity.shape[1] in (3, 6):
+        return np.arange(len(connectivity)), connectivity[:, :3]
+    rows = np.repeat(np.arange(len(connectivity)), 2)
+    return rows, connectivity[:, [0, 1, 2, 0, 2, 3]].reshape(-1, 3)
+
+
+def triangle_distance(points: np.ndarray, a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """
+    The distance of each point to the matching triangle a, b, c.
+    """
+
+    def dot(u, v):
+        return np.einsum("ij,ij->i", u, v)
+
+    ab, ac = b - a, c - a
+    d1, d2 = dot(ab, points - a), dot(ac, points - a)
+    d3, d4 = dot(ab, points - b), dot(ac, points - b)
+    d5, d6 = dot(ab, points - c), dot(ac, points - c)
+    va, vb, vc = d3 * d6 - d5 * d4, d5 * d2 - d1 * d6, d1 * d4 - d3 * d2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # the closest point is a + v * ab + w * ac, with v and w by Voronoi region of the
+        # triangle, the highest priority region last
+        denominator = va + vb + vc
+        v, w = vb / denominator, vc / denominator
+        edge = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        regions = [
+            ((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0), 1 - edge, edge),
+            ((vb <= 0) & (d2 >= 0) & (d6 <= 0), 0.0, d2 / (d2 - d6)),
+            ((d6 >= 0) & (d5 <= d6), 0.0, 1.0),
+            ((vc <= 0) & (d1 >= 0) & (d3 <= 0), d1 / (d1 - d3), 0.0),
+            ((d3 >= 0) & (d4 <= d3), 1.0, 0.0),
+            ((d1 <= 0) & (d2 <= 0), 0.0, 0.0),
+        ]
+        for mask, region_v, region_w in regions:
+            v = np.where(mask, region_v, v)
+            w = np.where(mask, region_w, w)
+        distance = np.sqrt(((points - a - ab * v[:, None] - ac * w[:, None]) ** 2).sum(axis=1))
+    # degenerate triangles with no region matching
+    return np.where(np.isnan(distance), np.inf, distance)
+
+
+class Region:
+    """
+    A part of space to select mesh items in, by their node coordinates or centroids.
+
+    ``bounds`` returns a box around the region, or None if it is unbounded, and
+    ``contains`` tests an (N, 3) array of points. ``prepare`` is called with the mesh
+    before selecting and returns the region to use.
+    """
+
+    def prepare(self, mesh: Any) -> "Region":
+        return self
+
+    def bounds(self) -> tuple[np.ndarray, np.ndarray] | None:
+        return None
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+@dataclass
+class Box(Region):
+    lower: ArrayLike
+    upper: ArrayLike
+
+    def bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        return np.asarray(self.lower, dtype=np.float64), np.asarray(self.upper, dtype=np.float64)
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        lower, upper = self.bounds()
+        return ((points >= lower) & (points <= upper)).all(axis=1)
+
+
+@dataclass
+class Sphere(Region):
+    center: ArrayLike
+    radius: float
+
+    def bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        center = np.asarray(self.center, dtype=np.float64)
+        return center - self.radius, center + self.radius
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        return ((points - np.asarray(self.center, dtype=np.float64)) ** 2).sum(axis=1) <= self.radius**2
+
+
+@dataclass
+class HalfSpace(Region):
+    """
+    The points on the side of the plane through point that normal points to.
+    """
+
+    point: ArrayLike
+    normal: ArrayLike
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        return (points - np.asarray(self.point, dtype=np.float64)) @ np.asarray(self.normal, dtype=np.float64) >= 0
+
+
+@dataclass
+class Where(Region):
+    """
+    The points for which predicate, called with an (N, 3) array, returns True.
+    """
+
+    predicate: Callable[[np.ndarray], ArrayLike]
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        return np.asarray(self.predicate(points), dtype=bool).reshape(len(points))
+
+
+@dataclass
+class NearSurface(Region):
+    """
+    The points within distance of a surface of the mesh, given by name or as a Surface.
+    """
+
+    surface: Any
+    distance: float
+    _triangles: np.ndarray | None = field(default=None, init=False, repr=False)
+    _radii: np.ndarray | None = field(default=None, init=False, repr=False)
+    _grid: PointGrid | None = field(default=None, init=False, repr=False)
+
+    def prepare(self, mesh: Any) -> "NearSurface":
+        prepared = NearSurface(self.surface, self.distance)
+        prepared._triangles = mesh.surface_triangles(self.surface)
+        centroids = prepared._triangles.mean(axis=1)
+        prepared._radii = np.sqrt(((prepared._triangles - centroids[:, None]) ** 2).sum(axis=2)).max(axis=1)
+        reach = self.distance + (prepared._radii.max() if len(centroids) else 0.0)
+        prepared._grid = PointGrid(centroids, cell_size=max(reach, 1e-300))
+        return prepared
+
+    def bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._triangles is None or not len(self._triangles):
+            return np.zeros(3), np.full(3, -1.0)
+        points = self._triangles.reshape(-1, 3)
+        return points.min(axis=0) - self.distance, points.max(axis=0) + self.distance
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        if self._grid is None:
+            raise ValueError("NearSurface must be prepared with the mesh before use")
+        query_index, triangle_index = self._grid.query_pairs(points, self._grid.cell_size)
+        # the distance to a triangle is within its radius of the distance to its centroid,
+        # so only pairs in between need the exact distance
+        centroid_distance = np.sqrt(((points[query_index] - self._grid.points[triangle_index]) ** 2).sum(axis=1))
+        inside = np.zeros(len(points), dtype=bool)
+        inside[query_index[centroid_distance + self._radii[triangle_index] <= self.distance]] = True
+        keep = (centroid_distance - self._radii[triangle_index] <= self.distance) & ~inside[query_index]
+        query_index, triangle_index, centroid_distance = query_index[keep], triangle_index[keep], centroid_distance[keep]
+        # the triangle with the closest centroid settles most points, the other pairs are
+        # only checked for the points it does not
+        order = np.lexsort((centroid_distance, query_index))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = query_index[order[1:]] != query_index[order[:-1]]
+        for pairs in (order[first], order[~first]):
+            pairs = pairs[~inside[query_index[pairs]]]
+            corners = self._triangles[triangle_index[pairs]]
+            distance = triangle_distance(points[query_index[pairs]], corners[:, 0], corners[:, 1], corners[:, 2])
+            inside[query_index[pairs][distance <= self.distance]] = True
+        return inside
+
+
+def as_region(region: Region | Callable[[np.ndarray], ArrayLike]) -> Region:
+    return region if isinstance(region, Region) else Where(region)
+
+
+def select(grid: PointGrid, region: Region) -> np.ndarray:
+    """
+    Sorted indices of the points of grid inside region.
+    """
+    bounds = region.bounds()
+    candidates = grid.query_box(*bounds) if bounds is not None else np.arange(len(grid), dtype=np.int64)
+    return np.sort(candidates[region.contains(grid.points[candidates])])
@@ -0,0 +1,241 @@
+import asyncio
+import csv
+import itertools
+import os
+from collections.abc import Iterable, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from ._paths import get_step, parse_path, set_step
+from .cache import ResultCache
+from .logfile import ENTRY_KINDS
+from .model import Model
+from .output import Output
+from .progress import TerminationPolicy
+from .runner import RunResult, Scheduler, TerminationReason
+
+
+def get_path(model: BaseModel, path: str):
+    value = model
+    for step in parse_path(path):
+        value = get_step(value, step)
+    return value
+
+
+def with_values(model: Model, values: Mapping[str, Any]) -> Model:
+    """
+    Return a copy of model with the fields addressed by the keys of values replaced.
+
+    Only the models and lists along each path are copied; everything else, the mesh in
+    particular, is shared with model. Assigning a plain value to a field that holds a
+    model with a ``text`` field, such as a MaterialParameter, sets its text.
+    """
+    variant = model.model_copy()
+    for path, value in values.items():
+        steps = parse_path(path)
+        parent = variant
+        for step in steps[:-1]:
+            child = get_step(parent, step)
+            child = child.model_copy() if isinstance(child, BaseModel) else list(child)
+            set_step(parent, step, child)
+            # validate_assignment may store a new list, so continue from what was stored
+            parent = get_step(parent, step)
+        current = get_step(parent, steps[-1])
+        if isinstance(current, BaseModel) and "text" in type(current).model_fields and not isinstance(value, BaseModel):
+            current = current.model_copy()
+            current.text = value
+            value = current
+        set_step(parent, steps[-1], value)
+    return variant
+
+
+def grid(axes: Mapping[str, Iterable[Any]]) -> list[dict[str, Any]]:
+    """
+    Every combination of the values given per field path, as sample dictionaries.
+    """
+    paths = list(axes)
+    return [dict(zip(paths, values)) for values in itertools.product(*(list(axes[path]) for path in paths))]
+
+
+def output_files(output: Output, filepath: str | Path) -> tuple[Path, Path, list[Path]]:
+    """
+    The log file, the plot file and the separate data files FEBio writes for a model with
+    output as its Output section saved at filepath.
+    """
+    filepath = Path(filepath)
+    log = next((logfile.file for logfile in output.logfile if logfile.file), None)
+    plot = next((plotfile.file for plotfile in output.plotfile if plotfile.file), None)
+    data = [entry.file for logfile in output.logfile for kind in ENTRY_KINDS for entry in getattr(logfile, kind) if entry.file]
+    return (
+        filepath.parent / log if log else filepath.with_suffix(".log"),
+        filepath.parent / plot if plot else filepath.with_suffix(".xplt"),
+        [filepath.parent / name for name in dict.fromkeys(data)],
+    )
+
+
+@dataclass
+class SweepResult:
+    """
+    The run of one sample, with the paths of the input file and of the outputs of the run:
+    the log file, the plot file and any data files the Output section writes separately.
+    """
+
+    index: int
+    params: dict[str, Any]
+    filepath: Path
+    log: Path | None = None
+    plot: Path | None = None
+    data_files: list[Path] = field(default_factory=list)
+    returncode: int | None = None
+    termination: TerminationReason | None = None
+    elapsed: float | None = None
+    run: RunResult | None = field(default=None, repr=False)
+
+
+def write_table(results: Sequence[SweepResult], filename: str | Path):
+    """
+    Write sweep results to a csv file with one column per parameter path. Data files are
+    separated by ";".
+    """
+    paths = list(dict.fromkeys(path for result in results for path in result.params))
+    with open(filename, "w", newline="") as fid:
+        writer = csv.writer(fid)
+        writer.writerow(["index", *paths, "filepath", "log", "plot", "data_files", "returncode", "termination", "elapsed"])
+        for result in results:
+            params = [result.params.get(path, "") for path in paths]
+            files = [result.filepath, result.log, result.plot, ";".join(map(str, result.data_files))]
+            writer.writerow([result.index, *params, *files, result.returncode, result.termination, result.elapsed])
+
+
+_base_model: Model | None = None
+
+
+def _init_worker(model: Model):
+    global _base_model
+    _base_model = model
+
+
+def _save_variant(filepath: Path, values: dict[str, Any], mesh_include: str | None) -> Path:
+    with_values(_base_model, values).save(filepath, mesh_include=mesh_include)
+    return filepath
+
+
+def generate(
+    model: Model,
+    samples: Sequence[Mapping[str, Any]],
+    directory: str | Path,
+    name: str = "variant",
+    mesh_include: str | None = "mesh.feb",
+    workers: int | None = None,
+) -> list[Path]:
+    """
+    Save one .feb file per sample into directory and return their paths.
+
+    Files are written by a pool of worker processes (all cores by default, or in this
+    process with workers=0). Unless a sample changes the mesh, every variant refers to a
+    single mesh_include file, written once up front, so each variant file stays small.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    width = len(str(max(len(samples) - 1, 0)))
+    filepaths = [directory / f"{name}_{index:0{width}d}.feb" for index in range(len(samples))]
+    if mesh_include is not None and any(parse_path(path)[0] == "mesh_" for sample in samples for path in sample):
+        mesh_include = None
+    if mesh_include is not None:
+        # writing the shared include up front also fills the section cache that is
+        # handed to the workers, and keeps them from racing on the include file
+        model.save_mesh_include(directory / mesh_include)
+    if workers == 0:
+        _init_worker(model)
+        return [_save_variant(filepath, dict(sample), mesh_include) for filepath, sample in zip(filepaths, samples)]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(samples) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model,)) as executor:
+        saved = executor.map(_save_variant, filepaths, map(dict, samples), itertools.repeat(mesh_include), chunksize=chunksize)
+        return list(saved)
+
+
+async def run_variants(
+    filepaths: Sequence[Path],
+    concurrency: int | None = None,
+    omp_threads: int = 1,
+    timeout: float | None = None,
+    executable: str = "febio4",
+    scheduler: Scheduler | None = None,
+    cache: ResultCache | None = None,
+    policy: TerminationPolicy | None = None,
+) -> list[RunResult]:
+    """
+    Run FEBio on each file with OMP_NUM_THREADS set to omp_threads, longest jobs first.
+
+    Jobs go through scheduler, or a new Scheduler whose core budget fits concurrency jobs
+    at a time (all cores when concurrency is None) that looks up results in cache. Jobs
+    breaking a rule of policy are stopped early, freeing their cores for the others.
+    """
+    if scheduler is None:
+        scheduler = Scheduler(cores=concurrency * omp_threads if concurrency else None, cache=cache)
+    return await scheduler.run_all(filepaths, threads=omp_threads, silent=True, timeout=timeout, executable=executable, policy=policy)
+
+
+def sweep(
+    model: Model,
+    samples: Sequence[Mapping[str, Any]],
+    directory: str | Path,
+    name: str = "variant",
+    mesh_include: str | None = "mesh.feb",
+    workers: int | None = None,
+    concurrency: int | None = None,
+    omp_threads: int = 1,
+    timeout: float | None = None,
+    executable: str = "febio4",
+    scheduler: Scheduler | None = None,
+    cache: ResultCache | None = None,
+    policy: TerminationPolicy | None = None,
+) -> list[SweepResult]:
+    """
+    Generate a variant of model per sample with ``generate``, run them all with
+    ``run_variants`` and return one SweepResult per sample.
+
+    Example::
+
+        samples = sweep.grid({"material_.all_materials[0].E": [1.0, 2.0, 4.0], "control_.step_size": [0.1, 0.05]})
+        results = sweep.sweep(model, samples, "runs", concurrency=8, omp_threads=2)
+        sweep.write_table(results, "runs/results.csv")
+    """
+    filepaths = generate(model, samples, directory, name=name, mesh_include=mesh_include, workers=workers)
+    runs = asyncio.run(
+        run_variants(
+            filepaths,
+            concurrency=concurrency,
+            omp_threads=omp_threads,
+            timeout=timeout,
+            executable=executable,
+            scheduler=scheduler,
+            cache=cache,
+            policy=policy,
+        )
+    )
+    results = []
+    for index, (sample, filepath, run) in enumerate(zip(samples, filepaths, runs)):
+        # only a sample changing the Output section needs its own copy of it
+        output = with_values(model, sample).output_ if any(parse_path(path)[0] == "output_" for path in sample) else model.output_
+        log, plot, data_files = output_files(output, filepath)
+        results.append(
+            SweepResult(
+                index=index,
+                params=dict(sample),
+                filepath=filepath,
+                log=log,
+                plot=plot,
+                data_files=data_files,
+                returncode=run.returncode,
+                termination=run.termination,
+                elapsed=run.elapsed,
+                run=run,
+            )
+        )
+    return results
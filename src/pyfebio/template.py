@@ -0,0 +1,82 @@
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any
+from xml.sax.saxutils import escape
+
+from ._xml import ENCODING
+
+_ENTITIES = {'"': "&quot;"}
+
+
+def format_value(value: Any) -> bytes:
+    """
+    Format value the way the model serializer would write it in element text or an
+    attribute.
+    """
+    if isinstance(value, bool):
+        text = "true" if value else "false"
+    elif isinstance(value, (int, float)):
+        text = str(value)
+    else:
+        text = escape(str(value), _ENTITIES)
+    return text.encode(ENCODING)
+
+
+def _head(filename: Path) -> bytes:
+    with open(filename, "rb") as fid:
+        return fid.read(1024)
+
+
+class Template:
+    """
+    A model serialized once, with slots at some of its fields, created by
+    ``Model.to_template``.
+
+    ``render`` splices formatted values into the cached bytes, and ``save`` writes them
+    to a file, without touching the model again. Values are not validated, so they must be
+    acceptable for the fields they fill.
+    """
+
+    def __init__(self, fields: Sequence[str], chunks: list[bytes], slots: list[int], include: tuple[str, bytes] | None = None):
+        self.fields = list(fields)
+        # chunks[0], value of slots[0], chunks[1], value of slots[1], ..., chunks[-1]
+        self._chunks = chunks
+        self._slots = slots
+        self._include = include
+        self._included: set[Path] = set()
+
+    def render(self, values: Mapping[str, Any] | Sequence[Any]) -> bytes:
+        """
+        The model with values in place of the template fields, given by field path or in
+        the order of fields.
+        """
+        if isinstance(values, Mapping):
+            missing = [path for path in self.fields if path not in values]
+            if missing:
+                raise KeyError(f"no values for template fields {missing}")
+            values = [values[path] for path in self.fields]
+        elif len(values) != len(self.fields):
+            raise ValueError(f"expected {len(self.fields)} values but got {len(values)}")
+        formatted = [format_value(value) for value in values]
+        parts = [self._chunks[0]]
+        for slot, chunk in zip(self._slots, self._chunks[1:]):
+            parts.append(formatted[slot])
+            parts.append(chunk)
+        return b"".join(parts)
+
+    def save(self, filename: str | Path, values: Mapping[str, Any] | Sequence[Any]):
+        """
+        Write the rendered model to filename, and the shared mesh include next to it
+        unless this template already wrote it there.
+        """
+        filename = Path(filename)
+        if self._include is not None:
+            name, content = self._include
+            include_path = (filename.parent / name).resolve()
+            if include_path not in self._included:
+                # the head of the include carries the hash of its content
+                if not include_path.is_file() or _head(include_path) != content[:1024]:
+                    include_path.write_bytes(content)
+                self._included.add(include_path)
+        with open(filename, "wb") as fid:
+            fid.write(self.render(values))
@@ -0,0 +1,535 @@
+import mmap
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+
+FEBIO_TAG = 0x00464542
+
+PLT_ROOT = 0x01000000
+PLT_HEADER = 0x01010000
+PLT_HDR_VERSION = 0x01010001
+PLT_HDR_COMPRESSION = 0x01010004
+PLT_HDR_AUTHOR = 0x01010005
+PLT_HDR_SOFTWARE = 0x01010006
+PLT_DICTIONARY = 0x01020000
+PLT_DIC_ITEM = 0x01020001
+PLT_DIC_ITEM_TYPE = 0x01020002
+PLT_DIC_ITEM_FMT = 0x01020003
+PLT_DIC_ITEM_NAME = 0x01020004
+PLT_DIC_ITEM_ARRAYSIZE = 0x01020005
+PLT_DIC_ITEM_ARRAYNAME = 0x01020006
+PLT_DIC_ITEM_UNITS = 0x01020007
+PLT_DIC_GLOBAL = 0x01021000
+PLT_DIC_NODAL = 0x01023000
+PLT_DIC_DOMAIN = 0x01024000
+PLT_DIC_SURFACE = 0x01025000
+PLT_DIC_EDGE = 0x01026000
+PLT_MESH = 0x01040000
+PLT_NODE_SECTION = 0x01041000
+PLT_NODE_HEADER = 0x01041100
+PLT_NODE_SIZE = 0x01041101
+PLT_NODE_DIM = 0x01041102
+PLT_NODE_COORDS = 0x01041200
+PLT_DOMAIN_SECTION = 0x01042000
+PLT_DOMAIN = 0x01042100
+PLT_DOMAIN_HDR = 0x01042101
+PLT_DOM_ELEM_TYPE = 0x01042102
+PLT_DOM_PART_ID = 0x01042103
+PLT_DOM_ELEMS = 0x01032104
+PLT_DOM_NAME = 0x01032105
+PLT_DOM_ELEM_LIST = 0x01042200
+PLT_ELEMENT = 0x01042201
+PLT_SURFACE_SECTION = 0x01043000
+PLT_SURFACE = 0x01043100
+PLT_SURFACE_HDR = 0x01043101
+PLT_SURFACE_ID = 0x01043102
+PLT_SURFACE_FACES = 0x01043103
+PLT_SURFACE_NAME = 0x01043104
+PLT_SURFACE_MAX_FACET_NODES = 0x01043105
+PLT_FACE_LIST = 0x01043200
+PLT_FACE = 0x01043201
+PLT_STATE = 0x02000000
+PLT_STATE_HEADER = 0x02010000
+PLT_STATE_HDR_ID = 0x02010001
+PLT_STATE_HDR_TIME = 0x02010002
+PLT_STATE_STATUS = 0x02010003
+PLT_STATE_DATA = 0x02020000
+PLT_STATE_VARIABLE = 0x02020001
+PLT_STATE_VAR_ID = 0x02020002
+PLT_STATE_VAR_DATA = 0x02020003
+PLT_GLOBAL_DATA = 0x02020100
+PLT_NODE_DATA = 0x02020300
+PLT_ELEMENT_DATA = 0x02020400
+PLT_FACE_DATA = 0x02020500
+PLT_EDGE_DATA = 0x02020600
+
+Category = Literal["global", "node", "element", "face", "edge"]
+ItemFormat = Literal["node", "item", "mult", "region"]
+
+DICTIONARY_CATEGORIES: dict[int, Category] = {
+    PLT_DIC_GLOBAL: "global",
+    PLT_DIC_NODAL: "node",
+    PLT_DIC_DOMAIN: "element",
+    PLT_DIC_SURFACE: "face",
+    PLT_DIC_EDGE: "edge",
+}
+DATA_CATEGORIES: dict[int, Category] = {
+    PLT_GLOBAL_DATA: "global",
+    PLT_NODE_DATA: "node",
+    PLT_ELEMENT_DATA: "element",
+    PLT_FACE_DATA: "face",
+    PLT_EDGE_DATA: "edge",
+}
+# data type: (name, components per value; None for arrays sized by the dictionary)
+ITEM_TYPES: dict[int, tuple[str, int | None]] = {
+    0: ("float", 1),
+    1: ("vec3f", 3),
+    2: ("mat3fs", 6),
+    3: ("mat3fd", 3),
+    4: ("tens4fs", 21),
+    5: ("mat3f", 9),
+    6: ("array", None),
+    7: ("array_vec3f", None),
+}
+ITEM_FORMATS: tuple[ItemFormat, ...] = ("node", "item", "mult", "region")
+ELEMENT_TYPES = (
+    "hex8",
+    "penta6",
+    "tet4",
+    "quad4",
+    "tri3",
+    "line2",
+    "hex20",
+    "tet10",
+    "tet15",
+    "hex27",
+    "tri6",
+    "quad8",
+    "quad9",
+    "penta15",
+    "pyra5",
+    "tet20",
+    "tri10",
+    "pyra13",
+    "line3",
+)
+ELEMENT_NODES = dict(zip(ELEMENT_TYPES, (8, 6, 4, 4, 3, 2, 20, 10, 15, 27, 6, 8, 9, 15, 5, 20, 10, 13, 3)))
+
+_HEADER = struct.Struct("<II")
+
+
+@dataclass
+class DictionaryItem:
+    name: str
+    category: Category
+    # 1-based id of the item within its category, as referenced by the states
+    index: int
+    type: str
+    format: ItemFormat
+    components: int
+    array_names: list[str] = field(default_factory=list)
+    units: str = ""
+
+
+@dataclass
+class PlotDomain:
+    id: int
+    name: str
+    type: str
+    part_id: int
+    # (E,) element ids and (E, nodes per element) 0-based node indices
+    element_ids: np.ndarray
+    connectivity: np.ndarray
+
+
+@dataclass
+class PlotSurface:
+    id: int
+    name: str
+    # (F,) face ids, nodes per face and (F, max nodes per face) 0-based node indices
+    face_ids: np.ndarray
+    face_nodes: np.ndarray
+    connectivity: np.ndarray
+
+
+@dataclass
+class PlotMesh:
+    node_ids: np.ndarray
+    coordinates: np.ndarray
+    domains: list[PlotDomain] = field(default_factory=list)
+    surfaces: list[PlotSurface] = field(default_factory=list)
+
+
+@dataclass
+class _State:
+    offset: int
+    size: int
+    time: float
+    status: int
+    mesh: int
+    # category -> item index -> region id -> (payload offset, byte size), filled on first use
+    index: dict[Category, dict[int, dict[int, tuple[int, int]]]] | None = None
+
+
+class PlotFile:
+    """
+    Reader for FEBio .xplt plot files.
+
+    The file is memory-mapped. Opening it reads the header, dictionary and mesh, and walks
+    the chunk headers of the states to index where each one starts, skipping over their
+    data. The variables of a state are indexed the first time one of them is requested,
+    and returned as read-only NumPy views into the mapped file, so reading one variable of
+    one state only touches the pages that hold it, however large the file is.
+
+    Views stay valid until the file is closed; copy them to keep the values around longer.
+    Compressed plot files cannot be mapped and are rejected.
+
+    Example::
+
+        with PlotFile("model.xplt") as plot:
+            displacement = plot.node_data("displacement", state=-1)
+            stress = plot.element_data("stress", state=500, domain=1)
+    """
+
+    def __init__(self, filename: str | Path):
+        self.filename = Path(filename)
+        # the mapping stays valid after the file is closed
+        with open(self.filename, "rb") as fid:
+            try:
+                self._data = mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{self.filename} is not an FEBio plot file") from None
+        self.version = 0
+        self.compression = 0
+        self.software = ""
+        self.dictionary: dict[str, DictionaryItem] = {}
+        self.meshes: list[PlotMesh] = []
+        self._states: list[_State] = []
+        try:
+            self._scan()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def close(self):
+        try:
+            self._data.close()
+        except BufferError:
+            # views handed out are still alive; the mapping goes away with the last of them
+            pass
+
+    def _chunks(self, start: int, end: int, partial: bool = False) -> Iterator[tuple[int, int, int]]:
+        """
+        Yield (id, payload offset, payload size) of the chunks between start and end. With
+        partial, a truncated last chunk, such as a state FEBio is still writing, is skipped.
+        """
+        position = start
+        while position + _HEADER.size <= end:
+            chunk_id, size = _HEADER.unpack_from(self._data, position)
+            position += _HEADER.size
+            if position + size > end:
+                if partial:
+                    return
+                raise ValueError(f"chunk {chunk_id:#010x} at offset {position - _HEADER.size} runs past its parent in {self.filename}")
+            yield chunk_id, position, size
+            position += size
+
+    def _uint(self, offset: int) -> int:
+        return struct.unpack_from("<I", self._data, offset)[0]
+
+    def _string(self, offset: int, size: int) -> str:
+        raw = self._data[offset : offset + size]
+        # newer files write a length prefix, older ones a fixed, zero padded buffer
+        if size >= 4 and struct.unpack_from("<I", raw)[0] == size - 4:
+            raw = raw[4:]
+        return raw.split(b"\0", 1)[0].decode(errors="replace")
+
+    def _array(self, dtype: str, offset: int, size: int) -> np.ndarray:
+        itemsize = np.dtype(dtype).itemsize
+        return np.frombuffer(self._data, dtype=dtype, count=size // itemsize, offset=offset)
+
+    def _scan(self):
+        if len(self._data) < 4 or self._uint(0) != FEBIO_TAG:
+            raise ValueError(f"{self.filename} is not an FEBio plot file")
+        self._scan_chunks(4, len(self._data))
+
+    def _scan_chunks(self, start: int, end: int):
+        for chunk_id, offset, size in self._chunks(start, end, partial=True):
+            if chunk_id == PLT_ROOT:
+                # older files nest everything in the root chunk
+                self._scan_chunks(offset, offset + size)
+            elif chunk_id == PLT_HEADER:
+                self._read_header(offset, size)
+            elif chunk_id == PLT_DICTIONARY:
+                self._read_dictionary(offset, size)
+            elif chunk_id == PLT_MESH:
+                self.meshes.append(self._read_mesh(offset, size))
+            elif chunk_id == PLT_STATE:
+                self._states.append(self._read_state_header(offset, size))
+
+    def _read_header(self, offset: int, size: int):
+        for chunk_id, position, length in self._chunks(offset, offset + size):
+            if chunk_id == PLT_HDR_VERSION:
+                self.version = self._uint(position)
+            elif chunk_id == PLT_HDR_COMPRESSION:
+                self.compression = self._uint(position)
+            elif chunk_id == PLT_HDR_SOFTWARE:
+                self.software = self._string(position, length)
+        if self.compression:
+            raise ValueError(f"{self.filename} is compressed; write the plot file with compression disabled to read it")
+
+    def _read_dictionary(self, offset: int, size: int):
+        for chunk_id, position, length in self._chunks(offset, offset + size):
+            category = DICTIONARY_CATEGORIES.get(chunk_id)
+            if category is None:
+                continue
+            index = 0
+            for item_id, item_position, item_size in self._chunks(position, position + length):
+                if item_id != PLT_DIC_ITEM:
+                    continue
+                index += 1
+                item = self._read_item(category, index, item_position, item_size)
+                self.dictionary.setdefault(item.name, item)
+
+    def _read_item(self, category: Category, index: int, offset: int, size: int) -> DictionaryItem:
+        values: dict[int, int] = {}
+        name, units, array_names = "", "", []
+        for chunk_id, position, length in self._chunks(offset, offset + size):
+            if chunk_id == PLT_DIC_ITEM_NAME:
+                name = self._string(position, length)
+            elif chunk_id == PLT_DIC_ITEM_UNITS:
+                units = self._string(position, length)
+            elif chunk_id == PLT_DIC_ITEM_ARRAYNAME:
+                array_names.append(self._string(position, length))
+            elif length >= 4:
+                values[chunk_id] = self._uint(position)
+        type_name, components = ITEM_TYPES[values.get(PLT_DIC_ITEM_TYPE, 0)]
+        if components is None:
+            components = values.get(PLT_DIC_ITEM_ARRAYSIZE, 1) * (3 if type_name == "array_vec3f" else 1)
+        return DictionaryItem(
+            name=name,
+            category=category,
+            index=index,
+            type=type_name,
+            format=ITEM_FORMATS[values.get(PLT_DIC_ITEM_FMT, 0)],
+            components=components,
+            array_names=array_names,
+            units=units,
+        )
+
+    def _read_mesh(self, offset: int, size: int) -> PlotMesh:
+        mesh = PlotMesh(node_ids=np.zeros(0, dtype=np.int32), coordinates=np.zeros((0, 3), dtype=np.float32))
+        for chunk_id, position, length in self._chunks(offset, offset + size):
+            if chunk_id == PLT_NODE_SECTION:
+                mesh.node_ids, mesh.coordinates = self._read_nodes(position, length)
+            elif chunk_id == PLT_DOMAIN_SECTION:
+                mesh.domains = [
+                    self._read_domain(number, domain_position, domain_size)
+                    for number, (_, domain_position, domain_size) in enumerate(self._chunks(position, position + length), start=1)
+                ]
+            elif chunk_id == PLT_SURFACE_SECTION:
+                mesh.surfaces = [
+                    self._read_surface(surface_position, surface_size)
+                    for _, surface_position, surface_size in self._chunks(position, position + length)
+                ]
+        return mesh
+
+    def _read_nodes(self, offset: int, size: int) -> tuple[np.ndarray, np.ndarray]:
+        count, dim, coordinates = 0, 3, None
+        for chunk_id, position, length in self._chunks(offset, offset + size):
+            if chunk_id == PLT_NODE_HEADER:
+                for header_id, header_position, _ in self._chunks(position, position + length):
+                    if header_id == PLT_NODE_SIZE:
+                        count = self._uint(header_position)
+                    elif header_id == PLT_NODE_DIM:
+                        dim = self._uint(header_position)
+            elif chunk_id == PLT_NODE_COORDS:
+                coordinates = (position, length)
+        if coordinates is None or count == 0:
+            return np.zeros(0, dtype=np.int32), np.zeros((0, dim), dtype=np.float32)
+        position, length = coordinates
+        columns = length // (4 * count)
+        values = self._array("<f4", position, length).reshape(count, columns)
+        if columns == dim:
+            return np.arange(1, count + 1, dtype=np.int32), values
+        # each row starts with the node id, written as an int or, by some versions, a float
+        ids = self._array("<i4", position, length).reshape(count, columns)[:, 0]
+        if ids.size and (ids.min() < 0 or ids.max() >= 1 << 24):
+            ids = values[:, 0].astype(np.int32)
+        return ids, values[:, 1 : 1 + dim]
+
+    def _read_domain(self, number: int, offset: int, size: int) -> PlotDomain:
+        header: dict[int, int] = {}
+        name, elements = "", None
+        for chunk_id, position, length in self._chunks(offset, offset + size):
+            if chunk_id == PLT_DOMAIN_HDR:
+                for header_id, header_position, header_size in self._chunks(position, position + length):
+                    if header_id == PLT_DOM_NAME:
+                        name = self._string(header_position, header_size)
+                    elif header_size >= 4:
+                        header[header_id] = self._uint(header_position)
+            elif chunk_id == PLT_DOM_ELEM_LIST:
+                elements = (position, length)
+        type = ELEMENT_TYPES[header.get(PLT_DOM_ELEM_TYPE, 0)]
+        count = header.get(PLT_DOM_ELEMS, 0)
+        element_ids, connectivity = self._read_records(elements, count, PLT_ELEMENT)
+        return PlotDomain(
+            id=number,
+            name=name,
+            type=type,
+            part_id=header.get(PLT_DOM_PART_ID, 0),
+            element_ids=element_ids[:, 0],
+            connectivity=connectivity[:, : ELEMENT_NODES[type]],
+        )
+
+    def _read_surface(self, offset: int, size: int) -> PlotSurface:
+        header: dict[int, int] = {}
+        name, faces = "", None
+        for chunk_id, position, length in self._chunks(offset, offset + size):
+            if chunk_id == PLT_SURFACE_HDR:
+                for header_id, header_position, header_size in self._chunks(position, position + length):
+                    if header_id == PLT_SURFACE_NAME:
+                        name = self._string(header_position, header_size)
+                    elif header_size >= 4:
+                        header[header_id] = self._uint(header_position)
+            elif chunk_id == PLT_FACE_LIST:
+                faces = (position, length)
+        heads, connectivity = self._read_records(faces, header.get(PLT_SURFACE_FACES, 0), PLT_FACE, head=2)
+        return PlotSurface(
+            id=header.get(PLT_SURFACE_ID, 0),
+            name=name,
+            face_ids=heads[:, 0],
+            face_nodes=heads[:, 1],
+            connectivity=connectivity,
+        )
+
+    def _read_records(self, chunk: tuple[int, int] | None, count: int, record_id: int, head: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """
+        View a list of equally sized element or face chunks as one strided (count, columns)
+        int array, and split it into the leading head columns and the node indices.
+        """
+        if chunk is None or count == 0:
+            return np.zeros((0, head), dtype=np.int32), np.zeros((0, 0), dtype=np.int32)
+        position, length = chunk
+        columns = length // (4 * count)
+        records = self._array("<i4", position, length).reshape(count, columns)
+        if columns * 4 * count != length or not (records[:, 0] == record_id).all():
+            raise ValueError(f"unexpected record layout at offset {position} in {self.filename}")
+        # the first two columns of each record are its chunk header
+        return records[:, 2 : 2 + head], records[:, 2 + head :]
+
+    def _read_state_header(self, offset: int, size: int) -> _State:
+        state = _State(offset=offset, size=size, time=0.0, status=0, mesh=len(self.meshes) - 1)
+        for chunk_id, position, length in self._chunks(offset, offset + size):
+            if chunk_id != PLT_STATE_HEADER:
+                continue
+            for header_id, header_position, _ in self._chunks(position, position + length):
+                if header_id == PLT_STATE_HDR_TIME:
+                    state.time = struct.unpack_from("<f", self._data, header_position)[0]
+                elif header_id == PLT_STATE_STATUS:
+                    state.status = self._uint(header_position)
+            break
+        return state
+
+    def _index(self, state: _State) -> dict[Category, dict[int, dict[int, tuple[int, int]]]]:
+        if state.index is not None:
+            return state.index
+        index: dict[Category, dict[int, dict[int, tuple[int, int]]]] = {}
+        for chunk_id, position, length in self._chunks(state.offset, state.offset + state.size):
+            if chunk_id != PLT_STATE_DATA:
+                continue
+            for data_id, data_position, data_size in self._chunks(position, position + length):
+                category = DATA_CATEGORIES.get(data_id)
+                if category is None:
+                    continue
+                variables = index.setdefault(category, {})
+                for _, variable_position, variable_size in self._chunks(data_position, data_position + data_size):
+                    item, regions = 0, {}
+                    for part_id, part_position, part_size in self._chunks(variable_position, variable_position + variable_size):
+                        if part_id == PLT_STATE_VAR_ID:
+                            item = self._uint(part_position)
+                        elif part_id == PLT_STATE_VAR_DATA:
+                            regions = {
+                                region: (region_position, region_size)
+                                for region, region_position, region_size in self._chunks(part_position, part_position + part_size)
+                            }
+                    variables[item] = regions
+        state.index = index
+        return index
+
+    @property
+    def times(self) -> np.ndarray:
+        return np.array([state.time for state in self._states])
+
+    @property
+    def mesh(self) -> PlotMesh:
+        """
+        The mesh of the last state, or the first mesh of a file without states.
+        """
+        return self.meshes[self._states[-1].mesh if self._states else 0]
+
+    def state_mesh(self, state: int) -> PlotMesh:
+        return self.meshes[self._state(state).mesh]
+
+    def _state(self, state: int) -> _State:
+        try:
+            return self._states[state]
+        except IndexError:
+            raise IndexError(f"state {state} out of range for {len(self._states)} states in {self.filename}") from None
+
+    def data(self, name: str, state: int) -> dict[int, np.ndarray]:
+        """
+        The values of variable name in state, per region id (the domain or surface id, or 0
+        for node and global data), as read-only views of shape (values, components), or
+        (values,) for scalars.
+        """
+        try:
+            item = self.dictionary[name]
+        except KeyError:
+            raise KeyError(f"no variable {name!r} in {self.filename}; available are {sorted(self.dictionary)}") from None
+        regions = self._index(self._state(state)).get(item.category, {}).get(item.index)
+        if regions is None:
+            raise KeyError(f"variable {name!r} is not stored in state {state} of {self.filename}")
+        result = {}
+        for region, (offset, size) in regions.items():
+            values = self._array("<f4", offset, size)
+            result[region] = values if item.components == 1 else values.reshape(-1, item.components)
+        return result
+
+    def node_data(self, name: str, state: int) -> np.ndarray:
+        """
+        A nodal variable in state as an (N, components) view, or (N,) for scalars.
+        """
+        regions = self.data(name, state)
+        if not regions:
+            return np.zeros(0, dtype=np.float32)
+        return next(iter(regions.values()))
+
+    def element_data(self, name: str, state: int, domain: int | None = None) -> np.ndarray | dict[int, np.ndarray]:
+        """
+        An element variable in state for the domain with that 1-based id, or for every
+        domain keyed by id when domain is None.
+        """
+        regions = self.data(name, state)
+        return regions if domain is None else regions[domain]
+
+    def face_data(self, name: str, state: int, surface: int | None = None) -> np.ndarray | dict[int, np.ndarray]:
+        """
+        A surface variable in state for the surface with that id, or for every surface
+        keyed by id when surface is None.
+        """
+        regions = self.data(name, state)
+        return regions if surface is None else regions[surface]
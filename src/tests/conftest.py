@@ -1,3 +1,5 @@
+import stat
+import sys
 from pathlib import Path
 
 import meshio
@@ -10,6 +12,57 @@ GMSH_DIR = Path(__file__).parent.joinpath("../../assets/gmsh")
 SOLID_SETS = ["bottom-layer", "top-layer"]
 SURFACE_ELEMENTS = ["bottom", "top", "left", "right", "front", "back"]
 
+FAKE_FEBIO = """#!{python}
+import os
+import sys
+import time
+
+path = sys.argv[sys.argv.index("-i") + 1]
+text = open(path).read()
+print("reading", path, flush=True)
+print("omp", os.environ.get("OMP_NUM_THREADS"), flush=True)
+if hasattr(os, "sched_getaffinity"):
+    print("cpus", len(os.sched_getaffinity(0)), flush=True)
+base = os.path.splitext(path)[0]
+if text.startswith("echo"):
+    # replay the rest of the input as FEBio output, to the log and, unless silent, the console
+    with open(base + ".log", "w") as log:
+        for line in text.splitlines()[1:]:
+            if line.startswith("@sleep"):
+                time.sleep(float(line.split()[1]))
+                continue
+            log.write(line + "\\n")
+            log.flush()
+            if "-silent" not in sys.argv:
+                print(line, flush=True)
+    sys.exit(0)
+if "pause" in text:
+    time.sleep(0.2)
+if "sleep" in text:
+    time.sleep(30)
+if "fail" in text:
+    print("negative jacobian", file=sys.stderr, flush=True)
+    print(" E R R O R   T E R M I N A T I O N", flush=True)
+    sys.exit(1)
+with open(base + ".log", "w") as log:
+    log.write(" N O R M A L   T E R M I N A T I O N\\n")
+with open(base + ".xplt", "wb") as plot:
+    plot.write(text.encode() * 100)
+print(" N O R M A L   T E R M I N A T I O N", flush=True)
+"""
+
+
+@pytest.fixture
+def febio4(tmp_path) -> str:
+    """
+    A stand-in febio4 executable that sleeps or fails when the input file says so, or
+    replays the input as its output when it starts with "echo".
+    """
+    executable = tmp_path / "febio4"
+    executable.write_text(FAKE_FEBIO.format(python=sys.executable))
+    executable.chmod(executable.stat().st_mode | stat.S_IEXEC)
+    return str(executable)
+
 
 @pytest.fixture(scope="session")
 def tet4_meshio() -> meshio.Mesh:
@@ -0,0 +1,108 @@
+import asyncio
+import os
+
+import pytest
+
+from pyfebio import cache, runner
+
+
+@pytest.mark.skipif(os.name != "posix", reason="stand-in febio4 is a shebang script")
+def test_result_cache(tmp_path, febio4):
+    results = cache.ResultCache(tmp_path / "cache", febio_version="test")
+    scheduler = runner.Scheduler(cores=2, cache=results)
+    first = tmp_path / "first.feb"
+    first.write_text("<febio_spec><Include>mesh.feb</Include></febio_spec>")
+    (tmp_path / "mesh.feb").write_text("<febio_spec><Mesh/></febio_spec>")
+    second = tmp_path / "run" / "second.feb"
+    second.parent.mkdir()
+    second.write_bytes(first.read_bytes())
+    (second.parent / "mesh.feb").write_text("<febio_spec><Mesh/></febio_spec>")
+
+    ran = asyncio.run(scheduler.run(first, executable=febio4))
+    restored = asyncio.run(scheduler.run(second, executable=febio4))
+    assert ran.ok and not ran.cached
+    assert restored.ok and restored.cached
+    assert (second.parent / "second.xplt").read_bytes() == (tmp_path / "first.xplt").read_bytes()
+    stats = results.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.bytes_saved == stats.size > 0
+
+    (second.parent / "mesh.feb").write_text("<febio_spec><Mesh>changed</Mesh></febio_spec>")
+    assert results.key(second) != results.key(first)
+    assert (tmp_path / "mesh.feb").resolve() in cache._include_digests
+    assert cache.ResultCache(tmp_path / "cache", febio_version="other").key(first) != results.key(first)
+
+
+
+@pytest.mark.skipif(os.name != "posix", reason="stand-in febio4 is a shebang script")
+def test_scheduler_cache_order(tmp_path, febio4):
+    results = cache.ResultCache(tmp_path / "cache", febio_version="test")
+    filepaths = [tmp_path / f"model_{index}.feb" for index in range(5)]
+    for index, filepath in enumerate(filepaths):
+        filepath.write_text(f"ok {index}")
+    filepaths[0].with_suffix(".log").write_text("cached")
+    results.store(filepaths[0])
+    scheduler = runner.Scheduler(cores=1, cache=results)
+    # longest first: 2, 4, 1, 3
+    for index, estimate in ((1, 2.0), (2, 4.0), (3, 1.0), (4, 3.0)):
+        scheduler.wall_times[cache.input_hash(filepaths[index])] = estimate
+    running = []
+
+    def on_stdout(line: str):
+        if line.startswith("reading"):
+            running.append(line.split()[1])
+
+    runs = asyncio.run(scheduler.run_all(filepaths, executable=febio4, on_stdout=on_stdout))
+    assert [run.cached for run in runs] == [True, False, False, False, False]
+    assert running == [str(filepaths[index]) for index in (2, 4, 1, 3)]
+
+def test_result_cache_eviction(tmp_path):
+    results = cache.ResultCache(tmp_path / "cache", max_bytes=150, febio_version="test")
+    for index in range(3):
+        filepath = tmp_path / f"model_{index}.feb"
+        filepath.write_text(f"model {index}")
+        filepath.with_suffix(".xplt").write_bytes(b"x" * 100)
+        results.store(filepath)
+    stats = results.stats()
+    assert stats.entries == 1 and stats.size == 100
+    assert results.restore(tmp_path / "model_2.feb")
+    assert not results.restore(tmp_path / "model_0.feb")
+
+
+def test_result_cache_running_size(tmp_path, monkeypatch):
+    results = cache.ResultCache(tmp_path / "cache", max_bytes=250, febio_version="test")
+    listed = []
+    entries = results._entries
+    monkeypatch.setattr(results, "_entries", lambda: listed.append(1) or entries())
+    for index in range(3):
+        filepath = tmp_path / f"model_{index}.feb"
+        filepath.write_text(f"<Include>mesh.feb</Include> {index}")
+        filepath.with_suffix(".xplt").write_bytes(b"x" * 100)
+        results.store(filepath)
+    # listed once to count the size, and once more when the third entry overflows it
+    assert len(listed) == 2
+    assert results.stats().size == 200
+    assert results.restore(tmp_path / "model_2.feb")
+    assert not list((tmp_path / "cache").glob("??/*/.meta.json-*"))
+
+
+def test_result_cache_evicted_during_restore(tmp_path, monkeypatch):
+    results = cache.ResultCache(tmp_path / "cache", febio_version="test")
+    filepath = tmp_path / "model.feb"
+    filepath.write_text("model")
+    filepath.with_suffix(".log").write_text("log")
+    filepath.with_suffix(".xplt").write_bytes(b"plot")
+    results.store(filepath)
+    target = tmp_path / "run" / "model.feb"
+    target.parent.mkdir()
+    target.write_text("model")
+    copyfile = cache.shutil.copyfile
+
+    def copy_then_evict(source, destination):
+        copyfile(source, destination)
+        results.clear()
+
+    monkeypatch.setattr(cache.shutil, "copyfile", copy_then_evict)
+    assert not results.restore(target)
+    assert sorted(path.name for path in target.parent.iterdir()) == ["model.feb"]
+    assert results.stats().misses == 1
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from pyfebio import logfile, output
+
+LOG = """
+ ===== beginning time step 1 : 0.5 =====
+ Data Record #1
+===========================================================================
+Step = 1
+Time = 0.5
+Data = ux;uy;uz
+1 0.1 0.2 0.3
+2 0.4 0.5 0.6
+
+ Data Record #2
+===========================================================================
+Step = 1
+Time = 0.5
+Data = sx
+1 10
+
+ ===== beginning time step 2 : 1 =====
+ Data Record #1
+===========================================================================
+Step = 2
+Time = 1
+Data = ux;uy;uz
+1 1.1 1.2 1.3
+2 1.4 1.5 1.6
+
+ Data Record #2
+===========================================================================
+Step = 2
+Time = 1
+Data = sx
+1 20
+
+ N O R M A L   T E R M I N A T I O N
+"""
+
+DATA_FILE = """*Title
+*Step  = 1
+*Time  = 0.5
+*Data  = Fx;Fy
+1,1,2
+*Step  = 2
+*Time  = 1
+*Data  = Fx;Fy
+1,3,nan
+"""
+
+
+def test_read_logfile(tmp_path):
+    (tmp_path / "model.log").write_text(LOG)
+    (tmp_path / "force.txt").write_text(DATA_FILE)
+    log = output.OutputLogfile()
+    log.add_node_data(output.DataEntry(data="ux;uy;uz"))
+    log.add_element_data(output.DataEntry(data="sx"))
+    log.add_rigid_body_data(output.DataEntry(data="Fx;Fy", file="force.txt", delim=","))
+    data = logfile.read_logfile(log, tmp_path / "model.feb")
+
+    displacement = data["ux;uy;uz"]
+    assert displacement.values.shape == (2, 2, 3)
+    np.testing.assert_array_equal(displacement.time, [0.5, 1.0])
+    np.testing.assert_array_equal(displacement.ids, [1, 2])
+    np.testing.assert_allclose(displacement["uy"], [[0.2, 0.5], [1.2, 1.5]])
+    np.testing.assert_allclose(data["sx"].values[:, 0, 0], [10, 20])
+    force = data["force.txt"]
+    assert force.kind == "rigid_body_data"
+    np.testing.assert_array_equal(force.step, [1, 2])
+    np.testing.assert_allclose(force.values[:, 0, :], [[1, 2], [3, np.nan]])
+
+
+def test_read_logfile_mismatch(tmp_path):
+    (tmp_path / "model.log").write_text(LOG.replace("1 10\n", "1 10 11\n", 1))
+    log = output.OutputLogfile()
+    log.add_node_data(output.DataEntry(data="ux;uy;uz"))
+    log.add_element_data(output.DataEntry(data="sx"))
+    with pytest.raises(ValueError, match="values on every row"):
+        logfile.read_logfile(log, tmp_path / "model.feb")
+
+
+def test_read_logfile_matches_headers(tmp_path):
+    # records of an entry missing from the middle of the logfile, and entries listed in another order
+    (tmp_path / "model.log").write_text(LOG)
+    log = output.OutputLogfile()
+    log.add_element_data(output.DataEntry(data="sx", text="1"))
+    log.add_node_data(output.DataEntry(data="ux; uy; uz", text="1:2"))
+    data = logfile.read_logfile(log, tmp_path / "model.feb")
+    np.testing.assert_allclose(data["sx"].values[:, 0, 0], [10, 20])
+    np.testing.assert_allclose(data["ux; uy; uz"]["ux"], [[0.1, 0.4], [1.1, 1.4]])
+
+    log = output.OutputLogfile()
+    log.add_node_data(output.DataEntry(data="ux;uy;uz"))
+    with pytest.raises(ValueError, match="Data = sx.*matches no entry"):
+        logfile.read_logfile(log, tmp_path / "model.feb")
+
+    log = output.OutputLogfile()
+    log.add_node_data(output.DataEntry(data="ux;uy;uz", text="1,3"))
+    log.add_element_data(output.DataEntry(data="sx"))
+    with pytest.raises(ValueError, match="Data = ux;uy;uz.*matches no entry"):
+        logfile.read_logfile(log, tmp_path / "model.feb")
@@ -1,3 +1,5 @@
+import meshio
+import numpy as np
 import pytest
 from pydantic import ValidationError
 
@@ -35,6 +37,25 @@ def test_nodes_definition():
         nodes.add_node(feb.mesh.Node(id=i, text=n))
 
 
+def test_nodes_array_definition():
+    coordinates = np.array([list(map(float, n.split(","))) for n in NODE_STRINGS])
+    nodes = feb.mesh.Nodes.from_array(coordinates, name="Nodes1")
+    assert nodes.ids.tolist() == list(range(1, len(NODE_STRINGS) + 1))
+    with pytest.raises(ValidationError):
+        feb.mesh.NodesArray.from_array(coordinates[:, :2])
+    with pytest.raises(ValidationError):
+        feb.mesh.NodesArray.from_array(coordinates, ids=np.ones(len(NODE_STRINGS), dtype=int))
+
+
+def test_nodes_array_xml_matches_nodes():
+    nodes = feb.mesh.Nodes(name="Nodes1")
+    for i, n in enumerate(NODE_STRINGS):
+        nodes.add_node(feb.mesh.Node(id=i + 1, text=n))
+    nodes_array = feb.mesh.Nodes.from_array([list(map(float, n.split(","))) for n in NODE_STRINGS], name="Nodes1")
+    assert feb.mesh.Mesh(nodes=[nodes_array]).to_xml() == feb.mesh.Mesh(nodes=[nodes]).to_xml()
+    assert np.array_equal(feb.mesh.NodesArray.from_xml(nodes_array.to_xml()).coordinates, nodes_array.coordinates)
+
+
 def test_tet4_element_definition():
     feb.mesh.Tet4Element(id=1, text=TET4_ELEMENT_STRINGS[0])
     with pytest.raises(ValidationError):
@@ -53,6 +74,21 @@ def test_hex8_element_definition():
         feb.mesh.Hex8Element(id=1, text=TET4_ELEMENT_STRINGS[0])
 
 
+def test_elements_array_definition():
+    elements = feb.mesh.Elements.from_array([list(map(int, HEX8_ELEMENT_STRINGS[0].split(",")))], "hex8", name="Part1")
+    assert elements.connectivity.shape == (1, 8)
+    with pytest.raises(ValidationError):
+        feb.mesh.ElementsArray.from_array(elements.connectivity, "tet4")
+    with pytest.raises(ValidationError):
+        feb.mesh.ElementsArray.from_array(-elements.connectivity, "hex8")
+
+
+def test_elements_array_xml_matches_elements():
+    elements = feb.mesh.Elements(name="Part1", type="hex8", all_elements=[feb.mesh.Hex8Element(id=1, text=HEX8_ELEMENT_STRINGS[0])])
+    elements_array = feb.mesh.Elements.from_array([list(map(int, HEX8_ELEMENT_STRINGS[0].split(",")))], "hex8", name="Part1")
+    assert feb.mesh.Mesh(elements=[elements_array]).to_xml() == feb.mesh.Mesh(elements=[elements]).to_xml()
+
+
 def test_tri3_element_definition():
     feb.mesh.Tri3Element(id=1, text=TRI3_ELEMENT_STRINGS[0])
     with pytest.raises(ValidationError):
@@ -65,6 +101,112 @@ def test_quad4_element_definition():
         feb.mesh.Quad4Element(id=1, text=HEX8_ELEMENT_STRINGS[0])
 
 
+def test_surface_array_xml_matches_surface():
+    surface = feb.mesh.Surface(name="Surface1", all_quad4=[feb.mesh.Quad4Element(id=1, text=QUAD4_ELEMENT_STRINGS[0])])
+    surface_array = feb.mesh.SurfaceArray.from_array([[1, 2, 3, 4]], "quad4", name="Surface1")
+    assert feb.mesh.Mesh(surfaces=[surface_array]).to_xml() == feb.mesh.Mesh(surfaces=[surface]).to_xml()
+
+
+def test_mesh_index():
+    mesh = feb.mesh.Mesh()
+    mesh.add_node_domain(feb.mesh.NodesArray.from_array(np.zeros((8, 3))))
+    mesh.add_node_domain(feb.mesh.Nodes(all_nodes=[feb.mesh.Node(id=20, text=NODE_STRINGS[8])]))
+    mesh.add_element_domain(feb.mesh.ElementsArray.from_array([[1, 2, 3, 4, 5, 6, 7, 8]], "hex8", ids=[7]))
+    mesh.add_node_set(feb.mesh.NodeSet(name="top", text="5,6,7,8"))
+    assert mesh.find_node(3) == (mesh.nodes[0], 2)
+    assert mesh.find_node(20) == (mesh.nodes[1], 0)
+    assert mesh.next_node_id() == 21
+    assert mesh.find_element(7) == (mesh.elements[0], 0)
+    assert mesh.get_element_domain("Part1") is mesh.elements[0]
+    assert mesh.get_node_set("top") is mesh.node_sets[0]
+    with pytest.raises(KeyError):
+        mesh.find_node(9)
+    with pytest.raises(KeyError):
+        mesh.get_surface("top")
+
+    # extended by the add_* methods, rebuilt after other changes to the lists
+    mesh.add_element_domain(feb.mesh.ElementsArray.from_array([[1, 2, 3, 5]], "tet4", start_id=mesh.next_element_id()))
+    assert mesh.find_element(8) == (mesh.elements[1], 0)
+    mesh.elements = mesh.elements[1:]
+    assert mesh.next_element_id() == 9
+    with pytest.raises(KeyError):
+        mesh.find_element(7)
+    mesh.nodes.append(feb.mesh.NodesArray.from_array(np.zeros((2, 3)), ids=[1000000, 1000001]))
+    assert mesh.find_node(1000001) == (mesh.nodes[2], 1)
+    assert mesh.find_node(4) == (mesh.nodes[0], 3)
+
+
+def test_mesh_index_earlier_domain():
+    first = feb.mesh.Nodes(all_nodes=[feb.mesh.Node(id=1, text=NODE_STRINGS[0]), feb.mesh.Node(id=2, text=NODE_STRINGS[1])])
+    second = feb.mesh.Nodes(all_nodes=[feb.mesh.Node(id=10, text=NODE_STRINGS[2])])
+    mesh = feb.mesh.Mesh()
+    mesh.add_node_domain(first)
+    mesh.add_node_domain(second)
+    assert mesh.next_node_id() == 11
+    first.add_node(feb.mesh.Node(id=11, text=NODE_STRINGS[3]))
+    assert mesh.next_node_id() == 12
+    assert mesh.find_node(11) == (first, 2)
+    assert mesh.find_node(10) == (second, 0)
+
+
+def test_mesh_index_rejects_bad_ids():
+    mesh = feb.mesh.Mesh()
+    mesh.add_node_domain(feb.mesh.NodesArray.from_array(np.zeros((2, 3)), ids=[0, 1]))
+    with pytest.raises(ValueError, match="must be positive"):
+        mesh.find_node(1)
+
+    # the same ids in two domains, in the dense table and in the sparse dict
+    for start_id in (1, 10000000):
+        mesh = feb.mesh.Mesh()
+        mesh.add_node_domain(feb.mesh.NodesArray.from_array(np.zeros((2, 3)), start_id=start_id))
+        mesh.add_node_domain(feb.mesh.NodesArray.from_array(np.zeros((2, 3)), start_id=start_id + 1, name="second"))
+        with pytest.raises(ValueError, match=rf"ids \[{start_id + 1}\] of domain 'second' are used more than once"):
+            mesh.find_node(start_id)
+
+
+def test_exterior_surface():
+    mesh = feb.mesh.Mesh()
+    # two hex8 elements side by side, in a list and an array backed domain
+    mesh.add_element_domain(feb.mesh.Elements(all_elements=[feb.mesh.Hex8Element(id=1, text="1,2,5,4,7,8,11,10")]))
+    mesh.add_element_domain(feb.mesh.ElementsArray.from_array([[2, 3, 6, 5, 8, 9, 12, 11]], "hex8", start_id=2))
+    surface = mesh.exterior_surface(name="outer")
+    assert surface.type == "quad4" and len(surface.ids) == 10
+    assert [2, 5, 11, 8] not in surface.connectivity.tolist()
+    assert [1, 4, 5, 2] in surface.connectivity.tolist()
+    assert len(mesh.exterior_surface("Part2").ids) == 6
+    assert mesh.exterior_node_set(name="outer").text == ",".join(map(str, range(1, 13)))
+
+    penta = feb.mesh.Mesh(elements=[feb.mesh.ElementsArray.from_array([[1, 2, 3, 4, 5, 6]], "penta6")])
+    surface = penta.exterior_surface()
+    assert len(surface.all_tri3) == 2 and len(surface.all_quad4) == 3
+    tet10 = feb.mesh.Mesh(elements=[feb.mesh.ElementsArray.from_array([list(range(1, 11))], "tet10")])
+    assert tet10.exterior_surface().connectivity.tolist()[0] == [1, 2, 4, 5, 9, 8]
+    with pytest.raises(ValueError, match="quad4"):
+        feb.mesh.Mesh(elements=[feb.mesh.ElementsArray.from_array([[1, 2, 3, 4]], "quad4")]).exterior_surface("Part")
+
+
+def test_translate_meshio_sets():
+    points = np.array([list(map(float, n.split(","))) for n in NODE_STRINGS])
+    cells = [("hexahedron", np.array([[0, 1, 2, 3, 4, 5, 6, 7]])), ("quad", np.array([[0, 1, 2, 3], [4, 5, 6, 8]]))]
+    cell_sets = {
+        "block": [np.array([0]), np.array([], dtype=int)],
+        "bottom": [np.array([], dtype=int), np.array([0])],
+        "shell": [np.array([], dtype=int), np.array([1])],
+    }
+    mesh = feb.mesh.translate_meshio(meshio.Mesh(points, cells, cell_sets=cell_sets))
+    assert [e.name for e in mesh.elements] == ["block", "shell"]
+    assert [element.id for element in mesh.elements[1].all_elements] == [2]
+    assert [s.name for s in mesh.surfaces] == ["bottom"]
+    assert mesh.node_sets[0].text == "1,2,3,4"
+
+    # the array-backed domains write the same XML
+    array_mesh = feb.mesh.translate_meshio(meshio.Mesh(points, cells, cell_sets=cell_sets), arrays=True)
+    assert isinstance(array_mesh.nodes[0], feb.mesh.NodesArray) and isinstance(mesh.nodes[0], feb.mesh.Nodes)
+    assert array_mesh.elements[1].ids.tolist() == [2]
+    assert isinstance(array_mesh.surfaces[0], feb.mesh.SurfaceArray) and isinstance(mesh.surfaces[0], feb.mesh.Surface)
+    assert array_mesh.to_xml() == mesh.to_xml()
+
+
 def test_translate_tet4_mesh(tet4_meshio):
     mesh = feb.mesh.translate_meshio(tet4_meshio)
     assert mesh.nodes
@@ -1,3 +1,6 @@
+import numpy as np
+import pytest
+
 import pyfebio as feb
 
 
@@ -6,6 +9,219 @@ def test_instantiate_model():
     assert isinstance(my_model, feb.model.Model)
 
 
+def make_tet4_model() -> feb.model.Model:
+    coordinates = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    my_model = feb.model.Model()
+    my_model.mesh_.add_node_domain(feb.mesh.Nodes.from_array(coordinates))
+    my_model.mesh_.add_element_domain(feb.mesh.Elements.from_array([[1, 2, 3, 4]], "tet4"))
+    my_model.mesh_.add_surface(feb.mesh.SurfaceArray.from_array([[1, 2, 3]], "tri3", name="bottom"))
+    my_model.mesh_.add_node_set(feb.mesh.NodeSet(name="bottom", text="1,2,3"))
+    my_model.material_.add_material(feb.material.NeoHookean(name="Part1", id=1))
+    my_model.meshdomains_.add_solid_domain(feb.meshdomains.SolidDomain(name="Part1", mat="Part1"))
+    my_model.boundary_.add_bc(feb.boundary.BCZeroDisplacement(node_set="bottom", x_dof=1, y_dof=1, z_dof=1))
+    my_model.add_simple_rigid_body(origin=(0.0, 0.0, 2.0), name="Rigid")
+    return my_model
+
+
+def test_save_matches_to_xml(tmp_path):
+    my_model = make_tet4_model()
+    my_model.save(tmp_path / "model.feb")
+    expected = my_model.to_xml(pretty_print=True, encoding="ISO-8859-1", xml_declaration=True, skip_empty=True)
+    assert (tmp_path / "model.feb").read_bytes() == expected
+
+
+def test_save_section_cache(tmp_path):
+    my_model = make_tet4_model()
+    my_model.save(tmp_path / "model.feb")
+    cached = dict(my_model._section_cache)
+    my_model.control_.time_steps = 20
+    my_model.material_.all_materials[0].E = feb.material.MaterialParameter(text=2.0)
+    my_model.save(tmp_path / "model.feb")
+    assert my_model._section_cache["mesh_"] is cached["mesh_"]
+    assert my_model._section_cache["control_"] != cached["control_"]
+    # the mesh holds array-backed surface rows, so it is streamed rather than cached
+    assert my_model._section_cache["mesh_"][1] is None
+    expected = my_model.to_xml(pretty_print=True, encoding="ISO-8859-1", xml_declaration=True, skip_empty=True)
+    assert (tmp_path / "model.feb").read_bytes() == expected
+
+
+def test_clone(tmp_path):
+    my_model = make_tet4_model()
+    my_model.save(tmp_path / "model.feb")
+    shared_mesh = my_model.__dict__["mesh_"]
+    clones = [my_model.clone() for _ in range(3)]
+    for index, clone in enumerate(clones):
+        clone.material_.all_materials[0].E = feb.material.MaterialParameter(text=float(index))
+        clone.save(tmp_path / f"clone_{index}.feb")
+        assert clone.__dict__["mesh_"] is shared_mesh
+        assert clone._section_cache["mesh_"][1] is my_model._section_cache["mesh_"][1]
+    assert my_model.material_.all_materials[0].E.text == 1.0
+    assert b"<E>2.0</E>" in (tmp_path / "clone_2.feb").read_bytes()
+
+    clones[0].mesh_.add_node_set(feb.mesh.NodeSet(name="top", text="4"))
+    assert clones[0].__dict__["mesh_"] is not shared_mesh
+    assert len(clones[1].mesh_.node_sets) == len(my_model.mesh_.node_sets) == 1
+    clones[0].save(tmp_path / "clone_0.feb")
+    assert b'name="top"' in (tmp_path / "clone_0.feb").read_bytes()
+    assert b'name="top"' not in (tmp_path / "clone_1.feb").read_bytes()
+    expected = clones[2].to_xml(pretty_print=True, encoding="ISO-8859-1", xml_declaration=True, skip_empty=True)
+    assert (tmp_path / "clone_2.feb").read_bytes() == expected
+    assert "mesh_" in clones[2]._shared_sections
+
+
+def test_to_template(tmp_path):
+    my_model = make_tet4_model()
+    curve = feb.loaddata.LoadCurve(id=1, points=feb.loaddata.CurvePoints(points=["0.0,0.0", "1.0,1.0"]))
+    my_model.loaddata_.add_load_curve(curve)
+    fields = ["material_.all_materials[0].E", "control_.step_size", "loaddata_.load_controllers[0].points.points[1]"]
+    template = my_model.to_template(fields, mesh_include="mesh.feb")
+    assert my_model.material_.all_materials[0].E.text == 1.0
+
+    values = [2.5, 0.05, "1.0,3.0"]
+    template.save(tmp_path / "template.feb", values)
+    variant = my_model.clone()
+    variant.material_.all_materials[0].E = feb.material.MaterialParameter(text=2.5)
+    variant.control_.step_size = 0.05
+    variant.loaddata_.load_controllers[0].points.points[1] = "1.0,3.0"
+    variant.save(tmp_path / "model.feb", mesh_include="mesh.feb")
+    assert (tmp_path / "template.feb").read_bytes() == (tmp_path / "model.feb").read_bytes()
+    assert template.render(dict(zip(fields, values))) == (tmp_path / "model.feb").read_bytes()
+
+    with pytest.raises(ValueError, match="expected 3 values"):
+        template.render([1.0])
+
+
+def test_renumber():
+    n = 6
+    index = np.arange((n + 1) ** 2 * 2).reshape(2, n + 1, n + 1)
+    corners = [(0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0), (1, 0, 0), (1, 0, 1), (1, 1, 1), (1, 1, 0)]
+    connectivity = np.stack([index[k : k + 1, j : j + n, i : i + n] for k, j, i in corners], axis=-1).reshape(-1, 8)
+    z, y, x = np.meshgrid(np.arange(2.0), *[np.arange(n + 1.0)] * 2, indexing="ij")
+    coordinates = np.stack([x, y, z], axis=-1).reshape(-1, 3)
+    # number the nodes randomly
+    ids = np.random.default_rng(0).permutation(len(coordinates)) + 1
+    model = feb.model.Model()
+    model.mesh_.add_node_domain(feb.mesh.NodesArray.from_array(coordinates, ids=ids))
+    model.mesh_.add_element_domain(feb.mesh.ElementsArray.from_array(ids[connectivity], "hex8"))
+    model.mesh_.add_node_set(feb.mesh.NodeSet(name="corners", text=f"{ids[0]},{ids[-1]}"))
+    model.mesh_.add_element_set(feb.mesh.ElementSet(name="last", text="36,1"))
+    # named like the element domain
+    model.mesh_.add_element_set(feb.mesh.ElementSet(name="Part1", text="2,1"))
+    model.mesh_.add_surface(model.mesh_.exterior_surface(name="outer"))
+    model.mesh_.add_discrete_set(feb.mesh.DiscreteSet(name="spring", elements=[feb.mesh.DiscreteElement(text=f"{ids[0]},{ids[1]}")]))
+    node_data = feb.meshdata.NodeData(name="x", node_set="corners", data_type="scalar")
+    for lid, row in ((1, 0), (2, -1)):
+        node_data.add_node(feb.meshdata.NodeDataNode(lid=lid, text=float(coordinates[row, 0])))
+    model.meshdata_.add_node_data(node_data)
+    element_data = feb.meshdata.ElementData(name="e", elem_set="last", data_type="scalar")
+    element_data.add_element(feb.meshdata.ElementDataElement(lid=1, text=36.0))
+    model.meshdata_.add_element_data(element_data)
+    surface_points = model.mesh_.node_coordinates(model.mesh_.surfaces[0].connectivity)
+    centroids = model.mesh_.element_centroids()[2]
+
+    bandwidth = np.ptp(model.mesh_.elements[0].connectivity, axis=1).max()
+    renumbering = model.renumber()
+    mesh = model.mesh_
+    assert np.ptp(mesh.elements[0].connectivity, axis=1).max() < bandwidth
+    assert mesh.nodes[0].ids.tolist() == list(range(1, len(coordinates) + 1))
+    np.testing.assert_array_equal(mesh.node_coordinates(renumbering.new_node_ids(ids)), coordinates)
+    np.testing.assert_array_equal(mesh.node_coordinates(mesh.surfaces[0].connectivity), surface_points)
+    assert sorted(map(tuple, mesh.element_centroids()[2].tolist())) == sorted(map(tuple, centroids.tolist()))
+    set_nodes = [int(node_id) for node_id in mesh.node_sets[0].text.split(",")]
+    for item in model.meshdata_.node_data[0].all_nodes:
+        assert mesh.node_coordinates(set_nodes[item.lid - 1])[0] == item.text
+    assert len(renumbering.domain_orders["Part1"]) == n * n and len(renumbering.element_orders["Part1"]) == 2
+    (element_id,) = renumbering.new_element_ids([36])
+    assert mesh.element_sets[0].text.split(",")[model.meshdata_.element_data[0].all_elements[0].lid - 1] == str(element_id)
+    spring = mesh.discrete_sets[0].elements[0].text.split(",")
+    np.testing.assert_array_equal(mesh.node_coordinates([int(node) for node in spring]), coordinates[:2])
+
+
+def test_load_round_trip(tmp_path):
+    make_tet4_model().save(tmp_path / "model.feb")
+    loaded = feb.model.Model.load(tmp_path / "model.feb")
+    assert isinstance(loaded.mesh_.nodes[0], feb.mesh.NodesArray)
+    assert isinstance(loaded.mesh_.elements[0], feb.mesh.ElementsArray)
+    assert loaded.boundary_.all_bcs[0].x_dof == 1
+    loaded.save(tmp_path / "loaded.feb")
+    assert (tmp_path / "loaded.feb").read_bytes() == (tmp_path / "model.feb").read_bytes()
+
+
+def test_lazy_load(tmp_path):
+    my_model = make_tet4_model()
+    element_data = feb.meshdata.ElementData(name="fiber", elem_set="Part", data_type="vec3")
+    element_data.add_element(feb.meshdata.ElementDataElement(lid=1, text="1.0,0.0,0.0"))
+    my_model.meshdata_.add_element_data(element_data)
+    my_model.save(tmp_path / "model.feb")
+
+    loaded = feb.model.Model.load(tmp_path / "model.feb", lazy=True)
+    loaded.material_.all_materials[0].E = feb.material.MaterialParameter(text=2.0)
+    loaded.save(tmp_path / "lazy.feb")
+    assert loaded._lazy_sections.keys() == {"mesh_", "meshdata_"}
+    my_model.material_.all_materials[0].E = feb.material.MaterialParameter(text=2.0)
+    assert (tmp_path / "lazy.feb").read_bytes() == my_model.to_xml(
+        pretty_print=True, encoding="ISO-8859-1", xml_declaration=True, skip_empty=True
+    )
+
+    assert isinstance(loaded.mesh_.nodes[0], feb.mesh.NodesArray)
+    assert loaded.meshdata_.element_data[0].name == "fiber"
+    assert not loaded._lazy_sections
+    loaded.save(tmp_path / "loaded.feb")
+    assert (tmp_path / "loaded.feb").read_bytes() == (tmp_path / "lazy.feb").read_bytes()
+
+
+def test_lazy_load_skips_markup(tmp_path):
+    my_model = make_tet4_model()
+    my_model.save(tmp_path / "model.feb")
+    content = (tmp_path / "model.feb").read_bytes()
+    # decoys in a comment and nested in another section
+    decoys = b'<!-- <Mesh><Nodes name="x"/></Mesh> --><Control>'
+    content = content.replace(b"<Control>", decoys, 1).replace(b"</Output>", b"<Mesh/></Output>", 1)
+    (tmp_path / "decoys.feb").write_bytes(content)
+    loaded = feb.model.Model.load(tmp_path / "decoys.feb", lazy=True)
+    assert loaded._lazy_sections.keys() == {"mesh_"}
+    _, start, stop, _ = loaded._lazy_sections["mesh_"]
+    assert content[start:stop].startswith(b"<Mesh>") and content[start:stop].endswith(b"</Mesh>")
+    assert len(loaded.mesh_.nodes) == 2
+    document = b'<?xml version="1.0"?><!DOCTYPE a [<!ELEMENT a ANY>]><a><b x="Mesh>"><![CDATA[</b><Mesh>]]></b><Mesh><Mesh/></Mesh></a>'
+    assert feb.model._find_sections(document) == {"b": (55, 94), "Mesh": (94, 114)}
+    document = b'<a><c x="a/>"/> <!-- </c> --><Mesh/></a>'
+    assert feb.model._find_sections(document) == {"c": (3, 15), "Mesh": (29, 36)}
+    with pytest.raises(ValueError, match="malformed"):
+        feb.model._find_sections(b"<a><Mesh></a>")
+
+
+def test_lazy_load_comments_and_cdata(tmp_path):
+    my_model = make_tet4_model()
+    my_model.save(tmp_path / "model.feb")
+    content = (tmp_path / "model.feb").read_bytes()
+    # on the same lines as the section tags, with text that looks like them
+    content = content.replace(b"</Mesh>", b"<![CDATA[</Mesh>]]></Mesh><!-- </Mesh> -->", 1)
+    content = content.replace(b"<Mesh>", b"<!-- <Mesh> --><Mesh><!-- </Mesh> -->", 1)
+    content = content.replace(b"<Control>", b"<Control><!-- <Mesh></Mesh> -->", 1)
+    (tmp_path / "decoys.feb").write_bytes(content)
+    loaded = feb.model.Model.load(tmp_path / "decoys.feb", lazy=True)
+    _, start, stop, _ = loaded._lazy_sections["mesh_"]
+    assert content[start:stop].startswith(b"<Mesh><!-- </Mesh> -->") and content[start:stop].endswith(b"]]></Mesh>")
+    assert len(loaded.mesh_.nodes) == 2
+
+
+def test_save_mesh_include(tmp_path):
+    my_model = make_tet4_model()
+    my_model.save(tmp_path / "a.feb", mesh_include="geom.feb")
+    assert b"<Include>geom.feb</Include>" in (tmp_path / "a.feb").read_bytes()
+    assert b"<Nodes" not in (tmp_path / "a.feb").read_bytes()
+    assert b"<Nodes" in (tmp_path / "geom.feb").read_bytes()
+
+    modified = (tmp_path / "geom.feb").stat().st_mtime_ns
+    my_model.save(tmp_path / "b.feb", mesh_include="geom.feb")
+    assert (tmp_path / "geom.feb").stat().st_mtime_ns == modified
+
+    my_model.add_simple_rigid_body(origin=(0.0, 0.0, 4.0), name="Rigid2")
+    my_model.save(tmp_path / "c.feb", mesh_include="geom.feb")
+    assert b'name="Rigid2"' in (tmp_path / "geom.feb").read_bytes()
+
+
 def test_tet4_model(tet4_febmesh, tmp_path):
     my_model = feb.model.Model(mesh_=tet4_febmesh)
     for i, element in enumerate(my_model.mesh_.elements):
@@ -21,7 +237,7 @@ def test_tet4_model(tet4_febmesh, tmp_path):
     )
     my_model.loaddata_.add_load_curve(feb.loaddata.LoadCurve(id=1, points=feb.loaddata.CurvePoints(points=["0,0", "1,1"])))
     my_model.save(tmp_path.joinpath("model.feb"))
-    result = feb.model.run_model(f"febio4 -i {tmp_path.joinpath('model.feb')}")
+    result = feb.model.run_model(tmp_path.joinpath("model.feb"))
     assert result == 0
 
 
@@ -41,7 +257,7 @@ def test_tet10_model(tet10_febmesh, tmp_path):
     my_model.loaddata_.add_load_curve(feb.loaddata.LoadCurve(id=1, points=feb.loaddata.CurvePoints(points=["0,0", "1,1"])))
 
     my_model.save(tmp_path.joinpath("model.feb"))
-    result = feb.model.run_model(f"febio4 -i {tmp_path.joinpath('model.feb')}")
+    result = feb.model.run_model(tmp_path.joinpath("model.feb"))
     assert result == 0
 
 
@@ -61,7 +277,7 @@ def test_hex8_model(hex8_febmesh, tmp_path):
     my_model.loaddata_.add_load_curve(feb.loaddata.LoadCurve(id=1, points=feb.loaddata.CurvePoints(points=["0,0", "1,1"])))
 
     my_model.save(tmp_path.joinpath("model.feb"))
-    result = feb.model.run_model(f"febio4 -i {tmp_path.joinpath('model.feb')}")
+    result = feb.model.run_model(tmp_path.joinpath("model.feb"))
     assert result == 0
 
 
@@ -81,7 +297,7 @@ def test_hex20_model(hex20_febmesh, tmp_path):
     my_model.loaddata_.add_load_curve(feb.loaddata.LoadCurve(id=1, points=feb.loaddata.CurvePoints(points=["0,0", "1,1"])))
 
     my_model.save(tmp_path.joinpath("model.feb"))
-    result = feb.model.run_model(f"febio4 -i {tmp_path.joinpath('model.feb')}")
+    result = feb.model.run_model(tmp_path.joinpath("model.feb"))
     assert result == 0
 
 
@@ -101,5 +317,5 @@ def test_hex27_model(hex27_febmesh, tmp_path):
     my_model.loaddata_.add_load_curve(feb.loaddata.LoadCurve(id=1, points=feb.loaddata.CurvePoints(points=["0,0", "1,1"])))
 
     my_model.save(tmp_path.joinpath("model.feb"))
-    result = feb.model.run_model(f"febio4 -i {tmp_path.joinpath('model.feb')}")
+    result = feb.model.run_model(tmp_path.joinpath("model.feb"))
     assert result == 0
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import pyfebio as feb
+from pyfebio import quality
+
+
+@pytest.mark.parametrize("element_type", sorted(quality.SHAPES))
+def test_ideal_elements(element_type):
+    shape = quality.SHAPES[element_type]
+    axes = {"tri": quality._TRI_AXES, "tet": quality._TET_AXES, "pen": quality._PENTA_AXES}.get(element_type[:3], np.eye(shape.dimension))
+    coordinates = np.zeros((1, len(shape.nodes), 3))
+    coordinates[0, :, : shape.dimension] = shape.nodes @ np.asarray(axes)
+    measured = quality.element_quality(element_type, 2.0 * coordinates + 1.0)
+    np.testing.assert_allclose(measured.scaled_jacobian, 1.0)
+    assert not measured.inverted.any()
+    if shape.dimension > 1:
+        np.testing.assert_allclose(measured.aspect_ratio, 1.0)
+        expected = {"tri": 60.0, "tet": np.degrees(np.arccos(1 / 3)), "pen": 60.0}.get(element_type[:3], 90.0)
+        np.testing.assert_allclose(measured.min_dihedral, expected)
+
+
+def test_distorted_elements():
+    hex8 = quality.SHAPES["hex8"].nodes
+    flattened = hex8 * (1.0, 1.0, 0.01)
+    swapped = hex8[[4, 1, 2, 3, 0, 5, 6, 7]]
+    # the second node of a tet10 edge pulled past the opposite corner
+    tet10 = quality.SHAPES["tet10"].nodes.copy()
+    tet10[4] = (0.5, 1.5, 0.0)
+    measured = quality.element_quality("hex8", np.stack([hex8, flattened, swapped]), ids=[7, 8, 9])
+    assert measured.inverted.tolist() == [False, False, True]
+    np.testing.assert_allclose(measured.aspect_ratio[:2], [1.0, 100.0])
+    assert quality.element_quality("tet10", tet10[None]).inverted.tolist() == [True]
+    # a reentrant quadrilateral
+    assert quality.element_quality("quad4", [[(0, 0, 0), (2, 0, 0), (0.5, 0.5, 0), (0, 2, 0)]]).inverted.tolist() == [True]
+    thresholds = quality.QualityThresholds(max_aspect_ratio=50.0)
+    assert thresholds.failing(measured).tolist() == [False, True, True]
+    problems = thresholds.check(measured)
+    assert problems[0] == "1 hex8 elements of '' inverted (worst jacobian -1 at element 9)"
+    assert "with aspect ratio above 50 (worst aspect ratio 100 at element 8)" in problems[2]
+    with pytest.raises(ValueError, match="shape"):
+        quality.element_quality("hex8", hex8)
+
+
+def test_preflight():
+    coordinates = np.array([(x, y, z) for z in (0.0, 1.0) for y in (0.0, 1.0) for x in (0.0, 1.0)])
+    model = feb.model.Model()
+    model.mesh_.add_node_domain(feb.mesh.NodesArray.from_array(coordinates))
+    model.mesh_.add_element_domain(feb.mesh.ElementsArray.from_array([[1, 2, 4, 3, 5, 6, 8, 7]], "hex8"))
+    (measured,) = model.preflight()
+    assert measured.domain == "Part1" and measured.ids.tolist() == [1]
+    model.mesh_.add_element_domain(feb.mesh.Elements.from_array([[5, 6, 8, 7, 1, 2, 4, 3]], "hex8", name="Flipped", start_id=2))
+    with pytest.raises(ValueError, match="'Flipped' inverted"):
+        model.preflight()
+    assert len(model.preflight(quality.QualityThresholds(min_scaled_jacobian=None, allow_inverted=True))) == 2
@@ -0,0 +1,240 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import pyfebio as feb
+from pyfebio import progress, runner
+
+
+def run(tmp_path, febio4, content: str, **kwargs) -> runner.RunResult:
+    filepath = tmp_path / f"{content.split()[0]}.feb"
+    filepath.write_text(content)
+
+    async def main():
+        return await (await runner.run_model_async(filepath, executable=febio4, **kwargs))
+
+    return asyncio.run(main())
+
+
+@pytest.mark.skipif(os.name != "posix", reason="stand-in febio4 is a shebang script")
+def test_run_model_async(tmp_path, febio4):
+    lines = []
+    result = run(tmp_path, febio4, "ok", on_stdout=lines.append)
+    assert result.ok and result.returncode == 0
+    assert lines == result.stdout and lines[0].startswith("reading")
+
+    result = run(tmp_path, febio4, "fail")
+    assert result.termination == "error" and result.returncode == 1
+    assert result.stderr == ["negative jacobian"]
+
+    result = run(tmp_path, febio4, "sleep", timeout=0.5)
+    assert result.termination == "timeout"
+
+    # only the last lines are kept, which still end with the termination banner
+    result = run(tmp_path, febio4, "ok", max_lines=2)
+    assert result.ok and len(result.stdout) == 2 and "N O R M A L" in result.stdout[-1]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="stand-in febio4 is a shebang script")
+def test_run_model(tmp_path, febio4, capsys):
+    filepath = tmp_path / "model.feb"
+    filepath.write_text("ok")
+    result = runner.run_model(filepath, executable=febio4)
+    assert result.ok and f"reading {filepath}" in capsys.readouterr().out
+
+    async def main():
+        # blocks the running loop, but does not fail in it
+        return runner.run_model(filepath, silent=True, executable=febio4)
+
+    result = asyncio.run(main())
+    assert result.ok and capsys.readouterr().out == ""
+
+    result = runner.run_model(filepath, silent=True, executable=febio4, threads=2, scheduler=runner.Scheduler(cores=4))
+    assert result.ok and "omp 2" in result.stdout
+    with pytest.raises(ValueError, match="cache"):
+        runner.run_model(filepath, cache=feb.cache.ResultCache(tmp_path / "cache"), scheduler=runner.Scheduler())
+
+@pytest.mark.skipif(os.name != "posix", reason="stand-in febio4 is a shebang script")
+def test_run_model_async_cancel(tmp_path, febio4):
+    filepath = tmp_path / "model.feb"
+    filepath.write_text("sleep")
+
+    async def main():
+        jobs = [await runner.run_model_async(filepath, executable=febio4) for _ in range(8)]
+        async for stream, line in jobs[0].lines():
+            assert (stream, line) == ("stdout", f"reading {filepath}")
+            break
+        for job in jobs:
+            job.cancel()
+        return await asyncio.gather(*jobs)
+
+    results = asyncio.run(main())
+    assert [result.termination for result in results] == ["cancelled"] * 8
+
+
+@pytest.mark.skipif(os.name != "posix", reason="stand-in febio4 is a shebang script")
+def test_scheduler(tmp_path, febio4):
+    filepaths = []
+    for index in range(6):
+        filepaths.append(tmp_path / f"model_{index}.feb")
+        filepaths[-1].write_text(f"pause {index}")
+    history = tmp_path / "history.json"
+    scheduler = runner.Scheduler(cores=4, history=history)
+    running = []
+
+    def on_stdout(line: str):
+        if line.startswith("reading"):
+            running.append(line)
+
+    started = time.monotonic()
+    results = asyncio.run(scheduler.run_all(filepaths, threads=2, executable=febio4, on_stdout=on_stdout))
+    # two jobs of two threads fit in four cores at a time, so six jobs take three rounds
+    assert time.monotonic() - started >= 0.6
+    assert all(result.ok and "omp 2" in result.stdout for result in results)
+    keys = {feb.cache.input_hash(filepath) for filepath in filepaths}
+    assert set(scheduler.wall_times) == keys
+
+    # the history follows the content of a file, not its name
+    renamed = tmp_path / "renamed.feb"
+    filepaths[0].rename(renamed)
+    results = asyncio.run(scheduler.run_all([renamed], executable=febio4))
+    assert results[0].ok and set(scheduler.wall_times) == keys
+
+    scheduler = runner.Scheduler(cores=1, pin=True, history=history)
+    assert scheduler.wall_times.keys() == keys
+    filepaths[0] = renamed
+    scheduler.wall_times[feb.cache.input_hash(filepaths[3])] = 100.0
+    running.clear()
+    results = asyncio.run(scheduler.run_all(filepaths[:4], executable=febio4, on_stdout=on_stdout))
+    assert running[0] == f"reading {filepaths[3]}"
+    if hasattr(os, "sched_getaffinity"):
+        assert "cpus 1" in results[0].stdout
+
+
+PROGRESS = """echo
+ ===== beginning time step 1 : 0.5 =====
+ 1
+ Nonlinear solution status: time= 0.5
+	stiffness updates             = 0
+	convergence norms :     INITIAL         CURRENT         REQUIRED
+	   residual               1.000000e+00    1.000000e+00    0.000000e+00
+	   energy                 2.000000e+00    2.000000e+00    2.000000e-02
+
+ 2
+ Nonlinear solution status: time= 0.5
+	convergence norms :     INITIAL         CURRENT         REQUIRED
+	   residual               1.000000e+00    1.000000e-04    0.000000e+00
+	   energy                 2.000000e+00    nan    2.000000e-02
+
+ ------- failed to converge at time : 0.5
+ Retrying time step. Retry attempt 1 of max 5
+ AUTO STEPPER: decreasing time step, dt = 0.25
+@sleep 0.3
+ ===== beginning time step 1 : 0.25 =====
+ ------- converged at time : 0.25
+
+ N O R M A L   T E R M I N A T I O N
+"""
+
+
+def test_progress_parser():
+    parser = progress.ProgressParser()
+    events = [event for line in PROGRESS.splitlines()[1:] for event in parser.feed(line)]
+    assert [event.kind for event in events] == [
+        "step_started",
+        "iteration",
+        "iteration",
+        "failed",
+        "retry",
+        "step_size",
+        "step_started",
+        "converged",
+        "terminated",
+    ]
+    assert events[1].iteration == 1 and events[1].norms["energy"] == (2.0, 2.0, 0.02)
+    assert events[2].iteration == 2 and events[2].norms["residual"][1] == 1e-4
+    assert events[4].retry == 1 and events[4].max_retries == 5
+    assert events[5].dt == 0.25
+    assert events[7].time == 0.25 and events[8].detail == "normal"
+
+    lines = ["AUTO STEPPER: retry step, dt = 0.125", "MUST POINT CONTROLLER: adjusting dt = 0.2", "AUTO STEPPER: increasing time step, dt = 0.3"]
+    assert [event.dt for line in lines for event in parser.feed(line)] == [0.125, 0.2, 0.3]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="stand-in febio4 is a shebang script")
+@pytest.mark.parametrize("silent", [False, True])
+def test_run_model_async_events(tmp_path, febio4, silent):
+    filepath = tmp_path / "model.feb"
+    filepath.write_text(PROGRESS)
+    received = []
+
+    async def main():
+        job = await runner.run_model_async(filepath, silent=silent, executable=febio4, on_event=received.append)
+        job.poll = 0.05
+        followed = [event.kind async for event in job.events()]
+        await job
+        return followed
+
+    followed = asyncio.run(main())
+    assert followed == [event.kind for event in received]
+    assert followed[:2] == ["step_started", "iteration"] and followed[-1] == "terminated"
+
+
+def test_termination_policy():
+    control = feb.control.Control()
+    control.time_stepper.max_retries = 3
+    policy = progress.TerminationPolicy.from_control(control, stagnation=2, max_retries=3)
+    assert policy.max_retries == 3 and policy.dtmin is None
+    assert progress.TerminationPolicy.from_control(control).max_retries is None
+
+    watcher = policy.watch()
+    iteration = progress.ProgressEvent(kind="iteration", step=4, norms={"residual": (1.0, 1.0, 0.0)})
+    assert watcher.check(iteration) is None
+    assert watcher.check(iteration) is None
+    assert "stagnated for 2 iterations of time step 4" in watcher.check(iteration)
+    assert watcher.check(progress.ProgressEvent(kind="retry", retry=3, max_retries=5)) is None
+    assert "retried 4 times" in watcher.check(progress.ProgressEvent(kind="retry", retry=4, max_retries=5))
+
+    watcher = progress.TerminationPolicy(max_cutbacks=1, dtmin=0.01).watch()
+    assert watcher.check(progress.ProgressEvent(kind="step_size", dt=0.01)) is None
+    assert "below dtmin" in watcher.check(progress.ProgressEvent(kind="step_size", dt=0.005))
+    assert watcher.check(progress.ProgressEvent(kind="retry", retry=1)) is None
+    assert "2 time step cutbacks" in watcher.check(progress.ProgressEvent(kind="retry", retry=1))
+
+
+def test_termination_policy_stall():
+    control = feb.control.Control()
+    control.time_stepper.dtmin = 0.01
+    watcher = progress.TerminationPolicy.from_control(control, stall_steps=2).watch()
+    times = [0.1, 0.11, 0.2, 0.21, 0.22]
+    reasons = [watcher.check(progress.ProgressEvent(kind="converged", time=time)) for time in times]
+    assert reasons[:4] == [None] * 4
+    assert reasons[4] == "time advanced by no more than dtmin=0.01 in 2 consecutive time steps"
+
+
+def test_termination_policy_dtmin_retry_step():
+    parser = progress.ProgressParser()
+    watcher = progress.TerminationPolicy(dtmin=0.01).watch()
+    reasons = [
+        watcher.check(event)
+        for line in ["AUTO STEPPER: retry step, dt = 0.02", "AUTO STEPPER: retry step, dt = 0.005"]
+        for event in parser.feed(line)
+    ]
+    assert reasons[0] is None and "time step size 0.005 below dtmin=0.01" in reasons[1]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="stand-in febio4 is a shebang script")
+def test_run_model_async_policy(tmp_path, febio4):
+    started = time.monotonic()
+    content = PROGRESS.replace("@sleep 0.3", "@sleep 30")
+    result = run(tmp_path, febio4, content, policy=progress.TerminationPolicy(dtmin=0.3))
+    assert result.termination == "aborted" and result.abort_reason == "time step size 0.25 below dtmin=0.3"
+
+    result = run(tmp_path, febio4, "sleep", policy=progress.TerminationPolicy(wall_time=0.3))
+    assert result.termination == "aborted" and "wall time" in result.abort_reason
+    assert time.monotonic() - started < 10
+
+    result = run(tmp_path, febio4, PROGRESS, policy=progress.TerminationPolicy(max_retries=1))
+    assert result.ok and result.abort_reason is None
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import pyfebio as feb
+from pyfebio import spatial
+
+
+def hex_block(n: int) -> feb.mesh.Mesh:
+    index = np.arange((n + 1) ** 3).reshape(n + 1, n + 1, n + 1) + 1
+    corners = [(0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0), (1, 0, 0), (1, 0, 1), (1, 1, 1), (1, 1, 0)]
+    connectivity = np.stack([index[k : k + n, j : j + n, i : i + n] for k, j, i in corners], axis=-1).reshape(-1, 8)
+    z, y, x = np.meshgrid(*[np.linspace(0.0, 1.0, n + 1)] * 3, indexing="ij")
+    mesh = feb.mesh.Mesh()
+    mesh.add_node_domain(feb.mesh.NodesArray.from_array(np.stack([x, y, z], axis=-1).reshape(-1, 3)))
+    mesh.add_element_domain(feb.mesh.ElementsArray.from_array(connectivity, "hex8"))
+    return mesh
+
+
+def test_point_grid():
+    rng = np.random.default_rng(0)
+    points = rng.random((2000, 3))
+    grid = spatial.PointGrid(points)
+    box = spatial.select(grid, spatial.Box((0.2, 0.1, 0.3), (0.6, 0.5, 0.4)))
+    expected = np.flatnonzero(((points >= (0.2, 0.1, 0.3)) & (points <= (0.6, 0.5, 0.4))).all(axis=1))
+    assert box.tolist() == expected.tolist()
+    queries = rng.random((50, 3))
+    query_index, point_index = grid.query_pairs(queries, 0.1)
+    distances = np.linalg.norm(queries[:, None] - points[None], axis=2)
+    assert sorted(zip(query_index.tolist(), point_index.tolist())) == sorted(zip(*np.nonzero(distances <= 0.1)))
+
+
+def test_triangle_distance():
+    a, b, c = np.array([[0.0, 0.0, 0.0]]), np.array([[1.0, 0.0, 0.0]]), np.array([[0.0, 1.0, 0.0]])
+    points = np.array([[0.2, 0.2, 0.5], [-1.0, -1.0, 0.0], [2.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.5, -1.0, 0.0]])
+    distance = spatial.triangle_distance(points, *(np.repeat(v, len(points), axis=0) for v in (a, b, c)))
+    np.testing.assert_allclose(distance, [0.5, np.sqrt(2), 1.0, np.sqrt(0.5), 1.0])
+
+
+def test_select():
+    mesh = hex_block(4)
+    bottom = mesh.select_nodes(lambda x: x[:, 2] < 0.1, name="bottom")
+    assert bottom.text == ",".join(map(str, range(1, 26)))
+    assert mesh.select_nodes(spatial.Sphere((0, 0, 0), 0.3)).text == "1,2,6,26"
+    assert len(mesh.select_nodes(spatial.HalfSpace((0, 0, 0.6), (0, 0, 1))).text.split(",")) == 50
+    assert mesh.select_elements(spatial.Box((0, 0, 0), (0.25, 0.25, 0.25))).text == "1"
+    faces = mesh.select_faces(spatial.Box((-1, -1, -1), (2, 2, 0)), name="bottom")
+    assert faces.type == "quad4" and len(faces.ids) == 16
+    mesh.add_surface(faces)
+    near = mesh.select_nodes(spatial.NearSurface("bottom", 0.3))
+    assert near.text == ",".join(map(str, range(1, 51)))
+    with pytest.raises(ValueError, match="no nodes"):
+        mesh.select_nodes(spatial.Box((2, 2, 2), (3, 3, 3)))
+
+
+def test_find_contact_pairs():
+    mesh = hex_block(3)
+    top = hex_block(3)
+    # a second block 0.05 above the first and a third far away, with their own node ids
+    for number, offset in ((1, 1.05), (2, 10.0)):
+        nodes = feb.mesh.NodesArray.from_array(top.nodes[0].coordinates + (0.0, 0.0, offset), start_id=mesh.next_node_id())
+        connectivity = top.elements[0].connectivity + nodes.ids[0] - 1
+        mesh.add_node_domain(nodes)
+        mesh.add_element_domain(feb.mesh.ElementsArray.from_array(connectivity, "hex8", start_id=mesh.next_element_id(), name=f"Block{number}"))
+    (found,) = mesh.find_contact_pairs(gap=0.1)
+    assert found.pair.name == "Part1_Block1"
+    assert (found.pair.primary, found.pair.secondary) == (found.primary.name, found.secondary.name)
+    assert found.gap == pytest.approx(0.05)
+    assert len(found.primary.ids) == len(found.secondary.ids) == 9
+    np.testing.assert_allclose(mesh.node_coordinates(found.primary.connectivity)[:, :, 2], 1.0)
+    np.testing.assert_allclose(mesh.node_coordinates(found.secondary.connectivity)[:, :, 2], 1.05)
+    assert mesh.find_contact_pairs(gap=0.01) == []
@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pytest
+
+import pyfebio as feb
+from pyfebio import sweep
+
+
+def make_model() -> feb.model.Model:
+    coordinates = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    my_model = feb.model.Model()
+    my_model.mesh_.add_node_domain(feb.mesh.Nodes.from_array(coordinates))
+    my_model.mesh_.add_element_domain(feb.mesh.Elements.from_array([[1, 2, 3, 4]], "tet4"))
+    my_model.material_.add_material(feb.material.NeoHookean(name="Part1", id=1))
+    return my_model
+
+
+def test_parse_path():
+    assert sweep.parse_path("material_.all_materials[0].E") == ["material_", "all_materials", 0, "E"]
+    with pytest.raises(ValueError):
+        sweep.parse_path("material_..E")
+
+
+def test_with_values():
+    my_model = make_model()
+    variant = sweep.with_values(my_model, {"material_.all_materials[0].E": 5.0, "control_.time_steps": 3})
+    assert variant.material_.all_materials[0].E.text == 5.0
+    assert variant.control_.time_steps == 3
+    assert my_model.material_.all_materials[0].E.text == 1.0
+    assert my_model.control_.time_steps == 10
+    assert variant.mesh_ is my_model.mesh_
+
+
+def test_with_values_section_cache(tmp_path):
+    my_model = make_model()
+    my_model.save(tmp_path / "model.feb")
+    cached = dict(my_model._section_cache)
+    variant = sweep.with_values(my_model, {"control_.time_steps": 3})
+    variant.save(tmp_path / "variant.feb")
+    assert my_model._section_cache == cached
+    assert b"<time_steps>3</time_steps>" in (tmp_path / "variant.feb").read_bytes()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="stand-in febio4 is a shebang script")
+def test_sweep(tmp_path, febio4):
+    samples = sweep.grid({"material_.all_materials[0].E": [1.0, 2.0], "control_.time_steps": [5, 10]})
+    assert len(samples) == 4
+    results = sweep.sweep(make_model(), samples, tmp_path / "runs", workers=2, concurrency=2, omp_threads=3, executable=febio4)
+    assert [result.termination for result in results] == ["normal"] * 4
+    assert all("omp 3" in result.run.stdout for result in results)
+    assert b"<Include>mesh.feb</Include>" in results[0].filepath.read_bytes()
+    assert sorted(path.name for path in (tmp_path / "runs").glob("*.feb")) == ["mesh.feb", *(f"variant_{index}.feb" for index in range(4))]
+    assert b"<E>2.0</E>" in results[3].filepath.read_bytes()
+    assert results[0].log == results[0].filepath.with_suffix(".log") and results[0].log.exists()
+    assert results[0].plot == results[0].filepath.with_suffix(".xplt") and results[0].plot.exists()
+    sweep.write_table(results, tmp_path / "results.csv")
+    header = (tmp_path / "results.csv").read_text().splitlines()[0]
+    assert header.startswith("index,material_.all_materials[0].E")
+    assert ",filepath,log,plot,data_files," in header
+
+
+def test_output_files(tmp_path):
+    output = feb.output.Output()
+    output.add_plotfile(feb.output.OutputPlotfile(file="results.xplt"))
+    output.add_logfile(feb.output.OutputLogfile(node_data=[feb.output.DataEntry(data="x", file="x.txt"), feb.output.DataEntry(data="y")]))
+    log, plot, data_files = sweep.output_files(output, tmp_path / "model.feb")
+    assert log == tmp_path / "model.log"
+    assert plot == tmp_path / "results.xplt"
+    assert data_files == [tmp_path / "x.txt"]
@@ -0,0 +1,126 @@
+import mmap
+import struct
+
+import numpy as np
+import pytest
+
+from pyfebio import xplt
+
+
+def chunk(chunk_id: int, *parts: bytes) -> bytes:
+    payload = b"".join(parts)
+    return struct.pack("<II", chunk_id, len(payload)) + payload
+
+
+def uint(chunk_id: int, value: int) -> bytes:
+    return chunk(chunk_id, struct.pack("<I", value))
+
+
+def name(chunk_id: int, text: str) -> bytes:
+    return chunk(chunk_id, text.encode().ljust(64, b"\0"))
+
+
+def item(text: str, type: int, fmt: int) -> bytes:
+    return chunk(
+        xplt.PLT_DIC_ITEM, uint(xplt.PLT_DIC_ITEM_TYPE, type), uint(xplt.PLT_DIC_ITEM_FMT, fmt), name(xplt.PLT_DIC_ITEM_NAME, text)
+    )
+
+
+def variable(index: int, region: int, values: np.ndarray) -> bytes:
+    data = chunk(region, values.astype("<f4").tobytes())
+    return chunk(xplt.PLT_STATE_VARIABLE, uint(xplt.PLT_STATE_VAR_ID, index), chunk(xplt.PLT_STATE_VAR_DATA, data))
+
+
+def write_plot(filename, states: int) -> np.ndarray:
+    coordinates = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype="<f4")
+    records = np.hstack([np.arange(1, 5)[:, None], coordinates.view("<i4")]).astype("<i4")
+    header = chunk(xplt.PLT_HEADER, uint(xplt.PLT_HDR_VERSION, 0x31), uint(xplt.PLT_HDR_COMPRESSION, 0))
+    dictionary = chunk(
+        xplt.PLT_DICTIONARY,
+        chunk(xplt.PLT_DIC_NODAL, item("displacement", 1, 0)),
+        chunk(xplt.PLT_DIC_DOMAIN, item("stress", 2, 1)),
+        chunk(xplt.PLT_DIC_SURFACE, item("contact pressure", 0, 1)),
+    )
+    nodes = chunk(
+        xplt.PLT_NODE_SECTION,
+        chunk(xplt.PLT_NODE_HEADER, uint(xplt.PLT_NODE_SIZE, 4), uint(xplt.PLT_NODE_DIM, 3)),
+        chunk(xplt.PLT_NODE_COORDS, records.tobytes()),
+    )
+    domain = chunk(
+        xplt.PLT_DOMAIN,
+        chunk(
+            xplt.PLT_DOMAIN_HDR,
+            uint(xplt.PLT_DOM_ELEM_TYPE, 2),
+            uint(xplt.PLT_DOM_PART_ID, 1),
+            uint(xplt.PLT_DOM_ELEMS, 1),
+            name(xplt.PLT_DOM_NAME, "Part1"),
+        ),
+        chunk(xplt.PLT_DOM_ELEM_LIST, chunk(xplt.PLT_ELEMENT, struct.pack("<5i", 1, 0, 1, 2, 3))),
+    )
+    surface = chunk(
+        xplt.PLT_SURFACE,
+        chunk(
+            xplt.PLT_SURFACE_HDR,
+            uint(xplt.PLT_SURFACE_ID, 1),
+            uint(xplt.PLT_SURFACE_FACES, 1),
+            name(xplt.PLT_SURFACE_NAME, "bottom"),
+            uint(xplt.PLT_SURFACE_MAX_FACET_NODES, 3),
+        ),
+        chunk(xplt.PLT_FACE_LIST, chunk(xplt.PLT_FACE, struct.pack("<5i", 1, 3, 0, 2, 1))),
+    )
+    mesh = chunk(xplt.PLT_MESH, nodes, chunk(xplt.PLT_DOMAIN_SECTION, domain), chunk(xplt.PLT_SURFACE_SECTION, surface))
+    body = [struct.pack("<I", xplt.FEBIO_TAG), chunk(xplt.PLT_ROOT, header, dictionary), mesh]
+    displacements = np.arange(states * 12, dtype="<f4").reshape(states, 4, 3)
+    for index in range(states):
+        body.append(
+            chunk(
+                xplt.PLT_STATE,
+                chunk(xplt.PLT_STATE_HEADER, chunk(xplt.PLT_STATE_HDR_TIME, struct.pack("<f", 0.5 * index))),
+                chunk(
+                    xplt.PLT_STATE_DATA,
+                    chunk(xplt.PLT_NODE_DATA, variable(1, 0, displacements[index])),
+                    chunk(xplt.PLT_ELEMENT_DATA, variable(1, 1, np.full(6, index))),
+                    chunk(xplt.PLT_FACE_DATA, variable(1, 1, np.array([-index]))),
+                ),
+            )
+        )
+    data = b"".join(body)
+    # a state cut short, as while FEBio is still writing it
+    filename.write_bytes(data + body[-1][:20])
+    return displacements
+
+
+def test_plot_file(tmp_path):
+    displacements = write_plot(tmp_path / "model.xplt", states=5)
+    with xplt.PlotFile(tmp_path / "model.xplt") as plot:
+        assert len(plot) == 5
+        np.testing.assert_allclose(plot.times, [0.0, 0.5, 1.0, 1.5, 2.0])
+        assert plot.dictionary["stress"].components == 6
+        assert plot.dictionary["contact pressure"].category == "face"
+        mesh = plot.mesh
+        assert mesh.node_ids.tolist() == [1, 2, 3, 4]
+        np.testing.assert_array_equal(mesh.coordinates[3], [0, 0, 1])
+        assert mesh.domains[0].type == "tet4" and mesh.domains[0].name == "Part1"
+        assert mesh.domains[0].connectivity.tolist() == [[0, 1, 2, 3]]
+        assert mesh.surfaces[0].name == "bottom"
+        assert mesh.surfaces[0].connectivity.tolist() == [[0, 2, 1]]
+
+        displacement = plot.node_data("displacement", state=3)
+        np.testing.assert_array_equal(displacement, displacements[3])
+        assert not displacement.flags.writeable
+        base = displacement
+        while isinstance(base, np.ndarray):
+            base = base.base
+        assert isinstance(base.obj, mmap.mmap)
+        assert plot.element_data("stress", state=-1, domain=1).tolist() == [[4.0] * 6]
+        assert plot.face_data("contact pressure", state=2) == {1: pytest.approx([-2.0])}
+        with pytest.raises(KeyError, match="available are"):
+            plot.node_data("velocity", state=0)
+        with pytest.raises(IndexError):
+            plot.node_data("displacement", state=5)
+
+
+def test_plot_file_invalid(tmp_path):
+    (tmp_path / "model.log").write_text("not a plot file")
+    with pytest.raises(ValueError, match="not an FEBio plot file"):
+        xplt.PlotFile(tmp_path / "model.log")